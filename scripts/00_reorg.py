@@ -1,4 +1,8 @@
-"""Reorganize transcript files into ``transcripts/<video_id>`` directories."""
+"""Reorganize transcript files into ``transcripts/<video_id>`` directories.
+
+Folders that hold a packed transcript store only contribute the store. The
+other Whisper formats can be exported from it, so there is no need to copy them.
+"""
 from __future__ import annotations
 
 import argparse
@@ -7,6 +11,8 @@ import re
 import shutil
 from pathlib import Path
 
+from utils.transcript_store import STORE_SUFFIX
+
 ID_RE = re.compile(r"\[([A-Za-z0-9_-]{6,})\]")
 
 
@@ -31,8 +37,9 @@ def reorg(base: Path, only: str | None = None) -> None:
             continue
         dest = transcripts / video_id
         dest.mkdir(exist_ok=True)
-        for f in files:
-            ext = ''.join(f.suffixes)
+        stores = [f for f in files if f.name.endswith(STORE_SUFFIX)]
+        for f in stores or files:
+            ext = STORE_SUFFIX if f in stores else ''.join(f.suffixes)
             new_name = f"{video_id}.raw{ext}"
             target = dest / new_name
             idx = 2
@@ -1,4 +1,10 @@
-"""Normalize raw transcripts into clean and timecoded markdown and CSV segments."""
+"""Normalize raw transcripts into clean and timecoded markdown and CSV segments.
+
+All segments are also collected into ``data/segments.parquet``. Whisper
+segments are first passed through the quality gates in ``utils.quality``.
+Each video's dropped segment and second counts go to ``<id>.quality.json``
+and are collected into ``data/segment_quality.parquet``.
+"""
 from __future__ import annotations
 
 import argparse
@@ -6,33 +12,28 @@ import csv
 import json
 import os
 from pathlib import Path
-from typing import List, Dict
-
-import webvtt
-import pysrt
+from typing import List, Dict, Tuple
 
+from utils import tables, transcript_store
+from utils.quality import QualityGates, filter_segments
+from utils.captions import read_cues
 from utils.timecode import to_hms
 from utils.text_helpers import clean_caption
 
 MAX_GAP = 4.0
+CONFIDENCE_FIELDS = ("avg_logprob", "no_speech_prob", "compression_ratio")
 
 
 def load_segments(raw_file: Path) -> List[Dict[str, float | str]]:
     ext = raw_file.suffix.lower()
     segments: List[Dict[str, float | str]] = []
-    if ext == ".vtt":
-        for cue in webvtt.read(raw_file):
-            segments.append({
-                "start": cue.start_in_seconds,
-                "end": cue.end_in_seconds,
-                "text": cue.text,
-            })
-    elif ext == ".srt":
-        subs = pysrt.open(str(raw_file))
-        for sub in subs:
-            start = sub.start.hours * 3600 + sub.start.minutes * 60 + sub.start.seconds + sub.start.milliseconds / 1000
-            end = sub.end.hours * 3600 + sub.end.minutes * 60 + sub.end.seconds + sub.end.milliseconds / 1000
-            segments.append({"start": start, "end": end, "text": sub.text})
+    if raw_file.name.endswith(transcript_store.STORE_SUFFIX):
+        for seg in transcript_store.load(raw_file)["segments"]:
+            segments.append({"start": float(seg["start"]), "end": float(seg["end"]), "text": seg["text"],
+                             **{k: float(seg[k]) for k in CONFIDENCE_FIELDS if k in seg}})
+    elif ext in (".vtt", ".srt"):
+        for start, end, text in read_cues(raw_file):
+            segments.append({"start": start, "end": end, "text": text})
     elif ext == ".json":
         data = json.loads(raw_file.read_text())
         for item in data:
@@ -64,64 +65,135 @@ def load_segments(raw_file: Path) -> List[Dict[str, float | str]]:
 
 
 def merge_segments(segments: List[Dict[str, float | str]]) -> List[Dict[str, float | str]]:
+    """Join captions separated by at most ``MAX_GAP`` seconds into paragraphs.
+
+    Each merged segment also carries ``pieces``: the ``(offset, start, end)``
+    of every caption it was built from, with ``offset`` relative to the
+    merged text, so positions in the text can be mapped back to time.
+    When the captions have Whisper confidence fields, the paragraph gets the
+    duration-weighted ``avg_logprob`` and the highest ``no_speech_prob`` and
+    ``compression_ratio`` of its captions.
+    """
     merged: List[Dict[str, float | str]] = []
-    current: Dict[str, float | str] | None = None
+    parts: List[str] = []
+    pieces: List[Tuple[int, float, float]] = []
+    members: List[Dict[str, float | str]] = []
+    start = end = 0.0
+    length = 0
     for seg in segments:
         text = clean_caption(str(seg["text"]))
         if not text:
             continue
-        start = float(seg["start"])
-        end = float(seg["end"])
-        if current and start - float(current["end"]) <= MAX_GAP:
-            current["text"] += " " + text
-            current["end"] = end
+        seg_start = float(seg["start"])
+        seg_end = float(seg["end"])
+        if parts and seg_start - end <= MAX_GAP:
+            length += 1  # joining space
         else:
-            if current:
-                merged.append(current)
-            current = {"start": start, "end": end, "text": text}
-    if current:
-        merged.append(current)
+            if parts:
+                merged.append({"start": start, "end": end, "text": " ".join(parts), "pieces": pieces,
+                               **confidence(members)})
+            parts, pieces, members = [], [], []
+            start, length = seg_start, 0
+        pieces.append((length, seg_start, seg_end))
+        members.append(seg)
+        parts.append(text)
+        length += len(text)
+        end = seg_end
+    if parts:
+        merged.append({"start": start, "end": end, "text": " ".join(parts), "pieces": pieces,
+                       **confidence(members)})
     return merged
 
 
+def confidence(members: List[Dict[str, float | str]]) -> Dict[str, float]:
+    """Paragraph-level confidence fields from the captions it was merged from."""
+    scored = [m for m in members if all(k in m for k in CONFIDENCE_FIELDS)]
+    if not scored:
+        return {}
+    weights = [max(float(m["end"]) - float(m["start"]), 0.0) for m in scored]
+    total = sum(weights)
+    if total > 0:
+        logprob = sum(w * float(m["avg_logprob"]) for w, m in zip(weights, scored)) / total
+    else:
+        logprob = sum(float(m["avg_logprob"]) for m in scored) / len(scored)
+    return {
+        "avg_logprob": round(logprob, 4),
+        "no_speech_prob": max(float(m["no_speech_prob"]) for m in scored),
+        "compression_ratio": max(float(m["compression_ratio"]) for m in scored),
+    }
+
+
 def write_outputs(video_id: str, segs: List[Dict[str, float | str]], out_dir: Path) -> None:
     clean_path = out_dir / f"{video_id}.clean.md"
     time_path = out_dir / f"{video_id}.timecoded.md"
     csv_path = out_dir / f"{video_id}.segments.csv"
+    map_path = out_dir / f"{video_id}.timemap.json"
     paragraphs = [s["text"] for s in segs]
     clean_path.write_text("\n\n".join(paragraphs))
+    timemap: Dict[str, list] = {"offset": [], "start": [], "end": []}
+    base = 0
+    for s in segs:
+        for offset, start, end in s["pieces"]:
+            timemap["offset"].append(base + offset)
+            timemap["start"].append(start)
+            timemap["end"].append(end)
+        base += len(s["text"]) + 2
+    map_path.write_text(json.dumps(timemap))
     with time_path.open("w") as f:
         for s in segs:
             f.write(f"[{to_hms(float(s['start']))}] {s['text']}\n\n")
     with csv_path.open("w", newline="") as f:
         writer = csv.writer(f)
-        writer.writerow(["start", "end", "duration_ms", "text"])
+        writer.writerow(["start", "end", "duration_ms", "text", *CONFIDENCE_FIELDS])
         for s in segs:
             start = float(s["start"])
             end = float(s["end"])
-            writer.writerow([start, end, int((end - start) * 1000), s["text"]])
+            writer.writerow([start, end, int((end - start) * 1000), s["text"], *(s.get(k, "") for k in CONFIDENCE_FIELDS)])
 
 
-def process(video_id: str, folder: Path) -> None:
+def process(video_id: str, folder: Path, gates: QualityGates) -> None:
     raw_files = sorted(folder.glob(f"{video_id}.raw.*"))
     if not raw_files:
         return
+    # The store holds every format, so it replaces any other raw copies.
+    stores = [f for f in raw_files if f.name.endswith(transcript_store.STORE_SUFFIX)]
+    raw_files = stores or raw_files
     latest = max(f.stat().st_mtime for f in raw_files)
     clean_file = folder / f"{video_id}.clean.md"
-    if clean_file.exists() and clean_file.stat().st_mtime >= latest:
+    map_file = folder / f"{video_id}.timemap.json"
+    quality_file = folder / f"{video_id}.quality.json"
+    if (clean_file.exists() and map_file.exists() and clean_file.stat().st_mtime >= latest
+            and quality_file.exists()
+            and json.loads(quality_file.read_text())["gates"] == gates.as_dict()):
         return
     segs: List[Dict[str, float | str]] = []
     for f in raw_files:
         segs.extend(load_segments(f))
     segs.sort(key=lambda x: x["start"])
-    merged = merge_segments(segs)
+    kept, report = filter_segments(segs, gates)
+    merged = merge_segments(kept)
     write_outputs(video_id, merged, folder)
+    quality_file.write_text(json.dumps({"gates": gates.as_dict(), **report}, indent=2))
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--only")
+    defaults = QualityGates()
+    parser.add_argument("--no-speech-threshold", type=float, default=defaults.no_speech_threshold,
+                        help="drop segments above this no_speech_prob whose avg_logprob is also below --logprob-threshold")
+    parser.add_argument("--logprob-threshold", type=float, default=defaults.logprob_threshold)
+    parser.add_argument("--compression-threshold", type=float, default=defaults.compression_threshold,
+                        help="drop segments whose text compresses better than this ratio")
+    parser.add_argument("--min-logprob", type=float, default=defaults.min_logprob,
+                        help="drop any segment below this avg_logprob (off by default)")
+    parser.add_argument("--max-period", type=int, default=defaults.max_period,
+                        help="longest cycle of segments checked for repetition loops")
+    parser.add_argument("--min-repeats", type=int, default=defaults.min_repeats,
+                        help="occurrences in a row that make a repetition loop")
     args = parser.parse_args()
+    gates = QualityGates(args.no_speech_threshold, args.logprob_threshold, args.compression_threshold,
+                         args.min_logprob, args.max_period, args.min_repeats)
     base = Path("transcripts")
     if not base.exists():
         return
@@ -131,7 +203,9 @@ def main() -> None:
         vid = folder.name
         if args.only and vid != args.only:
             continue
-        process(vid, folder)
+        process(vid, folder, gates)
+    tables.write_table(tables.segments_frame(base), tables.SEGMENTS)
+    tables.write_table(tables.quality_frame(base), tables.SEGMENT_QUALITY)
 
 
 if __name__ == "__main__":
@@ -1,37 +1,112 @@
-"""Compute transcript statistics and output ``data/metrics.csv``."""
+"""Compute transcript statistics and output ``data/metrics.csv`` (and ``.parquet``).
+
+With ``--window N`` the same signals are also bucketed into N-minute windows
+along the caption timeline and written to ``data/series/<video_id>.json``.
+Such a run also deletes the series of videos that are no longer in
+``transcripts/`` or that now have no series.
+
+``--jobs`` spreads videos over a process pool. The transcripts are shared
+through a :class:`utils.corpus_buffer.CorpusBuffer`, and each worker returns
+its metrics as one float vector plus the series arrays.
+
+``--shard i/N`` measures one shard of the videos and ``--reduce`` merges the
+shards' rows and series (see :mod:`utils.shards`).
+"""
 from __future__ import annotations
 
 import argparse
 import csv
 import json
 import sys
+from functools import partial
 from pathlib import Path
-from statistics import mean, pstdev
+from typing import Tuple
 
 import nltk
+import numpy as np
 from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk.sentiment import SentimentIntensityAnalyzer
 import textstat
 
-from utils.text_helpers import HEDGE_TERMS, UNCERTAINTY_TERMS, count_terms
+from utils import shards, tables
+from utils.corpus_buffer import CorpusBuffer, Span, map_texts
+from utils.text_helpers import LEXICON_MATCHER, span_starts
+from utils.shards import Keep
+from utils.timecode import TimeMap
 
 # Allow very long CSV fields such as transcript segments
 csv.field_size_limit(sys.maxsize)
 
+METRIC_FIELDS = [c for c in tables.METRICS_DTYPES if c != "video_id"]
+SERIES_DIGITS = {'wpm': 2, 'sentiment': 3, 'question_rate': 3, 'hedge_rate': 3}
+
+
+def window_series(timemap: TimeMap, sent_offsets: np.ndarray, sent_lens: np.ndarray,
+                  sentiments: np.ndarray, questions: np.ndarray, hedge_offsets: np.ndarray,
+                  window_s: float) -> dict:
+    """Bucket per-sentence signals into fixed windows of caption time.
+
+    Windows without any sentence have no sentiment or question rate (NaN).
+    """
+    tm_offsets = np.asarray(timemap.offsets)
+    tm_starts = np.asarray(timemap.starts, dtype=float)
+
+    def window_of(offsets: np.ndarray) -> np.ndarray:
+        idx = np.clip(np.searchsorted(tm_offsets, offsets, side="right") - 1, 0, None)
+        return (tm_starts[idx] // window_s).astype(int)
+
+    end = max(timemap.ends)
+    n = int(end // window_s) + 1
+    win = window_of(sent_offsets)
+    n_sent = np.bincount(win, minlength=n)
+    words = np.bincount(win, weights=sent_lens, minlength=n)
+    sentiment_sum = np.bincount(win, weights=sentiments, minlength=n)
+    question_count = np.bincount(win, weights=questions, minlength=n)
+    hedge_count = np.bincount(window_of(hedge_offsets), minlength=n)
+    covered = np.clip(end - np.arange(n) * window_s, 0, window_s)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wpm = np.where(covered > 0, words / (covered / 60), 0)
+        sentiment = sentiment_sum / n_sent
+        question_rate = question_count / n_sent
+        hedge_rate = np.where(words > 0, hedge_count / words * 100, 0)
+    return {
+        'window_s': window_s,
+        't': np.arange(n) * window_s,
+        'wpm': wpm,
+        'sentiment': sentiment,
+        'question_rate': question_rate,
+        'hedge_rate': hedge_rate,
+    }
+
+
+def series_json(series: dict) -> dict:
+    """Rounded lists for ``data/series``, with ``None`` for empty windows."""
+    out = {'window_s': series['window_s'], 't': [float(t) for t in series['t']]}
+    for key, digits in SERIES_DIGITS.items():
+        out[key] = [round(float(v), digits) if np.isfinite(v) else None for v in series[key]]
+    return out
 
-def analyze(video_id: str, folder: Path) -> dict:
+
+def analyze(video_id: str, folder: Path, window_s: float = 0, text: str | None = None) -> dict:
     clean_file = folder / f"{video_id}.clean.md"
     seg_csv = folder / f"{video_id}.segments.csv"
-    if not clean_file.exists() or not seg_csv.exists():
+    if not seg_csv.exists() or (text is None and not clean_file.exists()):
         return {}
-    text = clean_file.read_text()
+    if text is None:
+        text = clean_file.read_text()
     words = word_tokenize(text)
     sentences = sent_tokenize(text)
     unique_words = len({w.lower() for w in words})
     ttr = unique_words / len(words) if words else 0
     questions = text.count('?')
-    hedges = count_terms(text, HEDGE_TERMS)
-    uncertainty = count_terms(text, UNCERTAINTY_TERMS)
+    hedge_offsets = []
+    uncertainty = 0
+    for hit in LEXICON_MATCHER.finditer(text):
+        if 'hedge' in hit.lexicons:
+            hedge_offsets.append(hit.start)
+        if 'uncertainty' in hit.lexicons:
+            uncertainty += 1
+    hedges = len(hedge_offsets)
     fk = textstat.flesch_kincaid_grade(text) if text else 0
     with seg_csv.open() as f:
         reader = csv.DictReader(f)
@@ -42,13 +117,14 @@ def analyze(video_id: str, folder: Path) -> dict:
         end_last = float(rows[-1]['end'])
         duration = end_last - start0
     wpm = len(words) / (duration / 60) if duration else 0
-    sent_lens = [len(word_tokenize(s)) for s in sentences]
-    mean_sent_len = mean(sent_lens) if sent_lens else 0
+    sent_lens = np.fromiter((len(word_tokenize(s)) for s in sentences), dtype=float, count=len(sentences))
+    mean_sent_len = sent_lens.mean() if sent_lens.size else 0
     sia = SentimentIntensityAnalyzer()
-    sentiments = [sia.polarity_scores(s)['compound'] for s in sentences] if sentences else [0]
-    sentiment_mean = mean(sentiments)
-    sentiment_std = pstdev(sentiments) if len(sentiments) > 1 else 0
-    return {
+    sentiments = np.fromiter((sia.polarity_scores(s)['compound'] for s in sentences),
+                             dtype=float, count=len(sentences))
+    sentiment_mean = sentiments.mean() if sentiments.size else 0
+    sentiment_std = sentiments.std() if sentiments.size > 1 else 0
+    result = {
         'video_id': video_id,
         'words': len(words),
         'sentences': len(sentences),
@@ -56,41 +132,95 @@ def analyze(video_id: str, folder: Path) -> dict:
         'ttr': round(ttr, 3),
         'duration_covered': round(duration, 2),
         'wpm': round(wpm, 2),
-        'mean_sentence_length': round(mean_sent_len, 2),
+        'mean_sentence_length': round(float(mean_sent_len), 2),
         'fk_grade': round(fk, 2),
-        'sentiment_mean': round(sentiment_mean, 3),
-        'sentiment_std': round(sentiment_std, 3),
+        'sentiment_mean': round(float(sentiment_mean), 3),
+        'sentiment_std': round(float(sentiment_std), 3),
         'questions_count': questions,
         'hedge_terms_count': hedges,
         'uncertainty_markers_count': uncertainty,
     }
+    timemap_file = folder / f"{video_id}.timemap.json"
+    if window_s and timemap_file.exists():
+        timemap = TimeMap.load(timemap_file)
+        if timemap:
+            is_question = np.fromiter((s.strip().endswith('?') for s in sentences),
+                                      dtype=float, count=len(sentences))
+            result['series'] = window_series(
+                timemap, np.asarray(span_starts(text, sentences)), sent_lens, sentiments,
+                is_question, np.asarray(hedge_offsets, dtype=int), window_s)
+    return result
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("--only")
-    args = parser.parse_args()
-    base = Path("transcripts")
+def measure(span: Span, text: str, base: Path, window_s: float) -> Tuple[np.ndarray, dict | None] | None:
+    """Worker task: ``analyze`` one video and pack its metrics as a vector in ``METRIC_FIELDS`` order."""
+    result = analyze(span.video_id, base / span.video_id, window_s, text)
+    if not result:
+        return None
+    return np.array([result[c] for c in METRIC_FIELDS], dtype=float), result.get('series')
+
+
+def map_videos(base: Path, only: str | None, window_s: float, jobs: int, keep: Keep | None = None) -> dict:
+    """Metrics rows and series of the selected videos: one partial output."""
     rows = []
-    if base.exists():
-        for folder in base.iterdir():
-            if not folder.is_dir():
+    series_by_video = {}
+    with CorpusBuffer.from_transcripts(base, only, keep) as corpus:
+        task = partial(measure, base=base, window_s=window_s)
+        for span, packed in map_texts(task, corpus, jobs):
+            if packed is None:
                 continue
-            vid = folder.name
-            if args.only and vid != args.only:
-                continue
-            result = analyze(vid, folder)
-            if result:
-                rows.append(result)
+            values, series = packed
+            if series:
+                series_by_video[span.video_id] = series_json(series)
+            row = {'video_id': span.video_id}
+            for col, value in zip(METRIC_FIELDS, values.tolist()):
+                row[col] = int(value) if tables.METRICS_DTYPES[col] == "int64" else value
+            rows.append(row)
+    return {'rows': rows, 'series': series_by_video, 'window_s': window_s}
+
+
+def write_series(parts: list, measured: set, base: Path, series_dir: Path = Path("data/series")) -> None:
+    """Write each part's series and delete stale ones.
+
+    A series is stale when its video has no clean transcript under ``base``
+    any more, or was measured in this run without producing one.
+    """
+    series = {vid: data for part in parts for vid, data in part['series'].items()}
+    series_dir.mkdir(parents=True, exist_ok=True)
+    for vid, data in series.items():
+        (series_dir / f"{vid}.json").write_text(json.dumps(data))
+    for path in series_dir.glob("*.json"):
+        vid = path.stem
+        if vid in series:
+            continue
+        if vid in measured or not (base / vid / f"{vid}.clean.md").exists():
+            path.unlink()
+
+
+def reduce_parts(parts: list) -> None:
+    """Write ``data/metrics.*`` and ``data/series`` from the partial outputs."""
+    rows = sorted((row for part in parts for row in part['rows']), key=lambda r: r['video_id'])
+    if any(part['window_s'] for part in parts):
+        write_series(parts, {row['video_id'] for row in rows}, Path("transcripts"))
     out_file = Path("data/metrics.csv")
     with out_file.open("w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'video_id','words','sentences','unique_words','ttr','duration_covered',
-            'wpm','mean_sentence_length','fk_grade','sentiment_mean','sentiment_std',
-            'questions_count','hedge_terms_count','uncertainty_markers_count'])
+        writer = csv.DictWriter(f, fieldnames=list(tables.METRICS_DTYPES))
         writer.writeheader()
         for r in rows:
             writer.writerow(r)
+    tables.write_table(tables.frame(rows, tables.METRICS_DTYPES), tables.METRICS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--only")
+    parser.add_argument("--window", type=float, default=0,
+                        help="Also write per-window series of this many minutes")
+    parser.add_argument("--jobs", type=int, default=0, help="worker processes (default: CPU count, 1 = serial)")
+    shards.add_arguments(parser)
+    args = parser.parse_args()
+    task = partial(map_videos, Path("transcripts"), args.only, args.window * 60, args.jobs)
+    shards.run("metrics", args, task, reduce_parts)
 
 
 if __name__ == "__main__":
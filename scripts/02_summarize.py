@@ -0,0 +1,69 @@
+"""Write a timestamped extractive summary of each transcript.
+
+The clean transcript is split into sentences, and ``utils.summarize.lexrank``
+picks the most central ones. Each chosen sentence gets the caption times at
+its start and end from the timemap. Summaries go to
+``data/summaries/<id>.json`` with the hash of the text and settings they were
+made from. A video whose hash is unchanged is skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+import nltk
+from nltk.tokenize import sent_tokenize
+
+from utils.summarize import lexrank, text_hash
+from utils.text_helpers import span_starts
+from utils.timecode import TimeMap
+
+
+def summarize(video_id: str, folder: Path, out_dir: Path, sentences_k: int, threshold: float) -> bool:
+    """Summarize one video unless its cached summary is current; return whether it was written."""
+    clean_file = folder / f"{video_id}.clean.md"
+    if not clean_file.exists():
+        return False
+    text = clean_file.read_text()
+    digest = text_hash(text, k=sentences_k, threshold=threshold)
+    out_file = out_dir / f"{video_id}.json"
+    if out_file.exists() and json.loads(out_file.read_text()).get("hash") == digest:
+        return False
+    sentences = sent_tokenize(text)
+    starts = span_starts(text, sentences)
+    timemap_file = folder / f"{video_id}.timemap.json"
+    timemap = TimeMap.load(timemap_file) if timemap_file.exists() else TimeMap([], [], [])
+    picked = []
+    for i in lexrank(sentences, k=sentences_k, threshold=threshold):
+        start = timemap.span_at(starts[i])[0] if timemap else None
+        end = timemap.span_at(starts[i] + len(sentences[i]) - 1)[1] if timemap else None
+        picked.append({"start": start, "end": end, "text": sentences[i].strip()})
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_file.write_text(json.dumps({"hash": digest, "sentences": picked}, indent=2))
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--only")
+    parser.add_argument("--sentences", type=int, default=5, help="sentences per summary")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="smallest cosine similarity kept as a graph edge")
+    args = parser.parse_args()
+    base = Path("transcripts")
+    out_dir = Path("data/summaries")
+    if not base.exists():
+        return
+    written = 0
+    for folder in sorted(base.iterdir()):
+        if not folder.is_dir() or (args.only and folder.name != args.only):
+            continue
+        written += summarize(folder.name, folder, out_dir, args.sentences, args.threshold)
+    print(f"summaries: {written} written")
+
+
+if __name__ == "__main__":
+    nltk.download('punkt', quiet=True)
+    nltk.download('punkt_tab', quiet=True)
+    main()
@@ -1,29 +1,49 @@
-"""Extract named entities and top keywords for each transcript."""
+"""Extract named entities and top keywords for each transcript.
+
+Entity names are canonicalized across the corpus through the alias table in
+``data/entity_aliases.json`` (see ``utils.entity_resolution``), so one person,
+organization or place is listed under one name.
+
+``--jobs`` runs spaCy in a process pool. Each worker loads the model once
+and reads the transcripts from a shared
+:class:`utils.corpus_buffer.CorpusBuffer`. Only the entity names and term
+counts come back.
+
+Keywords are ranked by TF-IDF built from per-document term counts, so the
+corpus never has to be in memory at once. ``--shard i/N`` extracts the
+entities and term counts of one shard, and ``--reduce`` merges the shards,
+resolves aliases and ranks keywords over the whole corpus (see
+:mod:`utils.shards`).
+"""
 from __future__ import annotations
 
 import argparse
 import json
+from collections import Counter
+from functools import partial
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
+import numpy as np
 import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+from utils import shards, tables
+from utils.corpus_buffer import CorpusBuffer, Span, map_texts
+from utils.entity_resolution import canonicalize, resolve
+from utils.shards import Keep
+
+# Tokenization and stop words of ``TfidfVectorizer(stop_words='english')``.
+ANALYZER = CountVectorizer(stop_words='english').build_analyzer()
 
+# The spaCy pipeline of this process, loaded by ``load_model``.
+_NLP = None
 
-def gather_texts(base: Path, only: str | None = None) -> Dict[str, str]:
-    texts = {}
-    if not base.exists():
-        return texts
-    for folder in base.iterdir():
-        if not folder.is_dir():
-            continue
-        vid = folder.name
-        if only and vid != only:
-            continue
-        clean = folder / f"{vid}.clean.md"
-        if clean.exists():
-            texts[vid] = clean.read_text()
-    return texts
+
+def load_model() -> None:
+    global _NLP
+    _NLP = spacy.load("en_core_web_sm")
 
 
 def extract_entities(nlp, text: str) -> Dict[str, List[str]]:
@@ -34,36 +54,90 @@ def extract_entities(nlp, text: str) -> Dict[str, List[str]]:
     return {"people": people, "orgs": orgs, "places": places}
 
 
-def extract_keywords(texts: Dict[str, str], top_n: int = 5) -> Dict[str, List[str]]:
-    if not texts:
+def analyze(span: Span, text: str) -> Tuple[Dict[str, List[str]], Dict[str, int]]:
+    """Worker task: the entities and term counts of one transcript."""
+    return extract_entities(_NLP, text), term_counts(text)
+
+
+def term_counts(text: str) -> Dict[str, int]:
+    """Term counts of one document, the mergeable half of TF-IDF."""
+    return dict(Counter(ANALYZER(text)))
+
+
+def extract_keywords(counts: Dict[str, Dict[str, int]], top_n: int = 5) -> Dict[str, List[str]]:
+    """Top TF-IDF terms of each document, from per-document term counts.
+
+    The vocabulary is sorted as ``CountVectorizer`` sorts it and the document
+    frequencies span every document given. The result is therefore the same
+    as fitting ``TfidfVectorizer`` on the full texts, even when the counts
+    were made on different shards.
+    """
+    if not counts:
         return {}
-    vectorizer = TfidfVectorizer(stop_words='english')
-    ids = list(texts.keys())
-    corpus = [texts[i] for i in ids]
-    tfidf = vectorizer.fit_transform(corpus)
+    ids = sorted(counts)
+    vocabulary = sorted({term for doc in counts.values() for term in doc})
+    if not vocabulary:
+        return {vid: [] for vid in ids}
+    column = {term: i for i, term in enumerate(vocabulary)}
+    indptr = [0]
+    indices: List[int] = []
+    values: List[int] = []
+    for vid in ids:
+        for term, n in counts[vid].items():
+            indices.append(column[term])
+            values.append(n)
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix((np.array(values, dtype=np.int64), indices, indptr),
+                               shape=(len(ids), len(vocabulary)))
+    matrix.sort_indices()
+    tfidf = TfidfTransformer().fit_transform(matrix)
     keywords = {}
     for idx, vid in enumerate(ids):
         row = tfidf[idx].toarray().ravel()
         top_idx = row.argsort()[-top_n:][::-1]
-        terms = [vectorizer.get_feature_names_out()[i] for i in top_idx]
-        keywords[vid] = terms
+        keywords[vid] = [vocabulary[i] for i in top_idx]
     return keywords
 
 
+def map_videos(base: Path, only: str | None, jobs: int, keep: Keep | None = None) -> Dict:
+    """Raw entities and term counts of the selected videos: one partial output."""
+    entities = {}
+    terms = {}
+    with CorpusBuffer.from_transcripts(base, only, keep) as corpus:
+        for span, (ents, counts) in map_texts(analyze, corpus, jobs, initializer=load_model):
+            entities[span.video_id] = ents
+            terms[span.video_id] = counts
+    return {"entities": entities, "terms": terms}
+
+
+def reduce_parts(parts: List[Dict]) -> None:
+    """Resolve aliases and rank keywords over all partial outputs, then write the results."""
+    result = dict(sorted((vid, ents) for part in parts for vid, ents in part["entities"].items()))
+    keywords = extract_keywords({vid: counts for part in parts for vid, counts in part["terms"].items()})
+    kinds = ("people", "orgs", "places")
+    aliases = resolve({kind: [name for groups in result.values() for name in groups[kind]] for kind in kinds})
+    for vid, groups in result.items():
+        for kind in kinds:
+            groups[kind] = canonicalize(groups[kind], aliases[kind])
+        groups["keywords_top"] = keywords.get(vid, [])
+    out_file = Path("data/entities_topics.json")
+    out_file.write_text(json.dumps(result, indent=2))
+    mentions = (
+        {"video_id": vid, "kind": kind, "name": name}
+        for vid, groups in result.items()
+        for kind, names in groups.items()
+        for name in names
+    )
+    tables.write_table(tables.frame(mentions, tables.ENTITY_DTYPES), tables.ENTITY_MENTIONS)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--only")
+    parser.add_argument("--jobs", type=int, default=0, help="worker processes (default: CPU count, 1 = serial)")
+    shards.add_arguments(parser)
     args = parser.parse_args()
-    base = Path("transcripts")
-    texts = gather_texts(base, args.only)
-    nlp = spacy.load("en_core_web_sm")
-    keywords = extract_keywords(texts)
-    result = {}
-    for vid, text in texts.items():
-        result[vid] = extract_entities(nlp, text)
-        result[vid]["keywords_top"] = keywords.get(vid, [])
-    out_file = Path("data/entities_topics.json")
-    out_file.write_text(json.dumps(result, indent=2))
+    shards.run("entities", args, partial(map_videos, Path("transcripts"), args.only, args.jobs), reduce_parts)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""Assign topic distributions to videos and segment windows with online LDA.
+
+Each video's clean transcript is cut into ``--window``-second documents at
+caption boundaries, using its ``timemap.json``. Videos the
+saved model (``data/topic_model.joblib``) has not seen yet are streamed
+through ``partial_fit``. Every video is then assigned topics with the
+updated model, so adding a video never refits the corpus. Use ``--refit`` to
+train from scratch; changing ``--topics`` or ``--window`` does this too.
+
+Outputs:
+- ``data/topics.json``: each topic's id, label and terms, plus each video's
+  topics as ``[topic index, weight]`` pairs. The id (``topic-07``) follows
+  the LDA component, which keeps its index as the model grows, so it is what
+  pages are keyed by. The label (the top three terms) drifts with every
+  update and is only for display.
+- ``data/topic_windows.parquet``: the topic weights of every window.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from scipy import sparse
+
+from utils import tables
+from utils.topic_model import MODEL, TopicModel, top_topics
+
+TOPICS = Path("data/topics.json")
+
+
+def video_windows(clean: str, timemap: Dict[str, list], window: float) -> List[Tuple[float, float, str]]:
+    """``(start, end, text)`` documents, one per ``window`` seconds of captions."""
+    offsets, starts, ends = timemap["offset"], timemap["start"], timemap["end"]
+    docs: List[Tuple[float, float, str]] = []
+    first = 0
+    for i in range(1, len(offsets) + 1):
+        if i < len(offsets) and int(starts[i] // window) == int(starts[first] // window):
+            continue
+        stop = offsets[i] if i < len(offsets) else len(clean)
+        docs.append((float(starts[first]), float(ends[i - 1]), clean[offsets[first]:stop].strip()))
+        first = i
+    return docs
+
+
+def windows_by_video(base: Path, window: float) -> Dict[str, List[Tuple[float, float, str]]]:
+    docs = {}
+    for timemap_file in sorted(base.glob("*/*.timemap.json")):
+        vid = timemap_file.parent.name
+        clean_file = timemap_file.with_name(f"{vid}.clean.md")
+        if clean_file.exists():
+            docs[vid] = video_windows(clean_file.read_text(), json.loads(timemap_file.read_text()), window)
+    return docs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=20, help="number of topics")
+    parser.add_argument("--window", type=float, default=300.0, help="document length in seconds")
+    parser.add_argument("--passes", type=int, default=5, help="passes over each batch of new videos")
+    parser.add_argument("--refit", action="store_true", help="discard the saved model and train from scratch")
+    parser.add_argument("--min-weight", type=float, default=0.15, help="smallest topic weight listed for a video")
+    args = parser.parse_args()
+    docs = {vid: windows for vid, windows in windows_by_video(Path("transcripts"), args.window).items() if windows}
+    if not docs:
+        return
+    if args.refit:
+        model = TopicModel(n_topics=args.topics, window=args.window)
+    else:
+        model = TopicModel.load_or_create(MODEL, n_topics=args.topics, window=args.window)
+    new = sorted(set(docs) - model.fitted)
+    model.partial_fit([text for vid in new for _, _, text in docs[vid]], passes=args.passes)
+    model.fitted.update(new)
+    if not model.is_trained():
+        return
+    model.save(MODEL)
+    print(f"topic model: {len(new)} new videos fitted, {len(model.fitted)} total")
+
+    vids = sorted(docs)
+    counts = model.counts([text for vid in vids for _, _, text in docs[vid]])
+    window_dist = model.transform(counts)
+    rows = []
+    video_rows = []
+    pos = 0
+    for vid in vids:
+        n = len(docs[vid])
+        for (start, end, _), dist in zip(docs[vid], window_dist[pos:pos + n]):
+            rows.extend({"video_id": vid, "start": start, "end": end, "topic": t, "weight": w}
+                        for t, w in top_topics(dist, 0.05, args.topics))
+        # A video's distribution is that of all its windows taken as one document.
+        video_rows.append(sparse.csr_matrix(counts[pos:pos + n].sum(axis=0)))
+        pos += n
+    video_dist = model.transform(sparse.vstack(video_rows).tocsr()) if video_rows else []
+
+    terms = model.topic_terms()
+    TOPICS.write_text(json.dumps({
+        "topics": [{"id": f"topic-{i:02d}", "label": " / ".join(t[:3]), "terms": t} for i, t in enumerate(terms)],
+        "videos": {vid: top_topics(dist, args.min_weight, 3) for vid, dist in zip(vids, video_dist)},
+    }, indent=2))
+    tables.write_table(tables.frame(rows, tables.TOPIC_WINDOW_DTYPES), tables.TOPIC_WINDOWS)
+
+
+if __name__ == "__main__":
+    main()
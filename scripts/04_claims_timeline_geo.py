@@ -1,31 +1,63 @@
-"""Derive claim types and referenced years for each transcript."""
+"""Derive claim types and referenced years for each transcript.
+
+Every year mention is also recorded with the timecodes of its caption in
+``data/year_index.json`` (see :mod:`utils.year_index`), and place entities
+from ``data/entities_topics.json`` are geocoded offline against
+``data/gazetteer.json`` (see :mod:`utils.geo`).
+
+``--jobs`` spreads videos over a process pool that shares the transcripts
+through a :class:`utils.corpus_buffer.CorpusBuffer`. Workers return counts
+and year mentions as small arrays.
+
+``--shard i/N`` classifies one shard of the videos and ``--reduce`` merges
+the shards and geocodes (see :mod:`utils.shards`).
+"""
 from __future__ import annotations
 
 import argparse
 import json
 import re
+from functools import partial
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
+import numpy as np
 from nltk.tokenize import sent_tokenize
 
-SPEC_WORDS = {"maybe", "might", "perhaps", "possibly", "i think", "i guess"}
+from utils import shards, tables, year_index
+from utils.corpus_buffer import CorpusBuffer, Span, map_texts
+from utils.geo import Gazetteer, GridIndex
+from utils.shards import Keep
+from utils.text_helpers import LEXICON_MATCHER, span_starts
+from utils.timecode import TimeMap
+
 YEAR_RE = re.compile(r"(19|20)\d{2}")
+CLAIM_KINDS = ("assertion", "question", "speculation")
+
+
+def year_mentions(text: str, timemap: TimeMap) -> List[Tuple[int, float, float]]:
+    """Return ``(year, start, end)`` of the caption behind every year mention."""
+    if not timemap:
+        return []
+    return [(int(m.group()), *timemap.span_at(m.start())) for m in YEAR_RE.finditer(text)]
 
 
-def analyze(video_id: str, folder: Path) -> Dict:
+def analyze(video_id: str, folder: Path, text: str | None = None) -> Dict:
     clean = folder / f"{video_id}.clean.md"
-    if not clean.exists():
-        return {}
-    text = clean.read_text()
+    if text is None:
+        if not clean.exists():
+            return {}
+        text = clean.read_text()
+    timemap_file = folder / f"{video_id}.timemap.json"
+    timemap = TimeMap.load(timemap_file) if timemap_file.exists() else TimeMap([], [], [])
     sentences = sent_tokenize(text)
     years = sorted({int(m.group()) for m in YEAR_RE.finditer(text)})
-    counts = {"assertion": 0, "question": 0, "speculation": 0}
-    for s in sentences:
-        low = s.lower()
+    counts = dict.fromkeys(CLAIM_KINDS, 0)
+    hits = LEXICON_MATCHER.by_span(text, span_starts(text, sentences))
+    for s, sent_hits in zip(sentences, hits):
         if s.strip().endswith("?"):
             counts["question"] += 1
-        elif any(w in low for w in SPEC_WORDS):
+        elif any("speculation" in h.lexicons for h in sent_hits):
             counts["speculation"] += 1
         else:
             counts["assertion"] += 1
@@ -35,27 +67,106 @@ def analyze(video_id: str, folder: Path) -> Dict:
         "earliest": years[0] if years else None,
         "latest": years[-1] if years else None,
         "claims": counts,
+        "year_mentions": year_mentions(text, timemap),
     }
     return result
 
 
+def classify(span: Span, text: str, base: Path) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Worker task: claim counts, distinct years and ``(year, start, end)`` mention rows of one video."""
+    result = analyze(span.video_id, base / span.video_id, text)
+    counts = np.array([result["claims"][k] for k in CLAIM_KINDS], dtype=np.int64)
+    mentions = np.array(result["year_mentions"], dtype=float).reshape(-1, 3)
+    return counts, np.array(result["years"], dtype=np.int64), mentions
+
+
+def geocode(entities: Dict[str, Dict], gazetteer: Gazetteer) -> Dict[str, List[Dict]]:
+    """Attach gazetteer coordinates to every place mention that resolves."""
+    out: Dict[str, List[Dict]] = {}
+    for vid, ents in entities.items():
+        located = []
+        for name in ents.get("places", []):
+            place = gazetteer.lookup(name)
+            if place:
+                located.append({"mention": name, "place": place["name"],
+                                "lat": place["lat"], "lon": place["lon"]})
+        out[vid] = located
+    return out
+
+
+def build_geo_outputs(places_geo: Dict[str, List[Dict]]) -> Tuple[GridIndex, Dict]:
+    """Group mentions by place into a spatial index and a GeoJSON collection."""
+    by_place: Dict[str, Dict] = {}
+    for vid, located in sorted(places_geo.items()):
+        for loc in located:
+            entry = by_place.setdefault(loc["place"], {"lat": loc["lat"], "lon": loc["lon"], "videos": []})
+            if vid not in entry["videos"]:
+                entry["videos"].append(vid)
+    index = GridIndex()
+    features = []
+    for name, entry in sorted(by_place.items()):
+        index.add(entry["lat"], entry["lon"], {"place": name, "videos": entry["videos"]})
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [entry["lon"], entry["lat"]]},
+            "properties": {"name": name, "videos": entry["videos"]},
+        })
+    return index, {"type": "FeatureCollection", "features": features}
+
+
+def map_videos(base: Path, only: str | None, jobs: int, keep: Keep | None = None) -> Dict:
+    """Claims and year mentions of the selected videos: one partial output."""
+    out = {}
+    mentions = {}
+    with CorpusBuffer.from_transcripts(base, only, keep) as corpus:
+        for span, (counts, years, rows) in map_texts(partial(classify, base=base), corpus, jobs):
+            years = years.tolist()
+            out[span.video_id] = {
+                "video_id": span.video_id,
+                "years": years,
+                "earliest": years[0] if years else None,
+                "latest": years[-1] if years else None,
+                "claims": dict(zip(CLAIM_KINDS, counts.tolist())),
+            }
+            mentions[span.video_id] = [[int(y), start, end] for y, start, end in rows.tolist()]
+    return {"claims": out, "year_mentions": mentions}
+
+
+def reduce_parts(parts: List[Dict], only: str | None = None) -> None:
+    """Write the claim, year and geo outputs from the partial outputs."""
+    out = dict(sorted((vid, res) for part in parts for vid, res in part["claims"].items()))
+    mentions = {vid: [tuple(m) for m in rows] for part in parts for vid, rows in part["year_mentions"].items()}
+    Path("data/claims_timeline.json").write_text(json.dumps(out, indent=2))
+    claims = tables.frame(
+        ({"video_id": vid, "earliest": res["earliest"], "latest": res["latest"], **res["claims"]}
+         for vid, res in out.items()),
+        tables.CLAIM_DTYPES,
+    )
+    claims["years"] = [res["years"] for res in out.values()]
+    tables.write_table(claims, tables.CLAIMS)
+    Path("data/year_index.json").write_text(json.dumps(year_index.build(mentions)))
+
+    entities_file = Path("data/entities_topics.json")
+    entities = json.loads(entities_file.read_text()) if entities_file.exists() else {}
+    if only:
+        entities = {k: v for k, v in entities.items() if k == only}
+    places_geo = geocode(entities, Gazetteer.load())
+    index, geojson = build_geo_outputs(places_geo)
+    Path("data/places_geo.json").write_text(json.dumps(places_geo, indent=2))
+    Path("data/geo_index.json").write_text(json.dumps(index.to_json()))
+    map_file = Path("static/map/places.geojson")
+    map_file.parent.mkdir(parents=True, exist_ok=True)
+    map_file.write_text(json.dumps(geojson))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--only")
+    parser.add_argument("--jobs", type=int, default=0, help="worker processes (default: CPU count, 1 = serial)")
+    shards.add_arguments(parser)
     args = parser.parse_args()
-    base = Path("transcripts")
-    out = {}
-    if base.exists():
-        for folder in base.iterdir():
-            if not folder.is_dir():
-                continue
-            vid = folder.name
-            if args.only and vid != args.only:
-                continue
-            res = analyze(vid, folder)
-            if res:
-                out[vid] = res
-    Path("data/claims_timeline.json").write_text(json.dumps(out, indent=2))
+    shards.run("claims", args, partial(map_videos, Path("transcripts"), args.only, args.jobs),
+               partial(reduce_parts, only=args.only))
 
 
 if __name__ == "__main__":
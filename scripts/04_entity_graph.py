@@ -0,0 +1,86 @@
+"""Rank entities by PageRank over their co-occurrence within segment windows.
+
+The canonical names from ``data/entities_topics.json`` and their aliases from
+``data/entity_aliases.json`` are found in each video's segments in one
+matcher pass. Segments are grouped into ``--window``-second windows, and
+entities named in the same window are linked. The ranked graph is written to
+``data/entity_graph.json`` (see :mod:`utils.entity_graph`). When the site's
+``static/`` directory exists, a copy goes to ``static/data/`` as well.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+from utils import entity_graph, tables
+from utils.entity_resolution import load_aliases
+from utils.text_helpers import TermMatcher
+
+KINDS = ("people", "orgs", "places")
+SEP = "\t"
+
+
+def entity_terms(entities: Dict[str, Dict], aliases: Dict[str, Dict[str, str]]) -> Dict[str, Set[str]]:
+    """Surface forms to look for, keyed by ``kind<TAB>canonical name``."""
+    forms: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+    for groups in entities.values():
+        for kind in KINDS:
+            for name in groups.get(kind, []):
+                forms[(kind, name)].add(name)
+    for kind, table in aliases.items():
+        for alias, canonical in table.items():
+            if (kind, canonical) in forms:
+                forms[(kind, canonical)].add(alias)
+    return {f"{kind}{SEP}{name}": terms for (kind, name), terms in forms.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--window", type=float, default=60.0, help="co-occurrence window in seconds")
+    parser.add_argument("--damping", type=float, default=0.85)
+    args = parser.parse_args()
+
+    entities_file = Path("data/entities_topics.json")
+    if not entities_file.exists() or not tables.SEGMENTS.exists():
+        return
+    entities = json.loads(entities_file.read_text())
+    listed = {vid: {(kind, name) for kind in KINDS for name in groups.get(kind, [])}
+              for vid, groups in entities.items()}
+    matcher = TermMatcher(entity_terms(entities, load_aliases()))
+
+    segments = tables.read_table(tables.SEGMENTS, columns=["video_id", "start", "text"])
+    windows: Dict[Tuple[str, int], Set[Tuple[str, str]]] = defaultdict(set)
+    mentions: Counter = Counter()
+    for vid, start, text in zip(segments["video_id"], segments["start"], segments["text"]):
+        allowed = listed.get(vid)
+        if not allowed:
+            continue
+        window = windows[(vid, int(start // args.window))]
+        # "Bob Lazar" also contains the alias "Lazar"; count the span once.
+        covered: Dict[Tuple[str, str], int] = {}
+        for hit in matcher.finditer(text):
+            for lexicon in hit.lexicons:
+                key = tuple(lexicon.split(SEP, 1))
+                if key not in allowed or hit.start < covered.get(key, -1):
+                    continue
+                covered[key] = hit.end
+                mentions[key] += 1
+                window.add(key)
+
+    videos = Counter(key for keys in listed.values() for key in keys)
+    graph = entity_graph.build(windows.values(), mentions, videos, args.damping)
+    graph["window_seconds"] = args.window
+    payload = json.dumps(graph, separators=(",", ":"), ensure_ascii=False)
+    Path("data/entity_graph.json").write_text(payload)
+    site = Path("static")
+    if site.is_dir():
+        (site / "data").mkdir(exist_ok=True)
+        (site / "data" / "entity_graph.json").write_text(payload)
+    print(f"entity graph: {len(graph['nodes'])} entities, {len(graph['edges'])} edges")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compile the autocomplete index for entities, video titles and topics.
+
+Reads ``data/transcripts_index.json`` from ``05_build_index``. Weights come
+from mention frequency:
+- People, organizations and places use their mention counts from
+  ``data/entity_graph.json``. Before ``04_entity_graph`` has run, they use
+  the number of videos naming them.
+- Topics and keywords use the number of videos they are assigned to.
+- A title has no mentions of its own, so it gets the summed weight of the
+  entities its video names.
+
+The packed index (see :mod:`utils.autocomplete`) goes to
+``data/autocomplete.json``. When the site's ``static/`` directory exists, a
+copy goes to ``static/data/`` so pages can fetch it on first keystroke.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+
+from utils.autocomplete import INDEX, Completer, Completion, pack, write
+
+ENTITY_KINDS = ("people", "orgs", "places")
+
+
+def entity_weights(index: list) -> Counter:
+    """Weight of each ``(kind, name)``: corpus mentions, or videos naming it as a fallback."""
+    weights: Counter = Counter()
+    graph_file = Path("data/entity_graph.json")
+    if graph_file.exists():
+        for kind, name, _, mentions, _ in json.loads(graph_file.read_text())["nodes"]:
+            weights[(kind, name)] = mentions
+    for entry in index:
+        for kind in ENTITY_KINDS:
+            for name in entry.get(kind) or []:
+                weights.setdefault((kind, name), 0)
+                if not graph_file.exists():
+                    weights[(kind, name)] += 1
+    return weights
+
+
+def completions(index: list) -> list:
+    entities = entity_weights(index)
+    items = [Completion(name, kind, max(weight, 1), "") for (kind, name), weight in entities.items()]
+    topics = Counter((t["label"], t["id"]) for entry in index for t in entry.get("topics") or [])
+    keywords = Counter(k for entry in index for k in entry.get("keywords_top") or [])
+    items.extend(Completion(label, "topics", n, topic) for (label, topic), n in topics.items())
+    items.extend(Completion(k, "keywords", n, "") for k, n in keywords.items())
+    for entry in index:
+        title = (entry.get("title") or "").strip()
+        if not title:
+            continue
+        weight = sum(entities[(kind, name)] for kind in ENTITY_KINDS for name in entry.get(kind) or [])
+        items.append(Completion(title, "titles", max(weight, 1), entry["video_id"]))
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", help="print the completions for this prefix after building")
+    args = parser.parse_args()
+    index_file = Path("data/transcripts_index.json")
+    if not index_file.exists():
+        return
+    index = json.loads(index_file.read_text()).get("videos", [])
+    packed = pack(completions(index))
+    payload = write(packed, INDEX)
+    site = Path("static")
+    if site.is_dir():
+        write(packed, site / "data" / INDEX.name)
+    print(f"autocomplete: {len(packed['entries'])} entries, {len(packed['keys'])} keys, "
+          f"{len(payload.encode('utf-8')) // 1024} KiB")
+    if args.query:
+        for hit in Completer(packed).complete(args.query):
+            print(f"{hit.weight:>6}  {hit.kind:<9} {hit.label}")
+
+
+if __name__ == "__main__":
+    main()
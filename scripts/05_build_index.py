@@ -2,41 +2,90 @@
 from __future__ import annotations
 
 import argparse
-import csv
 import json
 from pathlib import Path
 
+import pandas as pd
 
-def load_metrics() -> dict:
+from utils import tables
+
+ENTITY_KINDS = ["people", "orgs", "places", "keywords_top"]
+CLAIM_COUNTS = ["assertion", "question", "speculation"]
+
+
+def load_metrics() -> pd.DataFrame:
+    if tables.METRICS.exists():
+        return tables.read_table(tables.METRICS)
     path = Path("data/metrics.csv")
     if not path.exists():
-        return {}
-    with path.open() as f:
-        reader = csv.DictReader(f)
-        return {r['video_id']: r for r in reader}
+        return tables.frame([], tables.METRICS_DTYPES)
+    return pd.read_csv(path).astype(tables.METRICS_DTYPES)
+
+
+def load_entities() -> pd.DataFrame:
+    """One row per video with a list column per entity kind."""
+    if not tables.ENTITY_MENTIONS.exists():
+        return pd.DataFrame(columns=["video_id", *ENTITY_KINDS])
+    mentions = tables.read_table(tables.ENTITY_MENTIONS).astype({"name": object})
+    # Group order follows row order, which keeps names sorted and keywords ranked.
+    grouped = mentions.groupby(["video_id", "kind"], sort=False)["name"].agg(list).unstack("kind")
+    grouped = grouped.reindex(columns=ENTITY_KINDS).astype(object)
+    for kind in ENTITY_KINDS:
+        grouped[kind] = [v if isinstance(v, list) else [] for v in grouped[kind]]
+    return grouped.reset_index()
+
+
+def load_topics() -> pd.DataFrame:
+    """One row per video with its main topics from ``03_topic_model`` as ``{"id", "label"}``."""
+    path = Path("data/topics.json")
+    if not path.exists():
+        return pd.DataFrame(columns=["video_id", "topics"])
+    data = json.loads(path.read_text())
+    topics = [{"id": t["id"], "label": t["label"]} for t in data["topics"]]
+    rows = [{"video_id": vid, "topics": [topics[t] for t, _ in pairs]} for vid, pairs in data["videos"].items()]
+    return pd.DataFrame(rows, columns=["video_id", "topics"])
+
+
+def load_claims() -> pd.DataFrame:
+    if not tables.CLAIMS.exists():
+        return pd.DataFrame(columns=["video_id", "years", "earliest", "latest", *CLAIM_COUNTS])
+    return tables.read_table(tables.CLAIMS)
+
+
+def _present(df: pd.DataFrame, flag: str) -> pd.DataFrame:
+    """Mark rows that exist before a left join; ints become nullable so gaps stay ints."""
+    ints = {c: "Int64" for c, t in df.dtypes.items() if t == "int64"}
+    return df.astype(ints).assign(**{flag: True})
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--only")
     args = parser.parse_args()
-    videos = json.loads(Path("data/videos.json").read_text())
-    metrics = load_metrics()
-    entities = json.loads(Path("data/entities_topics.json").read_text())
-    claims = json.loads(Path("data/claims_timeline.json").read_text())
+    videos = pd.DataFrame(json.loads(Path("data/videos.json").read_text()))
+    if args.only:
+        videos = videos[videos["video_id"] == args.only]
+    merged = (
+        videos
+        .merge(_present(load_metrics(), "_metrics"), on="video_id", how="left")
+        .merge(_present(load_entities(), "_entities"), on="video_id", how="left")
+        .merge(_present(load_claims(), "_claims"), on="video_id", how="left")
+        .merge(_present(load_topics(), "_topics"), on="video_id", how="left")
+    )
+    sections = {
+        "_metrics": [c for c in tables.METRICS_DTYPES if c != "video_id"],
+        "_entities": ENTITY_KINDS,
+        "_claims": ["years", "earliest", "latest", *CLAIM_COUNTS],
+        "_topics": ["topics"],
+    }
     index = []
-    for vid_meta in videos:
-        vid = vid_meta["video_id"]
-        if args.only and vid != args.only:
-            continue
-        entry = {"video_id": vid, **vid_meta}
-        if vid in metrics:
-            entry.update(metrics[vid])
-        if vid in entities:
-            entry.update(entities[vid])
-        if vid in claims:
-            entry.update({"years": claims[vid]["years"], "earliest": claims[vid]["earliest"], "latest": claims[vid]["latest"]})
-            entry["claims"] = claims[vid]["claims"]
+    for entry in json.loads(merged.to_json(orient="records")):
+        for flag, columns in sections.items():
+            if not entry.pop(flag):
+                for col in columns:
+                    entry.pop(col, None)
+        if "years" in entry:
+            entry["claims"] = {k: entry.pop(k) for k in CLAIM_COUNTS}
         index.append(entry)
     Path("data/transcripts_index.json").write_text(json.dumps({"videos": index}, indent=2))
 
@@ -6,9 +6,13 @@ and data/videos.json.
 Outputs:
 - docs/index.md
 - docs/videos/<id>--<slug>.md
-- docs/entities/people/<slug>.md
-- docs/entities/places/<slug>.md
-- docs/entities/topics/<slug>.md
+- docs/entity-index/people/<slug>.md
+- docs/entity-index/places/<slug>.md
+- docs/entity-index/topics/<slug>.md
+
+Entity pages go to ``entity-index/`` because ``docs/entities/`` belongs to
+``build_entities.py``, whose sink manifest would otherwise prune or
+overwrite them.
 """
 
 from __future__ import annotations
@@ -24,17 +28,21 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 from scripts.common import (
     DATA_DIR,
     DOCS_DIR,
+    REPO_ROOT,
+    Segment,
     read_json,
-    write_text,
     slugify,
     safe_filename,
     hhmmss,
     read_segments_csv,
     rel,
 )
+from scripts.utils.output_sink import OutputSink
+from scripts.utils.render import render_pages
 
 INDEX_JSON = DATA_DIR / "transcripts_index.json"
 FALLBACK_VIDEOS_JSON = DATA_DIR / "videos.json"
+ENTITY_DIR = "entity-index"
 
 
 def _nice_label(slug: str) -> str:
@@ -106,7 +114,7 @@ def load_index() -> List[Video]:
     return videos
 
 
-def build_index_page(videos: List[Video]) -> None:
+def build_index_page(videos: List[Video], sink: OutputSink) -> None:
     rows = []
     rows.append("| Title | Date | Duration | People | Places |")
     rows.append("|---|---|---:|---|---|")
@@ -117,12 +125,12 @@ def build_index_page(videos: List[Video]) -> None:
         people_cells = []
         for p in v.people:
             slug = p.split(":",1)[-1]
-            people_cells.append(f"[{_nice_label(slug)}](./entities/people/{slug}.md)")
+            people_cells.append(f"[{_nice_label(slug)}](./{ENTITY_DIR}/people/{slug}.md)")
         people = ", ".join(people_cells) or ""
         place_cells = []
         for p in v.locations:
             slug = p.split(":",1)[-1]
-            place_cells.append(f"[{_nice_label(slug)}](./entities/places/{slug}.md)")
+            place_cells.append(f"[{_nice_label(slug)}](./{ENTITY_DIR}/places/{slug}.md)")
         places = ", ".join(place_cells) or ""
         rows.append(f"| [{v.title}](./videos/{pf}) | {date} | {dur} | {people} | {places} |")
 
@@ -138,112 +146,113 @@ def build_index_page(videos: List[Video]) -> None:
         *rows,
         "",
     ])
-    write_text(DOCS_DIR / "index.md", body)
+    sink.write_text("index.md", body)
+
+
+def load_segments(v: Video) -> List[Segment]:
+    seg_path = v.paths.get("segments_csv")
+    return read_segments_csv(REPO_ROOT / seg_path) if seg_path else []
+
+
+def video_page(context: None, v: Video, segs: List[Segment]) -> str:
+    # Segment table, if any
+    seg_table = ""
+    if segs:
+        lines = []
+        lines.append("| Start | End | Excerpt |")
+        lines.append("|---:|---:|---|")
+        # Cap to 200 rows to keep pages snappy
+        for s in segs[:200]:
+            lines.append(f"| {hhmmss(s.t_start)} | {hhmmss(s.t_end)} | {s.excerpt()} |")
+        seg_table = "\n".join(lines)
+
+    # Transcript file links
+    links = []
+    if v.paths.get("clean_md"):
+        links.append(f"- Clean transcript: `{v.paths['clean_md']}`")
+    if v.paths.get("timecoded_md"):
+        links.append(f"- Timecoded transcript: `{v.paths['timecoded_md']}`")
+    if v.paths.get("segments_csv"):
+        links.append(f"- Segments CSV: `{v.paths['segments_csv']}`")
+    if v.links.get("youtube"):
+        links.append(f"- YouTube: {v.links['youtube']}")
+
+    # Entities
+    people_links = []
+    for p in v.people:
+        slug = p.split(":",1)[-1]
+        people_links.append(f"[{_nice_label(slug)}](../{ENTITY_DIR}/people/{slug}.md)")
+    place_links = []
+    for p in v.locations:
+        slug = p.split(":",1)[-1]
+        place_links.append(f"[{_nice_label(slug)}](../{ENTITY_DIR}/places/{slug}.md)")
+    topic_links  = [f"[{t}](../{ENTITY_DIR}/topics/{slugify(t)}.md)" for t in v.tags if ":" not in t]
+
+    # Front matter and body
+    escaped_title = v.title.replace('"', '\\"')
+    fm = [
+        "---",
+        f"id: {v.id}",
+        f'title: "{escaped_title}",'
+        f"published_at: {v.published_at or ''}",
+        f"duration: {v.duration or ''}",
+        f"tags: {v.tags!r}",
+        "---",
+        "",
+    ]
+    body = []
+    body.append(f"# {v.title}")
+    body.append("")
+    if v.links.get("youtube"):
+        body.append(f"[Open on YouTube]({v.links['youtube']})")
+        body.append("")
+    if people_links or place_links or topic_links:
+        body.append("**Entities**:")
+        if people_links:
+            body.append(f"- People: {', '.join(people_links)}")
+        if place_links:
+            body.append(f"- Places: {', '.join(place_links)}")
+        if topic_links:
+            body.append(f"- Topics: {', '.join(topic_links)}")
+        body.append("")
+    if links:
+        body.append("**Files and Links**:")
+        body.extend(links)
+        body.append("")
+    if seg_table:
+        body.append("## Segments")
+        body.append("")
+        body.append(seg_table)
+        body.append("")
 
+    return "\n".join(fm + body)
 
-def build_video_pages(videos: List[Video]) -> Dict[str, List[Tuple[str, str]]]:
+
+def build_video_pages(videos: List[Video], sink: OutputSink, jobs: int = 0) -> Dict[str, List[Tuple[str, str]]]:
     """
     Returns an entity->list of (video_filename, video_title) for building entity pages later.
     Keys use namespace "people:<slug>", "places:<slug>", "topics:<slug>".
     """
     index_for_entities: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
 
-    for v in videos:
+    for v, page in zip(videos, render_pages(video_page, videos, load=load_segments, jobs=jobs)):
         pf = v.page_filename
-        # Segment table, if any
-        seg_table = ""
-        seg_path = v.paths.get("segments_csv")
-        if seg_path:
-            from scripts.common import REPO_ROOT
-            segs = read_segments_csv(REPO_ROOT / seg_path)
-            if segs:
-                lines = []
-                lines.append("| Start | End | Excerpt |")
-                lines.append("|---:|---:|---|")
-                # Cap to 200 rows to keep pages snappy
-                for s in segs[:200]:
-                    lines.append(f"| {hhmmss(s.t_start)} | {hhmmss(s.t_end)} | {s.excerpt()} |")
-                seg_table = "\n".join(lines)
-
-        # Transcript file links
-        links = []
-        if v.paths.get("clean_md"):
-            links.append(f"- Clean transcript: `{v.paths['clean_md']}`")
-        if v.paths.get("timecoded_md"):
-            links.append(f"- Timecoded transcript: `{v.paths['timecoded_md']}`")
-        if v.paths.get("segments_csv"):
-            links.append(f"- Segments CSV: `{v.paths['segments_csv']}`")
-        if v.links.get("youtube"):
-            links.append(f"- YouTube: {v.links['youtube']}")
-
-        # Entities
-        people_links = []
-        for p in v.people:
-            slug = p.split(":",1)[-1]
-            people_links.append(f"[{_nice_label(slug)}](../entities/people/{slug}.md)")
-        place_links = []
-        for p in v.locations:
-            slug = p.split(":",1)[-1]
-            place_links.append(f"[{_nice_label(slug)}](../entities/places/{slug}.md)")
-        topic_links  = [f"[{t}](../entities/topics/{slugify(t)}.md)" for t in v.tags if ":" not in t]
-
         # Aggregate for entity pages
         for ns, slug, disp in v.entity_triplets():
             key = f"{ns}:{slug}"
             index_for_entities[key].append((pf, v.title))
-
-        # Front matter and body
-        escaped_title = v.title.replace('"', '\\"')
-        fm = [
-            "---",
-            f"id: {v.id}",
-            f'title: "{escaped_title}",'
-            f"published_at: {v.published_at or ''}",
-            f"duration: {v.duration or ''}",
-            f"tags: {v.tags!r}",
-            "---",
-            "",
-        ]
-        body = []
-        body.append(f"# {v.title}")
-        body.append("")
-        if v.links.get("youtube"):
-            body.append(f"[Open on YouTube]({v.links['youtube']})")
-            body.append("")
-        if people_links or place_links or topic_links:
-            body.append("**Entities**:")
-            if people_links:
-                body.append(f"- People: {', '.join(people_links)}")
-            if place_links:
-                body.append(f"- Places: {', '.join(place_links)}")
-            if topic_links:
-                body.append(f"- Topics: {', '.join(topic_links)}")
-            body.append("")
-        if links:
-            body.append("**Files and Links**:")
-            body.extend(links)
-            body.append("")
-        if seg_table:
-            body.append("## Segments")
-            body.append("")
-            body.append(seg_table)
-            body.append("")
-
-        write_text(DOCS_DIR / "videos" / pf, "\n".join(fm + body))
+        sink.write_text(f"videos/{pf}", page)
 
     return index_for_entities
 
 
-def build_entity_pages(entity_index: Dict[str, List[Tuple[str, str]]]) -> None:
+def build_entity_pages(entity_index: Dict[str, List[Tuple[str, str]]], sink: OutputSink) -> None:
     """
     entity_index maps "people:slug" or "places:slug" or "topics:slug" -> list[(video_file, video_title)]
     """
     for key, refs in sorted(entity_index.items()):
         ns, slug = key.split(":", 1)
         title = _nice_label(slug) if ns != "topics" else slug.replace("-", " ")
-        folder = DOCS_DIR / "entities" / ns
-        folder.mkdir(parents=True, exist_ok=True)
-
         rows = []
         rows.append("| Video | Link |")
         rows.append("|---|---|")
@@ -260,7 +269,7 @@ def build_entity_pages(entity_index: Dict[str, List[Tuple[str, str]]]) -> None:
         ]
 
         body = [f"# {title}", "", "## Related Videos", "", *rows, ""]
-        write_text(folder / f"{slug}.md", "\n".join(fm + body))
+        sink.write_text(f"{ENTITY_DIR}/{ns}/{slug}.md", "\n".join(fm + body))
 
 
 def main() -> None:
@@ -268,10 +277,11 @@ def main() -> None:
     if not videos:
         print("No videos found. Did you run scripts/scan_transcripts.py?")
         return
-    build_index_page(videos)
-    entity_index = build_video_pages(videos)
-    build_entity_pages(entity_index)
-    print(f"Pages built under {rel(DOCS_DIR)}")
+    with OutputSink(DOCS_DIR, name="pages") as sink:
+        build_index_page(videos, sink)
+        entity_index = build_video_pages(videos, sink)
+        build_entity_pages(entity_index, sink)
+    print(f"Pages built under {rel(DOCS_DIR)}: {sink.summary()}")
 
 
 if __name__ == "__main__":
@@ -5,11 +5,16 @@ import argparse
 import json
 import re
 from collections import defaultdict
+from itertools import groupby
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import subprocess
 
+from utils.entity_graph import EntityGraph
+from utils.output_sink import OutputSink
+from utils.render import render_pages
 from utils.timecode import to_hms
+from utils.year_index import YearIndex
 
 SAFE_RE = re.compile(r"[^A-Za-z0-9_-]+")
 
@@ -22,24 +27,96 @@ def link_entity(name: str, kind: str) -> str:
     return f"[{name}](entities/{kind}/{safe_name(name)})"
 
 
-def link_topic(keyword: str) -> str:
-    return f"[{keyword}]({safe_name(keyword)})"
+def link_topic(page: str, title: str) -> str:
+    return f"[{title}]({page})"
+
+
+def entry_topics(entry: Dict) -> List[Tuple[str, str]]:
+    """``(page, title)`` of the topic pages a video belongs to.
+
+    Model topics are keyed by their stable id (``topic-07``) and titled with
+    their current label. Before 03_topic_model has run, the top keywords are
+    the topics and name their own pages.
+    """
+    if "topics" in entry:
+        return [(t["id"], t["label"]) for t in entry["topics"]]
+    return [(safe_name(kw), kw) for kw in entry.get("keywords_top", [])]
+
+
+def topic_links(entry: Dict) -> str:
+    return ", ".join(link_topic(page, title) for page, title in entry_topics(entry))
+
+
+def keyword_list(entry: Dict) -> str:
+    # Keywords only link to topic pages while they are the topics.
+    return ", ".join(entry.get("keywords_top", [])) if "topics" in entry else topic_links(entry)
 
 
 def info_box(entry: Dict, url: str) -> List[str]:
     """Return a small summary box similar to a wiki infobox."""
+    topics = [f"| Topics | {topic_links(entry)} |"] if "topics" in entry else []
     return [
         "## Info",
         "| Key | Value |",
         "|---|---|",
         f"| Date | {entry.get('date', 'N/A')} |",
         f"| Duration | {to_hms(float(entry.get('duration_covered', 0)))} |",
-        f"| Top keywords | {', '.join(link_topic(k) for k in entry.get('keywords_top', []))} |",
+        *topics,
+        f"| Top keywords | {keyword_list(entry)} |",
         f"| YouTube | [{url}]({url}) |",
         "",
     ]
 
 
+def load_inputs(entry: Dict) -> Dict:
+    """Read the per-video files a page embeds: clean transcript, metric series and summary."""
+    vid = entry["video_id"]
+    transcript_clean = Path(f"transcripts/{vid}/{vid}.clean.md")
+    series_file = Path(f"data/series/{vid}.json")
+    summary_file = Path(f"data/summaries/{vid}.json")
+    return {
+        "transcript": transcript_clean.read_text() if transcript_clean.exists() else None,
+        "series": json.loads(series_file.read_text()) if series_file.exists() else None,
+        "summary": json.loads(summary_file.read_text()) if summary_file.exists() else None,
+    }
+
+
+def summary_lines(vid: str, summary: Dict | None) -> List[str]:
+    """Render the ``02_summarize`` sentences as a list linking each to its moment in the video."""
+    if not summary or not summary.get("sentences"):
+        return ["> **Note:** Summary coming soon.", ""]
+    lines = []
+    for sentence in summary["sentences"]:
+        start = sentence.get("start")
+        if start is None:
+            lines.append(f"- {sentence['text']}")
+        else:
+            stamp = f"[{to_hms(start)}](https://www.youtube.com/watch?v={vid}&t={int(start)}s)"
+            lines.append(f"- {stamp} {sentence['text']}")
+    lines.append("")
+    return lines
+
+
+def series_charts(series: Dict | None) -> List[str]:
+    """Render the per-window series from ``02_metrics --window`` as Mermaid charts."""
+    if not series:
+        return []
+    minutes = ", ".join(str(round(t / 60)) for t in series["t"])
+    lines = []
+    for key, label in (("wpm", "Words per minute"), ("sentiment", "Sentiment")):
+        values = ", ".join(str(v if v is not None else 0) for v in series[key])
+        lines.extend([
+            "```mermaid",
+            "xychart-beta",
+            f'    title "{label}"',
+            f'    x-axis "Minute" [{minutes}]',
+            f"    line [{values}]",
+            "```",
+            "",
+        ])
+    return lines
+
+
 def build_backlinks(entry: Dict, entity_map: Dict[str, Dict[str, List[Dict]]], topic_map: Dict[str, List[Dict]],
                     name_map: Dict[str, str], title_map: Dict[str, str]) -> List[str]:
     vid = entry["video_id"]
@@ -49,28 +126,30 @@ def build_backlinks(entry: Dict, entity_map: Dict[str, Dict[str, List[Dict]]], t
             for other in entity_map[kind][name]:
                 if other["video_id"] != vid:
                     referenced.add(other["video_id"])
-    for kw in entry.get("keywords_top", []):
-        for other in topic_map[kw]:
+    for page, _ in entry_topics(entry):
+        for other in topic_map[page]:
             if other["video_id"] != vid:
                 referenced.add(other["video_id"])
     if not referenced:
         return []
     lines = ["## Referenced by", ""]
     for ref in sorted(referenced):
-        lines.append(f"- [{title_map.get(ref, ref)}]({name_map.get(ref, safe_name(ref))})")
+        name = name_map[ref] if ref in name_map else safe_name(ref)
+        lines.append(f"- [{title_map.get(ref, ref)}]({name})")
     lines.append("")
     return lines
 
 
 def page_content(entry: Dict, entity_map: Dict[str, Dict[str, List[Dict]]], topic_map: Dict[str, List[Dict]],
-                 name_map: Dict[str, str], title_map: Dict[str, str]) -> str:
+                 name_map: Dict[str, str], title_map: Dict[str, str], inputs: Dict | None = None) -> str:
     vid = entry["video_id"]
     html_embed = entry.get("html_embed", "")
     url = entry.get("url", f"https://www.youtube.com/watch?v={vid}")
-    transcript_clean = Path(f"transcripts/{vid}/{vid}.clean.md")
+    if inputs is None:
+        inputs = load_inputs(entry)
+    transcript_text = inputs["transcript"]
     transcript_section: list[str]
-    if transcript_clean.exists():
-        transcript_text = transcript_clean.read_text()
+    if transcript_text is not None:
         transcript_section = [
             "## Transcript",
             "<details><summary>Show transcript</summary>",
@@ -102,14 +181,14 @@ def page_content(entry: Dict, entity_map: Dict[str, Dict[str, List[Dict]]], topi
         f"[![Watch on YouTube](https://img.youtube.com/vi/{vid}/0.jpg)]({url})",
         "",
         "## TL;DR",
-        "> **Note:** Summary coming soon.",
-        "",
+        *summary_lines(vid, inputs.get("summary")),
         "## Statistics",
         f"- Duration covered: {to_hms(float(entry.get('duration_covered',0)))}",
         f"- Words: {entry.get('words','0')} · WPM: {entry.get('wpm','0')} · FK Grade: {entry.get('fk_grade','0')}",
         f"- Sentences: {entry.get('sentences','0')} · Questions: {entry.get('questions_count','0')}",
         f"- Hedges: {entry.get('hedge_terms_count','0')} · Uncertainty: {entry.get('uncertainty_markers_count','0')}",
         "",
+        *series_charts(inputs["series"]),
         "## Entities",
         f"- **People:** {people_links}",
         f"- **Organizations:** {org_links}",
@@ -120,8 +199,9 @@ def page_content(entry: Dict, entity_map: Dict[str, Dict[str, List[Dict]]], topi
         (f" (earliest: {entry.get('earliest')})" if entry.get('earliest') else "") +
         (f" (latest: {entry.get('latest')})" if entry.get('latest') else ""),
         "",
+        *(["## Topics", topic_links(entry), ""] if "topics" in entry else []),
         "## Top Keywords",
-        ", ".join(link_topic(k) for k in entry.get("keywords_top", [])),
+        keyword_list(entry),
         "",
         "## Files",
         f"- Clean transcript: `transcripts/{vid}/{vid}.clean.md`",
@@ -134,14 +214,16 @@ def page_content(entry: Dict, entity_map: Dict[str, Dict[str, List[Dict]]], topi
     return "\n".join(lines)
 
 
-def build_entity_pages(entity_map: Dict[str, Dict[str, List[Dict]]], topic_map: Dict[str, List[Dict]], out_dir: Path,
-                       name_map: Dict[str, str], title_map: Dict[str, str]) -> List[str]:
-    base = out_dir / "entities"
+def render_page(context: tuple, entry: Dict, inputs: Dict) -> str:
+    return page_content(entry, *context, inputs)
+
+
+def build_entity_pages(entity_map: Dict[str, Dict[str, List[Dict]]], topic_map: Dict[str, List[Dict]], sink: OutputSink,
+                       name_map: Dict[str, str], title_map: Dict[str, str],
+                       graph: EntityGraph | None = None, top_n: int = 50,
+                       topic_kind: str = "keywords", topic_titles: Dict[str, str] | None = None) -> List[str]:
+    topic_titles = topic_titles or {}
     for kind, mapping in entity_map.items():
-        kind_dir = base / kind
-        if not mapping:
-            continue
-        kind_dir.mkdir(parents=True, exist_ok=True)
         for name, entries in mapping.items():
             lines = [f"# {name}", "", "Referenced in:", ""]
             for e in sorted(entries, key=lambda x: x.get("title", x["video_id"])):
@@ -155,32 +237,88 @@ def build_entity_pages(entity_map: Dict[str, Dict[str, List[Dict]]], topic_map:
                 lines.append(
                     f"- [{title_map.get(vid, vid)}](../../{name_map[vid]})"
                 )
-            (kind_dir / f"{safe_name(name)}.md").write_text("\n".join(lines) + "\n")
+            related = [(n, w) for n, w in (graph.neighbors(kind, name) if graph else [])
+                       if n.name in entity_map.get(n.kind, {})][:10]
+            if related:
+                lines.extend(["", "Often mentioned with:", ""])
+                lines.extend(f"- [{n.name}](../{n.kind}/{safe_name(n.name)}) ({w} shared windows)" for n, w in related)
+            sink.write_text(f"entities/{kind}/{safe_name(name)}.md", "\n".join(lines) + "\n")
 
     topic_names: List[str] = []
-    for kw, entries in sorted(topic_map.items()):
-        topic_names.append(kw)
-        lines = [f"# {kw}", "", "Referenced in:", ""]
+    for page, entries in sorted(topic_map.items()):
+        topic_names.append(page)
+        lines = [f"# {topic_titles.get(page, page)}", "", "Referenced in:", ""]
         for e in sorted(entries, key=lambda x: x.get("title", x["video_id"])):
             vid = e["video_id"]
             lines.append(f"- [{title_map.get(vid, vid)}]({name_map[vid]})")
-        (out_dir / f"{safe_name(kw)}.md").write_text("\n".join(lines) + "\n")
-
-    if topic_names:
-        index_lines = ["# Topics", "", "List of keywords:", ""]
-        for kw in sorted(topic_names):
-            index_lines.append(f"- [{kw}]({safe_name(kw)})")
-        (out_dir / "Topics.md").write_text("\n".join(index_lines) + "\n")
+        sink.write_text(f"{page}.md", "\n".join(lines) + "\n")
+
+    ranked = [n for n in graph.ranked() if n.name in entity_map.get(n.kind, {})][:top_n] if graph else []
+    if topic_names or ranked:
+        index_lines = ["# Topics", ""]
+        if ranked:
+            index_lines.extend(["## Most connected entities", "", "Ranked by PageRank over co-mentions:", ""])
+            for pos, n in enumerate(ranked, start=1):
+                index_lines.append(f"{pos}. [{n.name}](entities/{n.kind}/{safe_name(n.name)}) "
+                                   f"({n.kind}, {n.mentions} mentions in {n.videos} videos)")
+            index_lines.extend(["", f"## {topic_kind.capitalize()}", ""])
+        index_lines.extend([f"List of {topic_kind}:", ""])
+        for page in sorted(topic_names, key=lambda p: (topic_titles.get(p, p), p)):
+            index_lines.append(f"- {link_topic(page, topic_titles.get(page, page))}")
+        sink.write_text("Topics.md", "\n".join(index_lines) + "\n")
 
     return topic_names
 
 
-def build_pages(index: Path, out_dir: Path, only: str | None = None) -> None:
+def build_year_pages(year_index: Path, sink: OutputSink, name_map: Dict[str, str],
+                     title_map: Dict[str, str]) -> List[int]:
+    """Write one page per referenced year with timestamped links to each mention."""
+    if not year_index.exists():
+        return []
+    index = YearIndex.load(year_index)
+    written: List[int] = []
+    for year in index.years():
+        lines = [f"# {year}", "", "Mentioned in:", ""]
+        listed = set()
+        for vid, mentions in groupby(index.range(year, year), key=lambda m: m.video_id):
+            if vid not in name_map:
+                continue
+            starts = dict.fromkeys(m.start for m in mentions)
+            stamps = ", ".join(
+                f"[{to_hms(t)}](https://www.youtube.com/watch?v={vid}&t={int(t)}s)" for t in starts
+            )
+            lines.append(f"- [{title_map[vid]}](../{name_map[vid]}): {stamps}")
+            listed.add(vid)
+        if not listed:
+            continue
+        # Videos that reference years on both sides without naming this one.
+        spanning = [vid for vid in index.stab(year) if vid in name_map and vid not in listed]
+        if spanning:
+            lines.extend(["", "Also within the referenced period of:", ""])
+            lines.extend(f"- [{title_map[vid]}](../{name_map[vid]})" for vid in spanning)
+        sink.write_text(f"years/{year}.md", "\n".join(lines) + "\n")
+        written.append(year)
+
+    if written:
+        index_lines = ["# Years", "", "Referenced years:", ""]
+        index_lines.extend(f"- [{year}](years/{year})" for year in written)
+        sink.write_text("Years.md", "\n".join(index_lines) + "\n")
+    return written
+
+
+def build_pages(index: Path, out_dir: Path, only: str | None = None, jobs: int = 0) -> None:
     data = json.loads(index.read_text())
     entries = data.get("videos", data)
-    out_dir.mkdir(exist_ok=True)
+    # A partial build must not prune pages of the videos it skipped.
+    with OutputSink(out_dir, name="wiki", prune=only is None) as sink:
+        write_pages(entries, index, sink, only, jobs)
+        print(f"{out_dir}: {sink.summary()}")
+
+
+def write_pages(entries: List[Dict], index: Path, sink: OutputSink, only: str | None, jobs: int = 0) -> None:
     entity_map: Dict[str, Dict[str, List[Dict]]] = {k: defaultdict(list) for k in ("people", "orgs", "places")}
     topic_map: Dict[str, List[Dict]] = defaultdict(list)
+    topic_titles: Dict[str, str] = {}
     name_map: Dict[str, str] = {}
     title_map: Dict[str, str] = {}
     filtered: List[Dict] = []
@@ -193,19 +331,23 @@ def build_pages(index: Path, out_dir: Path, only: str | None = None) -> None:
         for kind in entity_map:
             for name in entry.get(kind, []):
                 entity_map[kind][name].append(entry)
-        for kw in entry.get("keywords_top", []):
-            topic_map[kw].append(entry)
+        for page, title in entry_topics(entry):
+            topic_map[page].append(entry)
+            topic_titles[page] = title
         filtered.append(entry)
 
     rows = []
-    for entry in filtered:
-        vid = entry["video_id"]
-        content = page_content(entry, entity_map, topic_map, name_map, title_map)
-        page_file = out_dir / f"{name_map[vid]}.md"
-        page_file.write_text(content)
+    context = (entity_map, topic_map, name_map, title_map)
+    for entry, content in zip(filtered, render_pages(render_page, filtered, context, load_inputs, jobs)):
+        sink.write_text(f"{name_map[entry['video_id']]}.md", content)
         rows.append(entry)
 
-    build_entity_pages(entity_map, topic_map, out_dir, name_map, title_map)
+    graph_file = index.parent / "entity_graph.json"
+    graph = EntityGraph.load(graph_file) if graph_file.exists() else None
+    topic_kind = "topics" if any("topics" in e for e in filtered) else "keywords"
+    build_entity_pages(entity_map, topic_map, sink, name_map, title_map, graph, topic_kind=topic_kind,
+                       topic_titles=topic_titles)
+    build_year_pages(index.parent / "year_index.json", sink, name_map, title_map)
 
     rows.sort(key=lambda x: x.get("title", ""))
 
@@ -216,14 +358,15 @@ def build_pages(index: Path, out_dir: Path, only: str | None = None) -> None:
         filename = name_map[r["video_id"]]
         sidebar_lines.append(f"- [{title}]({filename})")
     sidebar_lines.append("")
-    (out_dir / "_Sidebar.md").write_text("\n".join(sidebar_lines))
+    sink.write_text("_Sidebar.md", "\n".join(sidebar_lines))
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--only")
+    parser.add_argument("--jobs", type=int, default=0, help="render processes (default: CPU count, 1 = serial)")
     args = parser.parse_args()
-    build_pages(Path("data/transcripts_index.json"), Path("wiki_out"), args.only)
+    build_pages(Path("data/transcripts_index.json"), Path("wiki_out"), args.only, args.jobs)
     script_dir = Path(__file__).parent
     subprocess.run(["python", str(script_dir / "07_build_index_enhanced.py")], check=True)
 
@@ -3,6 +3,8 @@ import html
 import re
 from pathlib import Path
 
+from utils.output_sink import OutputSink
+
 def to_hms(seconds: float) -> str:
     seconds = int(float(seconds))
     h, m = divmod(seconds, 3600)
@@ -46,8 +48,8 @@ def build_index_page(index_path: Path, out_dir: Path) -> None:
             )
         )
     lines.append('</tbody></table>')
-    out_dir.mkdir(exist_ok=True)
-    (out_dir / 'Home.md').write_text('\n'.join(lines) + '\n')
+    with OutputSink(out_dir, name='home') as sink:
+        sink.write_text('Home.md', '\n'.join(lines) + '\n')
 
 if __name__ == '__main__':
     build_index_page(Path('data/transcripts_index.json'), Path('wiki_out'))
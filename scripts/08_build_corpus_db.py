@@ -0,0 +1,97 @@
+"""Load the analysis outputs in ``data/`` into a single SQLite query database."""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from utils import tables
+from utils.corpus_db import DB_PATH, SCHEMA
+
+METRIC_COLUMNS = [
+    "video_id", "words", "duration_covered", "wpm", "fk_grade", "sentiment_mean",
+    "sentiment_std", "questions_count", "hedge_terms_count", "uncertainty_markers_count",
+]
+CLAIM_COLUMNS = ["video_id", "earliest", "latest", "assertion", "question", "speculation"]
+
+
+def _rows(df) -> list:
+    """Plain Python tuples with missing values as ``None``."""
+    return [tuple(None if pd.isna(v) else v for v in row)
+            for row in df.astype(object).itertuples(index=False)]
+
+
+def load(conn: sqlite3.Connection, data_dir: Path) -> None:
+    videos = json.loads((data_dir / "videos.json").read_text())
+    conn.executemany(
+        "INSERT OR REPLACE INTO videos VALUES (?, ?, ?)",
+        ((v["video_id"], v.get("title"), v.get("url")) for v in videos),
+    )
+    if tables.METRICS.exists():
+        metrics = tables.read_table(tables.METRICS, columns=METRIC_COLUMNS)
+        conn.executemany(f"INSERT INTO metrics VALUES ({', '.join('?' * len(METRIC_COLUMNS))})",
+                         _rows(metrics))
+    if tables.SEGMENTS.exists():
+        segments = tables.read_table(tables.SEGMENTS, columns=["video_id", "start", "end", "text"])
+        conn.executemany('INSERT INTO segments (video_id, start, "end", text) VALUES (?, ?, ?, ?)',
+                         _rows(segments))
+        conn.execute("INSERT INTO segments_fts(segments_fts) VALUES ('rebuild')")
+    if tables.ENTITY_MENTIONS.exists():
+        mentions = tables.read_table(tables.ENTITY_MENTIONS)
+        keywords = mentions[mentions["kind"] == "keywords_top"]
+        entities = mentions[mentions["kind"] != "keywords_top"]
+        conn.executemany("INSERT INTO entity_mentions VALUES (?, ?, ?)", _rows(entities))
+        keyword_rank = keywords.groupby("video_id", sort=False).cumcount()
+        conn.executemany(
+            "INSERT INTO keywords VALUES (?, ?, ?)",
+            zip(keywords["video_id"], keyword_rank.tolist(), keywords["name"]),
+        )
+    if tables.CLAIMS.exists():
+        claims = tables.read_table(tables.CLAIMS, columns=CLAIM_COLUMNS)
+        conn.executemany("INSERT INTO claims VALUES (?, ?, ?, ?, ?, ?)", _rows(claims))
+    year_index = data_dir / "year_index.json"
+    if year_index.exists():
+        idx = json.loads(year_index.read_text())
+        conn.executemany(
+            "INSERT INTO year_mentions VALUES (?, ?, ?, ?)",
+            zip(idx["year"], (idx["videos"][v] for v in idx["video"]), idx["start"], idx["end"]),
+        )
+    for series_file in sorted((data_dir / "series").glob("*.json")):
+        series = json.loads(series_file.read_text())
+        width = series["window_s"]
+        conn.executemany(
+            "INSERT INTO sentiment_windows VALUES (?, ?, ?, ?)",
+            ((series_file.stem, t, t + width, s) for t, s in zip(series["t"], series["sentiment"])),
+        )
+
+
+def build(out: Path, data_dir: Path) -> None:
+    # Build next to the target and swap it in so readers never see a partial file.
+    tmp = out.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(SCHEMA)
+        with conn:
+            load(conn, data_dir)
+        conn.execute("ANALYZE")
+        conn.execute("INSERT INTO segments_fts(segments_fts) VALUES ('optimize')")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", type=Path, default=DB_PATH)
+    args = parser.parse_args()
+    build(args.out, Path("data"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Build the suffix-array phrase index over every clean transcript.
+
+Reads ``transcripts/<id>/<id>.clean.md`` and, when present, the matching
+``timemap.json``. Writes the memory-mapped arrays to ``data/phrase_index/``
+(see :mod:`utils.phrase_index`). Query it with ``scripts/find_phrase.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from utils.phrase_index import INDEX_DIR, build
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", type=Path, default=INDEX_DIR)
+    args = parser.parse_args()
+    base = Path("transcripts")
+    if not base.exists():
+        return
+    docs = {}
+    for clean_file in sorted(base.glob("*/*.clean.md")):
+        vid = clean_file.parent.name
+        if clean_file.name != f"{vid}.clean.md":
+            continue
+        timemap_file = clean_file.with_name(f"{vid}.timemap.json")
+        timemap = json.loads(timemap_file.read_text()) if timemap_file.exists() else None
+        docs[vid] = (clean_file.read_text(), timemap)
+    began = time.perf_counter()
+    meta = build(docs, args.out)
+    print(f"phrase index: {len(meta['videos'])} videos, {meta['bytes']} bytes "
+          f"in {time.perf_counter() - began:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
-import json, pathlib, sys
+import argparse, json, pathlib, sys
+
+from common import slugify
+from utils.entity_resolution import slug_map
+from utils.output_sink import OutputSink
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 INDEX = ROOT / "data" / "transcripts_index.json"
+ALIASES = ROOT / "data" / "entity_aliases.json"
 
 ENT_ROOT = ROOT / "docs" / "entities"
 PEOPLE = ENT_ROOT / "people"
@@ -27,33 +32,44 @@ slug: /entities/{etype}/{slug}
 {links}
 """
 
-def write_entity(etype: str, slug: str, items: list):
+def write_entity(sink: OutputSink, etype: str, slug: str, items: list):
     # items: list of (video_title, video_slug)
     links = "\n".join([f"- [{vt}](/docs/videos/{vs})" for vt, vs in items]) if items else "_No linked videos yet_"
     content = ENTITY_TEMPLATE.format(title=humanize(slug), etype=etype, slug=slug, links=links)
-    outdir = {"people": PEOPLE, "places": PLACES, "topics": TOPICS}[etype]
-    outf = outdir / f"{slug}.md"
-    prev = outf.read_text(encoding="utf-8") if outf.exists() else None
-    if prev != content:
-        outf.write_text(content, encoding="utf-8")
-        print(f"Wrote {outf.relative_to(ROOT)}")
+    outf = f"{etype}/{slug}.md"
+    if sink.write_text(outf, content):
+        print(f"Wrote {(ENT_ROOT / outf).relative_to(ROOT)}")
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", action="append", metavar="TYPE:SLUG",
+                        help="only write these entity pages, e.g. people:bob-lazar (repeatable)")
+    args = parser.parse_args()
     data = json.loads(INDEX.read_text(encoding="utf-8"))
     videos = data.get("videos", data)
 
     buckets = {"people": {}, "places": {}, "topics": {}}
+    # Aliases share their canonical entity's page.
+    canonical = {etype: slug_map(etype, slugify, ALIASES) for etype in buckets}
+    only = {f"{etype}:{canonical[etype].get(eslug, eslug)}"
+            for etype, _, eslug in (key.partition(":") for key in args.only or []) if etype in canonical}
     for item in videos:
         title = item["title"].replace("\n", " ").strip()
         vslug = item["slug"]
         ents = item.get("entities", {})
         for etype in buckets.keys():
             for eslug in ents.get(etype, []):
-                buckets[etype].setdefault(eslug, []).append((title, vslug))
+                eslug = canonical[etype].get(eslug, eslug)
+                if (title, vslug) not in buckets[etype].setdefault(eslug, []):
+                    buckets[etype][eslug].append((title, vslug))
 
-    for etype, m in buckets.items():
-        for eslug, vids in sorted(m.items()):
-            write_entity(etype, eslug, vids)
+    with OutputSink(ENT_ROOT, name="entity-pages", prune=not args.only) as sink:
+        for etype, m in buckets.items():
+            for eslug, vids in sorted(m.items()):
+                if args.only and f"{etype}:{eslug}" not in only:
+                    continue
+                write_entity(sink, etype, eslug, vids)
+    print(sink.summary())
 
     return 0
 
@@ -17,9 +17,9 @@ DOCS_DIR = REPO_ROOT / "docs"
 TRANSCRIPTS_DIR = REPO_ROOT / "transcripts"
 
 # Ensure base dirs exist
-for _p in (DATA_DIR, DOCS_DIR, DOCS_DIR / "videos", DOCS_DIR / "entities",
-           DOCS_DIR / "entities" / "people", DOCS_DIR / "entities" / "places",
-           DOCS_DIR / "entities" / "topics"):
+for _p in (DATA_DIR, DOCS_DIR, DOCS_DIR / "videos", DOCS_DIR / "entity-index",
+           DOCS_DIR / "entity-index" / "people", DOCS_DIR / "entity-index" / "places",
+           DOCS_DIR / "entity-index" / "topics"):
     _p.mkdir(parents=True, exist_ok=True)
 
 
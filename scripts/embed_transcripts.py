@@ -5,7 +5,8 @@ For each Markdown/MDX file in docs/videos, this script looks for a matching
 transcript text file and inserts a "## Transcript" section if one is not
 already present. Transcript files are searched using the video's ID and title
 and are copied into ``transcripts/<video_id>/`` so they can be served by the
-site. Links to the transcript (and caption file, if available) are also added
+site. Videos whose Whisper outputs were packed into the transcript store have
+their text and captions exported from the store instead. Links to the transcript (and caption file, if available) are also added
 under the existing "Files and Links" section.
 """
 from __future__ import annotations
@@ -14,6 +15,8 @@ import argparse
 import shutil
 from pathlib import Path
 
+from utils import transcript_store
+
 ROOT = Path(__file__).resolve().parents[1]
 DOCS = ROOT / "docs" / "videos"
 TRANSCRIPTS = ROOT / "transcripts"
@@ -59,6 +62,14 @@ def find_source_files(title: str, vid_short: str) -> tuple[Path | None, Path | N
             vtt = v_matches[0]
     return txt, vtt
 
+def find_store(title: str, vid_short: str) -> Path | None:
+    """Locate the packed Whisper store for a video."""
+    store = ROOT / title / f"{title} [{vid_short}]{transcript_store.STORE_SUFFIX}"
+    if store.exists():
+        return store
+    matches = list(ROOT.rglob(f"*{vid_short}*{transcript_store.STORE_SUFFIX}"))
+    return matches[0] if matches else None
+
 def insert_links(lines: list[str], vid: str, have_txt: bool, have_vtt: bool) -> None:
     marker = "**Files and Links**:"
     try:
@@ -100,18 +111,25 @@ def process_file(path: Path) -> bool:
         return False
     vid_short = vid.split("-", 1)[-1]
     src_txt, src_vtt = find_source_files(title, vid_short)
-    if not src_txt:
+    store = None if src_txt else find_store(title, vid_short)
+    if not src_txt and not store:
         return False
     dest_dir = TRANSCRIPTS / vid
     dest_dir.mkdir(parents=True, exist_ok=True)
     dest_txt = dest_dir / "clean.txt"
-    shutil.copyfile(src_txt, dest_txt)
     have_vtt = False
-    if src_vtt and src_vtt.exists():
-        dest_vtt = dest_dir / "original.vtt"
-        shutil.copyfile(src_vtt, dest_vtt)
+    if store:
+        result = transcript_store.load(store)
+        dest_txt.write_bytes(transcript_store.export(result, "txt"))
+        (dest_dir / "original.vtt").write_bytes(transcript_store.export(result, "vtt"))
         have_vtt = True
-    transcript_text = src_txt.read_text(encoding="utf-8")
+    else:
+        shutil.copyfile(src_txt, dest_txt)
+        if src_vtt and src_vtt.exists():
+            dest_vtt = dest_dir / "original.vtt"
+            shutil.copyfile(src_vtt, dest_vtt)
+            have_vtt = True
+    transcript_text = dest_txt.read_text(encoding="utf-8")
     insert_links(lines, vid, have_txt=True, have_vtt=have_vtt)
     append_transcript(lines, transcript_text)
     new_lines = front + lines if front else lines
@@ -0,0 +1,73 @@
+"""Look up exact phrases in the index built by ``09_build_phrase_index.py``.
+
+Commands:
+- ``search PHRASE``: every place the phrase was said, with a timestamped link.
+- ``count PHRASE``: how many times it occurs, from binary searches alone.
+- ``repeats``: the longest phrases said more than once.
+
+Phrases are matched after the same normalization as the corpus, so case,
+punctuation and apostrophes do not matter. All three match whole words only;
+``search`` and ``count`` take ``--substring`` to match inside longer words too.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from utils.phrase_index import INDEX_DIR, PhraseIndex
+from utils.timecode import to_hms
+
+
+def cmd_search(index: PhraseIndex, phrase: str, limit: int, substring: bool) -> int:
+    found = 0
+    for hit in index.search(phrase, whole_words=not substring, limit=limit):
+        if hit.start is None:
+            where = hit.video_id
+        else:
+            where = f"{to_hms(hit.start)} https://www.youtube.com/watch?v={hit.video_id}&t={int(hit.start)}s"
+        print(f"{where}\n    … {hit.context} …")
+        found += 1
+    print(f"{found} match(es)")
+    return 0 if found else 1
+
+
+def cmd_repeats(index: PhraseIndex, top: int, min_words: int, min_videos: int) -> int:
+    for rep in index.repeats(top=top, min_words=min_words, min_videos=min_videos):
+        print(f"{rep.count:>5}x in {rep.videos:>3} video(s)  {rep.phrase}")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", type=Path, default=INDEX_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    search = sub.add_parser("search")
+    search.add_argument("phrase")
+    search.add_argument("--limit", type=int, help="stop after this many matches")
+    search.add_argument("--substring", action="store_true", help="also match inside longer words")
+    count = sub.add_parser("count")
+    count.add_argument("phrase")
+    count.add_argument("--substring", action="store_true", help="also count matches inside longer words")
+    repeats = sub.add_parser("repeats")
+    repeats.add_argument("--top", type=int, default=20)
+    repeats.add_argument("--min-words", type=int, default=5)
+    repeats.add_argument("--min-videos", type=int, default=1, help="only phrases said in this many videos")
+    args = parser.parse_args()
+    if not (args.index / "meta.json").exists():
+        sys.exit(f"no phrase index at {args.index}; run scripts/09_build_phrase_index.py first")
+    try:
+        index = PhraseIndex(args.index)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    with index:
+        if args.command == "search":
+            sys.exit(cmd_search(index, args.phrase, args.limit, args.substring))
+        if args.command == "count":
+            print(index.count(args.phrase, whole_words=not args.substring))
+            sys.exit(0)
+        sys.exit(cmd_repeats(index, args.top, args.min_words, args.min_videos))
+
+
+if __name__ == "__main__":
+    main()
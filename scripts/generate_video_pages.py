@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
-import json, pathlib, sys, html
+import argparse, json, pathlib, sys, html
+
+from common import slugify
+from utils.entity_resolution import slug_map
+from utils.output_sink import OutputSink
+from utils.render import render_pages
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 INDEX = ROOT / "data" / "transcripts_index.json"
+ALIASES = ROOT / "data" / "entity_aliases.json"
 DOCS = ROOT / "docs" / "videos"
 DOCS.mkdir(parents=True, exist_ok=True)
 
@@ -13,12 +19,14 @@ def mdx_escape_triple_backticks(text: str) -> str:
     # Avoid breaking fenced blocks if transcript contains ```
     return text.replace("```", "``\u200b`")
 
-def ent_links(ents: dict) -> dict:
+def ent_links(ents: dict, canonical: dict) -> dict:
     out = {}
     for k, base in (("people", "/docs/entities/people/"),
                     ("places", "/docs/entities/places/"),
                     ("topics", "/docs/entities/topics/")):
         slugs = ents.get(k, []) if ents else []
+        # Link aliases to the canonical page that build_entities.py writes.
+        slugs = list(dict.fromkeys(canonical[k].get(s, s) for s in slugs))
         out[k] = [f"[{humanize_slug(s)}]({base}{s})" for s in slugs]
     return out
 
@@ -52,7 +60,7 @@ tags:
 </details>
 """
 
-def build_video_page(item: dict, transcript_text: str) -> str:
+def build_video_page(item: dict, transcript_text: str, canonical: dict | None = None) -> str:
     title_raw = item["title"].replace("\n", " ").strip()
     title_front = json.dumps(title_raw)
     tags = item.get("tags", [])
@@ -68,7 +76,7 @@ def build_video_page(item: dict, transcript_text: str) -> str:
         links.append(f"- Captions: [.vtt](/{vtt})")
     links_block = "\n".join(links) if links else "- (no external links)"
 
-    ent = ent_links(item.get("entities", {}))
+    ent = ent_links(item.get("entities", {}), canonical or {"people": {}, "places": {}, "topics": {}})
     ents_lines = []
     if ent["people"]:
         ents_lines.append(f"People: {', '.join(ent['people'])}")
@@ -94,19 +102,30 @@ def build_video_page(item: dict, transcript_text: str) -> str:
         title_heading=title_raw,
     )
 
+def read_transcript(item: dict) -> str:
+    txt_path = ROOT / item["sources"]["transcript_txt"]
+    return txt_path.read_text(encoding="utf-8", errors="ignore")
+
+def render_video_page(context, item: dict, transcript_text: str) -> str:
+    return build_video_page(item, transcript_text, context)
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", action="append", metavar="ID", help="only render these video ids (repeatable)")
+    args = parser.parse_args()
     data = json.loads(INDEX.read_text(encoding="utf-8"))
     videos = data.get("videos", data)
-    for item in videos:
-        txt_path = ROOT / item["sources"]["transcript_txt"]
-        t = txt_path.read_text(encoding="utf-8", errors="ignore")
-        out = build_video_page(item, t)
-        out_file = DOCS / f"{item['slug']}.mdx"
-        # Only rewrite if changed
-        prev = out_file.read_text(encoding="utf-8") if out_file.exists() else None
-        if prev != out:
-            out_file.write_text(out, encoding="utf-8")
-            print(f"Wrote {out_file.relative_to(ROOT)}")
+    if args.only:
+        videos = [item for item in videos if item["id"] in args.only]
+    # A partial run must not prune the pages it skipped.
+    with OutputSink(DOCS, name="video-pages", prune=not args.only) as sink:
+        canonical = {etype: slug_map(etype, slugify, ALIASES) for etype in ("people", "places", "topics")}
+        pages = render_pages(render_video_page, videos, canonical, load=read_transcript)
+        for item, out in zip(videos, pages):
+            out_name = f"{item['slug']}.mdx"
+            if sink.write_text(out_name, out):
+                print(f"Wrote {(DOCS / out_name).relative_to(ROOT)}")
+    print(sink.summary())
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Replay a realistic query mix against the corpus query API and record latency.
+
+The mix is drawn from video titles (``data/videos.json``), extracted
+entities and keywords (``data/entities_topics.json``) and referenced years
+(``data/year_index.json``). Load is applied either as a closed loop with a
+fixed number of concurrent clients (``--concurrency``) or as an open loop
+with Poisson arrivals at a fixed rate (``--rate``), against a running
+``serve_corpus.py`` (``--url``) or an in-process ``QueryService``.
+
+Results (throughput, error count, latency percentiles and a log-bucketed
+histogram, overall and per route) are written as JSON to ``--out``. The
+percentiles come from the histogram, so memory does not grow with run length.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from utils.corpus_db import DB_PATH
+from utils.query_service import QueryService
+
+Query = Tuple[str, Dict[str, str]]
+Target = Callable[[str, Dict[str, str]], Awaitable[None]]
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z']{3,}")
+# Relative weight of each query family in the generated mix.
+MIX_WEIGHTS = {"title": 3, "keyword": 3, "entity": 2, "related": 1, "timeline": 1}
+# Histogram buckets grow by 2**(1/16) (~4.4%) from 10 µs upwards; this is
+# also the resolution of the reported percentiles.
+BUCKET_BASE_MS = 0.01
+BUCKETS_PER_DOUBLING = 16
+
+
+def build_query_mix(data_dir: Path, size: int, seed: int) -> List[Query]:
+    """Sample ``size`` queries from the corpus outputs, weighted by ``MIX_WEIGHTS``."""
+    rng = random.Random(seed)
+    families: Dict[str, List[Query]] = defaultdict(list)
+    videos_file = data_dir / "videos.json"
+    if videos_file.exists():
+        for video in json.loads(videos_file.read_text()):
+            words = WORD_RE.findall(video.get("title") or "")
+            if words:
+                terms = rng.sample(words, min(2, len(words)))
+                families["title"].append(("/search", {"q": " ".join(f'"{t}"' for t in terms)}))
+            families["related"].append(("/related", {"video_id": video["video_id"]}))
+    entities_file = data_dir / "entities_topics.json"
+    if entities_file.exists():
+        for groups in json.loads(entities_file.read_text()).values():
+            for keyword in groups.get("keywords_top", []):
+                families["keyword"].append(("/search", {"q": f'"{keyword}"'}))
+            for kind in ("people", "orgs", "places"):
+                for name in groups.get(kind, []):
+                    families["entity"].append(("/entity", {"name": name}))
+    year_file = data_dir / "year_index.json"
+    if year_file.exists():
+        years = sorted(set(json.loads(year_file.read_text())["year"]))
+        for year in years:
+            families["timeline"].append(("/timeline", {"from": str(year), "to": str(year + rng.choice((0, 4, 9)))}))
+    names = [f for f in MIX_WEIGHTS if families[f]]
+    if not names:
+        raise SystemExit(f"no query sources found in {data_dir}")
+    weights = [MIX_WEIGHTS[f] for f in names]
+    return [rng.choice(families[f]) for f in rng.choices(names, weights, k=size)]
+
+
+class Histogram:
+    """Log-bucketed latency counts; percentiles are read from the buckets.
+
+    Memory stays fixed however long the run is. A percentile is the upper
+    bound of the bucket it falls in, clamped to the observed maximum, so it
+    overstates the true value by at most one bucket width.
+    """
+
+    def __init__(self) -> None:
+        self.buckets: Dict[int, int] = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        idx = max(0, math.ceil(BUCKETS_PER_DOUBLING * math.log2(max(ms, BUCKET_BASE_MS) / BUCKET_BASE_MS)))
+        self.buckets[idx] += 1
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+
+    @staticmethod
+    def upper_bound(idx: int) -> float:
+        return BUCKET_BASE_MS * 2 ** (idx / BUCKETS_PER_DOUBLING)
+
+    def percentile(self, p: float) -> float:
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                return min(max(self.upper_bound(idx), self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min_ms": round(self.min, 3),
+            "mean_ms": round(self.total / self.count, 3),
+            **{f"p{str(p).replace('.', '')}_ms": round(self.percentile(p), 3) for p in (50, 90, 95, 99, 99.9)},
+            "max_ms": round(self.max, 3),
+            # Each bucket is keyed by its upper bound in milliseconds.
+            "histogram": [
+                {"le_ms": round(self.upper_bound(i), 4), "count": self.buckets[i]} for i in sorted(self.buckets)
+            ],
+        }
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.overall = Histogram()
+        self.routes: Dict[str, Histogram] = defaultdict(Histogram)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, route: str, ms: float, error: str | None) -> None:
+        if error:
+            self.errors[error] += 1
+            return
+        self.overall.add(ms)
+        self.routes[route].add(ms)
+
+
+def http_target(base_url: str) -> Tuple[Target, Callable[[], Awaitable[None]]]:
+    """Keep-alive HTTP/1.1 client; one connection per concurrent caller."""
+    url = urlsplit(base_url)
+    host, port = url.hostname or "127.0.0.1", url.port or 80
+    idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def call(route: str, params: Dict[str, str]) -> None:
+        reader, writer = idle.pop() if idle else await asyncio.open_connection(host, port)
+        try:
+            writer.write(f"GET {route}?{urlencode(params)} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = header.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+        except BaseException:
+            writer.close()
+            raise
+        idle.append((reader, writer))
+        status = status_line.split(b" ", 2)[1:2]
+        if status != [b"200"]:
+            raise RuntimeError(f"HTTP {status[0].decode() if status else '?'}")
+
+    async def close() -> None:
+        for _, writer in idle:
+            writer.close()
+
+    return call, close
+
+
+def service_target(service: QueryService) -> Tuple[Target, Callable[[], Awaitable[None]]]:
+    async def call(route: str, params: Dict[str, str]) -> None:
+        await service.query(route, params)
+
+    async def close() -> None:
+        service.close()
+
+    return call, close
+
+
+async def timed(target: Target, recorder: Recorder, query: Query, scheduled: float) -> None:
+    route, params = query
+    error = None
+    try:
+        await target(route, params)
+    except Exception as exc:
+        error = type(exc).__name__ if not str(exc) else f"{type(exc).__name__}: {exc}"
+    # Latency counts from the scheduled send time so a stalled server can't
+    # hide queueing delay from open-loop runs.
+    recorder.add(route, (time.perf_counter() - scheduled) * 1000, error)
+
+
+async def closed_loop(target: Target, recorder: Recorder, queries: Iterable[Query],
+                      concurrency: int, deadline: float) -> None:
+    it = iter(queries)
+
+    async def client() -> None:
+        for query in it:
+            if time.perf_counter() >= deadline:
+                return
+            await timed(target, recorder, query, time.perf_counter())
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+
+async def open_loop(target: Target, recorder: Recorder, queries: Iterable[Query],
+                    rate: float, deadline: float, seed: int) -> None:
+    rng = random.Random(seed)
+    pending = set()
+    next_at = time.perf_counter()
+    for query in queries:
+        next_at += rng.expovariate(rate)
+        if next_at >= deadline:
+            break
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        task = asyncio.create_task(timed(target, recorder, query, next_at))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.wait(pending)
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    data_dir = Path("data")
+    mix = build_query_mix(data_dir, args.mix_size, args.seed)
+    # Replay the sampled mix round-robin until the duration or request budget runs out.
+    queries = itertools.islice(itertools.cycle(mix), args.requests)
+    if args.url:
+        target, close = http_target(args.url)
+    else:
+        service = QueryService(args.db, cache_bytes=args.cache_mb << 20, workers=args.workers)
+        target, close = service_target(service)
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + args.duration if args.duration else math.inf
+    try:
+        if args.rate:
+            await open_loop(target, recorder, queries, args.rate, deadline, args.seed)
+        else:
+            await closed_loop(target, recorder, queries, args.concurrency, deadline)
+    finally:
+        await close()
+    elapsed = time.perf_counter() - started
+    completed = recorder.overall.summary()["count"]
+    db_file = args.db if not args.url else None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.url or f"in-process:{args.db}",
+        "db": {"bytes": db_file.stat().st_size, "mtime": db_file.stat().st_mtime} if db_file else None,
+        "mode": {"rate": args.rate} if args.rate else {"concurrency": args.concurrency},
+        "seed": args.seed,
+        "elapsed_s": round(elapsed, 3),
+        "completed": completed,
+        "errors": dict(recorder.errors),
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "latency": recorder.overall.summary(),
+        "routes": {route: h.summary() for route, h in sorted(recorder.routes.items())},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="query server base URL, e.g. http://127.0.0.1:8765; in-process if omitted")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="database for in-process runs")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=8, help="closed loop: concurrent clients")
+    load.add_argument("--rate", type=float, help="open loop: mean arrivals per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run (0 = until --requests done)")
+    parser.add_argument("--requests", type=int, help="stop after this many queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix-size", type=int, default=5000, help="distinct sampled queries to replay")
+    parser.add_argument("--cache-mb", type=int, default=64, help="in-process result cache (0 disables)")
+    parser.add_argument("--workers", type=int, default=4, help="in-process SQLite worker threads")
+    parser.add_argument("--out", type=Path, help="JSON report path (default data/loadtest/<timestamp>.json)")
+    args = parser.parse_args()
+    if not args.duration and not args.requests:
+        parser.error("--duration 0 needs --requests")
+    if not args.url and not args.db.exists():
+        parser.error(f"{args.db} not found; run `make db` first")
+    report = asyncio.run(run(args))
+    out = args.out or Path("data/loadtest") / f"{report['timestamp'].replace(':', '')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    latency = report["latency"]
+    print(f"{report['completed']} ok, {sum(report['errors'].values())} errors, "
+          f"{report['throughput_rps']} req/s, p50 {latency.get('p50_ms')} ms, "
+          f"p99 {latency.get('p99_ms')} ms -> {out}")
+
+
+if __name__ == "__main__":
+    main()
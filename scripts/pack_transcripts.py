@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Pack Whisper outputs into the canonical transcript store and export from it.
+
+pack    Build ``<title> [<id>].whisper.json.gz`` next to each Whisper ``.json``.
+        Every sibling ``.json/.txt/.vtt/.srt/.tsv`` is checked against its
+        export. ``--delete`` then removes the originals, but only for videos
+        whose exports all match byte-for-byte.
+verify  Check that every store decompresses and that its JSON export matches
+        the stored bytes. Any original files still present are compared too.
+export  Write ``<id>.<format>`` files from the store on demand.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from utils import transcript_store
+from utils.transcript_store import FORMATS, STORE_SUFFIX
+
+ID_RE = re.compile(r"\[([A-Za-z0-9_-]{6,})\]$")
+SKIP_DIRS = {"data", "scripts", "transcripts", "docs", "static", "src", "node_modules", ".git"}
+
+
+def video_folders(base: Path) -> Iterator[Tuple[str, Path, str]]:
+    """Yield ``(video_id, folder, stem)`` for each top-level Whisper output folder."""
+    for folder in sorted(base.iterdir()):
+        if not folder.is_dir() or folder.name in SKIP_DIRS:
+            continue
+        for f in sorted(folder.iterdir()):
+            for suffix in (STORE_SUFFIX, ".json"):
+                if f.name.endswith(suffix):
+                    stem = f.name[: -len(suffix)]
+                    m = ID_RE.search(stem)
+                    if m:
+                        yield m.group(1), folder, stem
+                        break
+            else:
+                continue
+            break
+
+
+def mismatches(result: Dict, folder: Path, stem: str) -> Tuple[List[Path], List[Path]]:
+    """Originals present next to the store, split into (matching, differing)."""
+    same, differ = [], []
+    for fmt in FORMATS:
+        original = folder / f"{stem}.{fmt}"
+        if original.exists():
+            (same if original.read_bytes() == transcript_store.export(result, fmt) else differ).append(original)
+    return same, differ
+
+
+def cmd_pack(base: Path, delete: bool) -> int:
+    failures = 0
+    for vid, folder, stem in video_folders(base):
+        raw_json = folder / f"{stem}.json"
+        store = transcript_store.store_path(folder, stem)
+        if raw_json.exists():
+            store.write_bytes(transcript_store.pack(raw_json.read_bytes()))
+        result = transcript_store.load(store)
+        same, differ = mismatches(result, folder, stem)
+        if differ:
+            failures += 1
+            print(f"{vid}: export differs for {', '.join(p.suffix for p in differ)}; originals kept")
+            continue
+        if delete:
+            for original in same:
+                original.unlink()
+        print(f"{vid}: packed ({len(same)} originals {'removed' if delete else 'verified'})")
+    return 1 if failures else 0
+
+
+def cmd_verify(base: Path) -> int:
+    failures = 0
+    count = 0
+    for vid, folder, stem in video_folders(base):
+        store = transcript_store.store_path(folder, stem)
+        if not store.exists():
+            print(f"{vid}: not packed")
+            failures += 1
+            continue
+        raw = transcript_store.read_raw(store)
+        result = transcript_store.load(store)
+        _, differ = mismatches(result, folder, stem)
+        if transcript_store.export(result, "json") != raw:
+            differ.append(store)
+        if differ:
+            failures += 1
+            print(f"{vid}: round-trip mismatch: {', '.join(p.name for p in differ)}")
+        count += 1
+    print(f"verified {count - failures} of {count} stores")
+    return 1 if failures else 0
+
+
+def cmd_export(base: Path, formats: List[str], out: Path | None, only: str | None) -> int:
+    for vid, folder, stem in video_folders(base):
+        if only and vid != only:
+            continue
+        store = transcript_store.store_path(folder, stem)
+        if not store.exists():
+            continue
+        result = transcript_store.load(store)
+        for fmt in formats:
+            # Without --out, restore the original Whisper file names in place.
+            target = (out / f"{vid}.{fmt}") if out else folder / f"{stem}.{fmt}"
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(transcript_store.export(result, fmt))
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", type=Path, default=Path("."), help="repository root")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pack = sub.add_parser("pack")
+    pack.add_argument("--delete", action="store_true", help="remove originals that round-trip exactly")
+    sub.add_parser("verify")
+    export = sub.add_parser("export")
+    export.add_argument("--format", dest="formats", action="append", choices=FORMATS, required=True)
+    export.add_argument("--out", type=Path, help="directory for <id>.<format> files")
+    export.add_argument("--only", help="export only this video id")
+    args = parser.parse_args()
+    if args.command == "pack":
+        sys.exit(cmd_pack(args.base, args.delete))
+    if args.command == "verify":
+        sys.exit(cmd_verify(args.base))
+    sys.exit(cmd_export(args.base, args.formats, args.out, args.only))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Plan which Content CI generators need to run for the changes since a base ref.
+
+Changed paths come from ``git diff --name-only <merge-base> HEAD``. They are
+mapped to the video ids whose transcripts, served copies, index entries or
+generated pages changed, and to the entity slugs those videos reference
+before or after the change. ``--run`` then runs ``scan_transcripts.py``,
+``generate_video_pages.py`` and ``build_entities.py`` with ``--only`` for
+just that set.
+
+The plan falls back to a full run in these cases:
+- a generator or its helpers change;
+- the schema changes;
+- videos or entities are removed (partial runs never delete pages);
+- the base cannot be resolved.
+"""
+import argparse, ast, json, pathlib, subprocess, sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+INDEX_REL = "data/transcripts_index.json"
+
+ENTITY_TYPES = ("people", "places", "topics")
+GENERATORS = ("scan_transcripts.py", "generate_video_pages.py", "build_entities.py")
+# Changes to any of these can affect every generated file, besides the
+# generators and the local modules they import (see ``full_run_paths``).
+# The store is listed because the transcript copies the scanner reads are
+# exported from it.
+FULL_RUN_EXTRA = (
+    "scripts/plan_changes.py",
+    "scripts/utils/transcript_store.py",
+    "data/entity_aliases.json",
+    "data/schema/",
+)
+
+def local_imports(script):
+    """Repo-relative paths of ``script`` and every module under scripts/ it imports, transitively."""
+    scripts = ROOT / "scripts"
+    seen, todo = set(), [scripts / script]
+    while todo:
+        path = todo.pop()
+        if path in seen or not path.exists():
+            continue
+        seen.add(path)
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for name in names:
+                base = scripts.joinpath(*name.split("."))
+                todo.extend(p for p in (base.with_suffix(".py"), base / "__init__.py") if p.exists())
+    return {path.relative_to(ROOT).as_posix() for path in seen}
+
+def full_run_paths():
+    paths = set(FULL_RUN_EXTRA)
+    for script in GENERATORS:
+        paths |= local_imports(script)
+    return tuple(sorted(paths))
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+
+def videos_at(ref):
+    """Index entries by id at ``ref`` (``None`` = working tree)."""
+    try:
+        text = (ROOT / INDEX_REL).read_text(encoding="utf-8") if ref is None else git("show", f"{ref}:{INDEX_REL}")
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    data = json.loads(text)
+    return {v["id"]: v for v in data.get("videos", data)}
+
+def entity_keys(item):
+    ents = item.get("entities", {})
+    return {f"{etype}:{slug}" for etype in ENTITY_TYPES for slug in ents.get(etype, [])}
+
+def full(reason):
+    return {"full": True, "reason": reason, "videos": [], "entities": []}
+
+def plan(base):
+    try:
+        merge_base = git("merge-base", base, "HEAD").strip()
+    except subprocess.CalledProcessError:
+        return full(f"cannot resolve merge base with {base}")
+    changed = [p for p in git("diff", "--name-only", merge_base, "HEAD").splitlines() if p]
+    full_paths = full_run_paths()
+    for path in changed:
+        if path.startswith(full_paths):
+            return full(f"{path} changed")
+
+    old, new = videos_at(merge_base), videos_at(None)
+    if set(old) - set(new):
+        return full("videos removed from the index")
+
+    # Paths that belong to a single video.
+    owners = {}
+    for vid, item in new.items():
+        for key in ("transcript_txt", "transcript_vtt"):
+            if item.get("sources", {}).get(key):
+                owners[item["sources"][key]] = vid
+        owners[f"docs/videos/{item['slug']}.mdx"] = vid
+    affected = set()
+    for path in changed:
+        parts = pathlib.PurePosixPath(path).parts
+        if path == INDEX_REL:
+            affected.update(vid for vid, item in new.items() if old.get(vid) != item)
+        elif path in owners:
+            affected.add(owners[path])
+        elif parts[:2] == ("static", "transcripts") and len(parts) > 2 and parts[2] in new:
+            affected.add(parts[2])
+        elif parts[:1] == ("transcripts",) and len(parts) > 1 and parts[1] in new:
+            affected.add(parts[1])
+
+    entities = set()
+    for vid in affected:
+        entities |= entity_keys(new[vid]) | entity_keys(old.get(vid, {}))
+    for path in changed:
+        parts = pathlib.PurePosixPath(path).parts
+        if parts[:2] == ("docs", "entities") and len(parts) == 4 and parts[2] in ENTITY_TYPES:
+            entities.add(f"{parts[2]}:{pathlib.PurePosixPath(parts[3]).stem}")
+    live = set().union(*(entity_keys(item) for item in new.values())) if new else set()
+    if entities - live:
+        return full("entities removed from the index")
+    return {"full": False, "reason": f"{len(changed)} changed paths", "videos": sorted(affected),
+            "entities": sorted(entities)}
+
+def run(p):
+    if p["full"]:
+        commands = [[sys.executable, str(ROOT / "scripts" / g)] for g in GENERATORS]
+    else:
+        only_videos = [arg for vid in p["videos"] for arg in ("--only", vid)]
+        only_entities = [arg for key in p["entities"] for arg in ("--only", key)]
+        commands = []
+        if p["videos"]:
+            commands.append([sys.executable, str(ROOT / "scripts" / "scan_transcripts.py"), *only_videos])
+            commands.append([sys.executable, str(ROOT / "scripts" / "generate_video_pages.py"), *only_videos])
+        if p["entities"]:
+            commands.append([sys.executable, str(ROOT / "scripts" / "build_entities.py"), *only_entities])
+    for cmd in commands:
+        subprocess.run(cmd, cwd=ROOT, check=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default="origin/main", help="ref to diff against (via its merge base)")
+    parser.add_argument("--run", action="store_true", help="run the generators for the planned set")
+    args = parser.parse_args()
+    p = plan(args.base)
+    print(json.dumps(p, indent=2))
+    if args.run:
+        run(p)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
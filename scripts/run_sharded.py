@@ -0,0 +1,60 @@
+"""Run the analysis stages as sharded map-reduce on this machine.
+
+For each stage, ``--shards N`` processes run ``--shard 0/N`` to
+``--shard N-1/N`` side by side. One ``--reduce`` then merges their parts
+into the usual ``data/`` outputs. The stages run in pipeline order, because
+the claims reduce geocodes the entities that the entities reduce writes.
+
+To spread the work over several build nodes, run the ``--shard i/N``
+commands of every stage on node ``i`` instead. Then copy each node's
+``data/shards/`` to one node and run the ``--reduce`` commands there, in
+the same order.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from utils.shards import SHARD_DIR
+
+SCRIPTS = Path(__file__).parent
+# (partial output name, script, map arguments), in pipeline order.
+STAGES = (
+    ("metrics", "02_metrics.py", ["--window", "5"]),
+    ("entities", "03_entities_topics.py", []),
+    ("claims", "04_claims_timeline_geo.py", []),
+)
+
+
+def run_stage(name: str, script: str, extra: list, shards: int, jobs: int) -> int:
+    shutil.rmtree(SHARD_DIR / name, ignore_errors=True)  # parts of an earlier run
+    path = str(SCRIPTS / script)
+    procs = [subprocess.Popen([sys.executable, path, "--shard", f"{i}/{shards}", "--jobs", str(jobs), *extra])
+             for i in range(shards)]
+    failed = [i for i, proc in enumerate(procs) if proc.wait() != 0]
+    if failed:
+        print(f"{script}: shard(s) {', '.join(map(str, failed))} failed", file=sys.stderr)
+        return 1
+    return subprocess.run([sys.executable, path, "--reduce"]).returncode
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1, help="shards per stage")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes inside each shard")
+    parser.add_argument("--stage", action="append", choices=[name for name, _, _ in STAGES],
+                        help="only run these stages (repeatable)")
+    args = parser.parse_args()
+    for name, script, extra in STAGES:
+        if args.stage and name not in args.stage:
+            continue
+        if run_stage(name, script, extra, args.shards, args.jobs):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-import json, pathlib, sys, re, shutil
+import argparse, json, pathlib, sys, re, shutil
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 INDEX = ROOT / "data" / "transcripts_index.json"
@@ -22,12 +22,17 @@ def ensure_served_copy(src: pathlib.Path, video_id: str) -> pathlib.Path:
     return dest
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", action="append", metavar="ID", help="only scan these video ids (repeatable)")
+    args = parser.parse_args()
     data = json.loads(INDEX.read_text(encoding="utf-8"))
     videos = data.get("videos", data)
     changed = False
 
     for item in videos:
         vid = item["id"]
+        if args.only and vid not in args.only:
+            continue
         src_txt = ROOT / item["sources"]["transcript_txt"]
         text = src_txt.read_text(encoding="utf-8", errors="ignore")
         norm = normalize_text(text)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Serve read-only corpus queries over HTTP from ``data/corpus.sqlite``.
+
+Routes (all GET, JSON responses):
+- /search?q=<fts query>&after_year=&max_sentiment=&year_near=&limit=
+- /entity?name=<entity name>
+- /related?video_id=<id>&limit=
+- /timeline?from=<year>&to=<year>
+- /metrics  (request count, p50/p95/p99 latency, cache and coalescing stats)
+
+Build the database first with ``make db``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sqlite3
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from utils.corpus_db import DB_PATH
+from utils.query_service import QueryService
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+async def respond(service: QueryService, method: str, target: str) -> tuple[int, bytes]:
+    if method != "GET":
+        return 405, b'{"error": "method not allowed"}'
+    url = urlsplit(target)
+    if url.path == "/metrics":
+        return 200, json.dumps(service.stats()).encode("utf-8")
+    try:
+        return 200, await service.query(url.path, dict(parse_qsl(url.query)))
+    except KeyError:
+        return 404, b'{"error": "unknown route"}'
+    except (ValueError, sqlite3.OperationalError) as exc:
+        return 400, json.dumps({"error": str(exc)}).encode("utf-8")
+    except Exception as exc:  # keep serving other clients
+        return 500, json.dumps({"error": str(exc)}).encode("utf-8")
+
+
+async def handle(service: QueryService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3:
+                break
+            method, target, version = parts
+            connection = ""
+            while True:
+                header = await reader.readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = header.decode("latin-1").partition(":")
+                if name.strip().lower() == "connection":
+                    connection = value.strip().lower()
+            if version == "HTTP/1.0":
+                keep_alive = connection == "keep-alive"
+            else:
+                keep_alive = connection != "close"
+            status, body = await respond(service, method, target)
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int, service: QueryService) -> None:
+    server = await asyncio.start_server(lambda r, w: handle(service, r, w), host, port)
+    print(f"Serving {service.db_path} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-mb", type=int, default=64, help="LRU result cache size")
+    parser.add_argument("--workers", type=int, default=4, help="SQLite worker threads")
+    args = parser.parse_args()
+    if not args.db.exists():
+        parser.error(f"{args.db} not found; run `make db` first")
+    service = QueryService(args.db, cache_bytes=args.cache_mb << 20, workers=args.workers)
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
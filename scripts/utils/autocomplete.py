@@ -0,0 +1,167 @@
+"""Weighted prefix completion over entity names, video titles and topics.
+
+Every label is indexed under each of its word-start suffixes, so both
+"bob" and "laz" complete to "Bob Lazar". Entries are numbered heaviest
+first. Each index key holds the number of its entry, and the keys are sorted.
+The keys starting with a prefix therefore form one contiguous range.
+The best completions are the smallest entry numbers in that range. They
+are taken in order with a sparse-table range-minimum query and a small
+heap, so a lookup costs ``O(log n + k log k)`` however common the prefix is.
+
+The packed form is a plain JSON object that a browser can fetch and search
+the same way, with the keys front-coded:
+
+- ``kinds``: kind names, referenced by index.
+- ``entries``: ``[label, kind, weight, ref]`` in rank order. ``ref`` is the
+  video id for titles and empty otherwise.
+- ``keys``: ``[shared, suffix, entry]``, where ``shared`` is how many leading
+  characters the key has in common with the previous one.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import re
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+INDEX = Path("data/autocomplete.json")
+NON_WORD = re.compile(r"[^0-9a-z]+")
+# Suffixes starting here are not worth a key of their own.
+SKIP_WORDS = {"a", "an", "and", "at", "by", "for", "from", "in", "of", "on", "or", "the", "to", "with"}
+
+
+class Completion(NamedTuple):
+    label: str
+    kind: str
+    weight: int
+    ref: str
+
+
+def normalize(text: str) -> str:
+    """Lowercase ASCII words separated by single spaces."""
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return NON_WORD.sub(" ", folded.lower()).strip()
+
+
+def index_keys(label: str) -> List[str]:
+    """The normalized label and each of its suffixes that starts a content word."""
+    words = normalize(label).split()
+    keys = [" ".join(words)] if words else []
+    keys.extend(" ".join(words[i:]) for i in range(1, len(words)) if words[i] not in SKIP_WORDS)
+    return list(dict.fromkeys(keys))
+
+
+def pack(items: Iterable[Completion]) -> dict:
+    """Rank ``items`` by weight and build the front-coded key list."""
+    merged = {}
+    for item in items:
+        key = (item.kind, item.label)
+        if key not in merged or item.weight > merged[key].weight:
+            merged[key] = item
+    entries = sorted(merged.values(), key=lambda e: (-e.weight, e.label.lower(), e.kind))
+    kinds = sorted({e.kind for e in entries})
+    keys = sorted((key, rank) for rank, entry in enumerate(entries) for key in index_keys(entry.label))
+    packed_keys = []
+    previous = ""
+    for key, rank in keys:
+        shared = 0
+        limit = min(len(key), len(previous))
+        while shared < limit and key[shared] == previous[shared]:
+            shared += 1
+        packed_keys.append([shared, key[shared:], rank])
+        previous = key
+    return {
+        "version": 1,
+        "kinds": kinds,
+        "entries": [[e.label, kinds.index(e.kind), e.weight, e.ref] for e in entries],
+        "keys": packed_keys,
+    }
+
+
+def write(packed: dict, path: Path = INDEX) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps(packed, separators=(",", ":"), ensure_ascii=False)
+    path.write_text(payload, encoding="utf-8")
+    return payload
+
+
+class Completer:
+    """Top-k weighted completions from a packed index."""
+
+    def __init__(self, packed: dict) -> None:
+        kinds = packed["kinds"]
+        self.entries = [Completion(label, kinds[kind], weight, ref)
+                        for label, kind, weight, ref in packed["entries"]]
+        self.keys: List[str] = []
+        self.ids: List[int] = []
+        previous = ""
+        for shared, suffix, rank in packed["keys"]:
+            previous = previous[:shared] + suffix
+            self.keys.append(previous)
+            self.ids.append(rank)
+        self._table = self._sparse_table(self.ids)
+
+    @classmethod
+    def load(cls, path: Path = INDEX) -> "Completer":
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+    @staticmethod
+    def _sparse_table(ids: Sequence[int]) -> List[List[int]]:
+        """``table[j][i]``: position of the smallest id in ``ids[i : i + 2**j]``."""
+        table = [list(range(len(ids)))]
+        width = 1
+        while width * 2 <= len(ids):
+            prev = table[-1]
+            table.append([a if ids[a] <= ids[b] else b
+                          for a, b in zip(prev, prev[width:])])
+            width *= 2
+        return table
+
+    def _argmin(self, lo: int, hi: int) -> int:
+        level = (hi - lo).bit_length() - 1
+        row = self._table[level]
+        a, b = row[lo], row[hi - (1 << level)]
+        return a if self.ids[a] <= self.ids[b] else b
+
+    def range(self, prefix: str) -> Tuple[int, int]:
+        """Half-open range of keys starting with the normalized ``prefix``."""
+        key = normalize(prefix)
+        if not key:
+            return 0, 0
+        return bisect_left(self.keys, key), bisect_left(self.keys, key + "\x7f")  # keys are ASCII
+
+    def _ranked(self, lo: int, hi: int) -> Iterator[int]:
+        """Entry numbers of keys ``lo .. hi`` in rank order."""
+        if lo >= hi:
+            return
+        ids = self.ids
+        pos = self._argmin(lo, hi)
+        heap = [(ids[pos], pos, lo, hi)]
+        while heap:
+            rank, pos, lo, hi = heapq.heappop(heap)
+            yield rank
+            if lo < pos:
+                left = self._argmin(lo, pos)
+                heapq.heappush(heap, (ids[left], left, lo, pos))
+            if pos + 1 < hi:
+                right = self._argmin(pos + 1, hi)
+                heapq.heappush(heap, (ids[right], right, pos + 1, hi))
+
+    def complete(self, prefix: str, k: int = 10, kinds: Iterable[str] | None = None) -> List[Completion]:
+        """The ``k`` heaviest entries with a key starting with ``prefix``, optionally of ``kinds`` only."""
+        wanted = set(kinds) if kinds else None
+        seen = set()
+        out: List[Completion] = []
+        for rank in self._ranked(*self.range(prefix)):
+            if rank in seen:
+                continue
+            seen.add(rank)
+            entry = self.entries[rank]
+            if wanted is None or entry.kind in wanted:
+                out.append(entry)
+                if len(out) == k:
+                    break
+        return out
@@ -0,0 +1,54 @@
+"""Streaming WebVTT and SubRip parsers yielding ``(start, end, text)`` tuples."""
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple
+
+from utils.timecode import CUE_TIMING_RE
+
+TAG_RE = re.compile(r"<[^>]*>")
+
+Cue = Tuple[float, float, str]
+
+
+def parse_cues(lines: Iterable[str]) -> Iterator[Cue]:
+    """Yield cues from VTT or SRT lines without building per-cue objects.
+
+    A cue starts at a timing line and runs to the next blank line; headers,
+    ``NOTE``/``STYLE`` blocks and cue numbers fall outside cues and are
+    skipped. Inline markup such as ``<c>`` and ``<00:00:01.500>`` is removed.
+    """
+    timing = None
+    text: list[str] = []
+    for line in lines:
+        if timing is None:
+            if "-->" in line:
+                m = CUE_TIMING_RE.search(line)
+                if m:
+                    h1, m1, s1, ms1, h2, m2, s2, ms2 = m.groups(default="0")
+                    timing = (
+                        ((int(h1) * 60 + int(m1)) * 60 + int(s1)) * 1000 + int(ms1),
+                        ((int(h2) * 60 + int(m2)) * 60 + int(s2)) * 1000 + int(ms2),
+                    )
+        elif line.strip():
+            text.append(line)
+        else:
+            yield _cue(timing, text)
+            timing = None
+            text = []
+    if timing is not None:
+        yield _cue(timing, text)
+
+
+def _cue(timing: Tuple[int, int], lines: list[str]) -> Cue:
+    text = "".join(lines).strip()
+    if "<" in text:
+        text = TAG_RE.sub("", text).strip()
+    return timing[0] / 1000, timing[1] / 1000, text
+
+
+def read_cues(path: Path) -> Iterator[Cue]:
+    """Lazily parse a ``.vtt`` or ``.srt`` file."""
+    with path.open(encoding="utf-8-sig", errors="replace") as f:
+        yield from parse_cues(f)
@@ -0,0 +1,141 @@
+"""Clean transcripts packed into one shared, memory-mapped UTF-8 buffer.
+
+Process pools normally pickle every transcript to a worker, so IPC grows with
+the length of the text. ``CorpusBuffer`` writes all texts once, back to back,
+into a single file (in ``/dev/shm`` where available) and keeps a table of
+``Span(video_id, offset, length)``. Workers map the same file read-only when
+they start. Each task then carries only its span, and the worker decodes its
+text straight from the shared pages. The analysis functions are expected to
+return compact results (numbers or NumPy arrays, not text), so the traffic
+each way stays small however long the transcripts are.
+
+``map_texts`` runs such a function over a buffer, serially or in a process
+pool, and yields the results in buffer order.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+SHM_DIR = Path("/dev/shm")
+
+
+class Span(NamedTuple):
+    video_id: str
+    offset: int
+    length: int
+
+
+class CorpusBuffer:
+    """Read-only view of a packed corpus file plus its span table."""
+
+    def __init__(self, path: Path, spans: List[Span], owned: bool = False) -> None:
+        self.path = path
+        self.spans = spans
+        self._owned = owned
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._map) if self._map is not None else memoryview(b"")
+
+    @classmethod
+    def pack(cls, texts: Iterable[Tuple[str, bytes]]) -> "CorpusBuffer":
+        """Write ``(video_id, utf-8 bytes)`` pairs into a new buffer that is removed on close."""
+        fd, name = tempfile.mkstemp(prefix="corpus-", suffix=".buf",
+                                    dir=SHM_DIR if SHM_DIR.is_dir() else None)
+        spans = []
+        offset = 0
+        with os.fdopen(fd, "wb") as out:
+            for vid, data in texts:
+                out.write(data)
+                spans.append(Span(vid, offset, len(data)))
+                offset += len(data)
+        return cls(Path(name), spans, owned=True)
+
+    @classmethod
+    def from_transcripts(cls, base: Path, only: str | None = None,
+                         keep: Callable[[str], bool] | None = None) -> "CorpusBuffer":
+        """Pack every ``<id>/<id>.clean.md`` under ``base`` (those ``keep`` accepts), in folder name order."""
+        def read() -> Iterator[Tuple[str, bytes]]:
+            if not base.exists():
+                return
+            for folder in sorted(base.iterdir()):
+                vid = folder.name
+                if (only and vid != only) or (keep and not keep(vid)):
+                    continue
+                clean = folder / f"{vid}.clean.md"
+                if folder.is_dir() and clean.exists():
+                    yield vid, clean.read_bytes()
+        return cls.pack(read())
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __iter__(self) -> Iterator[Span]:
+        return iter(self.spans)
+
+    def text(self, span: Span) -> str:
+        """The text of ``span``, decoded from the shared pages without an intermediate copy."""
+        return str(self._view[span.offset:span.offset + span.length], "utf-8")
+
+    def texts(self) -> Dict[str, str]:
+        return {span.video_id: self.text(span) for span in self.spans}
+
+    def close(self) -> None:
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+        if self._owned:
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "CorpusBuffer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Set in each worker by ``_attach``: the worker's own mapping of the buffer.
+_BUFFER: CorpusBuffer | None = None
+
+
+def _attach(path: str, initializer: Callable[..., None] | None, initargs: tuple) -> None:
+    global _BUFFER
+    _BUFFER = CorpusBuffer(Path(path), [])
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _call(func: Callable[[Span, str], Any], span: Span) -> Any:
+    return func(span, _BUFFER.text(span))
+
+
+def map_texts(func: Callable[[Span, str], Any], corpus: CorpusBuffer, jobs: int = 0,
+              initializer: Callable[..., None] | None = None, initargs: tuple = ()) -> Iterator[Tuple[Span, Any]]:
+    """Yield ``(span, func(span, text))`` for every document of ``corpus``, in order.
+
+    ``func`` must be picklable by reference (a module-level function or a
+    ``functools.partial`` of one). ``initializer`` runs once per worker, e.g.
+    to load a model. ``jobs`` defaults to the CPU count; ``jobs=1`` runs
+    serially in this process.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(corpus) < 2:
+        if initializer is not None:
+            initializer(*initargs)
+        for span in corpus:
+            yield span, func(span, corpus.text(span))
+        return
+    with ProcessPoolExecutor(min(jobs, len(corpus)), initializer=_attach,
+                             initargs=(str(corpus.path), initializer, initargs)) as pool:
+        # Longest texts first so one late long transcript does not hold up the pool.
+        futures: Dict[int, Any] = {}
+        for i in sorted(range(len(corpus)), key=lambda i: -corpus.spans[i].length):
+            futures[i] = pool.submit(_call, func, corpus.spans[i])
+        for i, span in enumerate(corpus.spans):
+            yield span, futures.pop(i).result()
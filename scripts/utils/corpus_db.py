@@ -0,0 +1,181 @@
+"""Schema and parameterized queries for the ``data/corpus.sqlite`` database."""
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import List
+
+DB_PATH = Path("data/corpus.sqlite")
+
+SCHEMA = """
+CREATE TABLE videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT,
+    url TEXT
+);
+CREATE TABLE metrics (
+    video_id TEXT PRIMARY KEY REFERENCES videos(video_id),
+    words INTEGER,
+    duration_covered REAL,
+    wpm REAL,
+    fk_grade REAL,
+    sentiment_mean REAL,
+    sentiment_std REAL,
+    questions_count INTEGER,
+    hedge_terms_count INTEGER,
+    uncertainty_markers_count INTEGER
+);
+CREATE TABLE segments (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    start REAL NOT NULL,
+    "end" REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX segments_video_time ON segments(video_id, start);
+CREATE VIRTUAL TABLE segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TABLE entity_mentions (
+    video_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX entity_mentions_name ON entity_mentions(name COLLATE NOCASE, kind);
+CREATE INDEX entity_mentions_video ON entity_mentions(video_id);
+CREATE TABLE keywords (
+    video_id TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    keyword TEXT NOT NULL
+);
+CREATE INDEX keywords_keyword ON keywords(keyword);
+CREATE INDEX keywords_video ON keywords(video_id);
+CREATE TABLE claims (
+    video_id TEXT PRIMARY KEY,
+    earliest INTEGER,
+    latest INTEGER,
+    assertion INTEGER,
+    question INTEGER,
+    speculation INTEGER
+);
+CREATE TABLE year_mentions (
+    year INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    start REAL NOT NULL,
+    "end" REAL NOT NULL
+);
+CREATE INDEX year_mentions_year ON year_mentions(year, video_id, start);
+CREATE INDEX year_mentions_video ON year_mentions(video_id, start);
+CREATE TABLE sentiment_windows (
+    video_id TEXT NOT NULL,
+    start REAL NOT NULL,
+    "end" REAL NOT NULL,
+    sentiment REAL
+);
+CREATE INDEX sentiment_windows_video ON sentiment_windows(video_id, start);
+"""
+
+# A segment counts as being about a year when the year is said within this
+# many seconds of it.
+YEAR_NEAR_S = 60.0
+
+# Statements are module constants so sqlite3's statement cache reuses the
+# compiled form across calls on the same connection.
+SEARCH_SEGMENTS = """
+SELECT s.video_id, v.title, s.start, s."end",
+       snippet(segments_fts, 0, '[', ']', '…', 16) AS excerpt
+FROM segments_fts
+JOIN segments s ON s.id = segments_fts.rowid
+LEFT JOIN videos v ON v.video_id = s.video_id
+LEFT JOIN metrics m ON m.video_id = s.video_id
+WHERE segments_fts MATCH :query
+  AND (:after_year IS NULL OR EXISTS (
+        SELECT 1 FROM year_mentions y
+        WHERE y.video_id = s.video_id AND y.year >= :after_year
+          AND y.start < s."end" + :near AND y."end" > s.start - :near))
+  AND (:max_sentiment IS NULL OR COALESCE(
+        (SELECT w.sentiment FROM sentiment_windows w
+         WHERE w.video_id = s.video_id AND w.start <= s.start AND s.start < w."end"),
+        m.sentiment_mean) <= :max_sentiment)
+ORDER BY rank
+LIMIT :limit
+"""
+
+SEGMENTS_BETWEEN = """
+SELECT start, "end", text FROM segments
+WHERE video_id = ? AND start >= ? AND start < ?
+ORDER BY start
+"""
+
+VIDEOS_FOR_ENTITY = """
+SELECT DISTINCT e.video_id, v.title
+FROM entity_mentions e LEFT JOIN videos v ON v.video_id = e.video_id
+WHERE e.name = ? COLLATE NOCASE
+ORDER BY v.title
+"""
+
+RELATED_VIDEOS = """
+SELECT o.video_id, v.title, COUNT(DISTINCT o.kind || ':' || o.name) AS shared
+FROM entity_mentions e
+JOIN entity_mentions o
+  ON o.name = e.name COLLATE NOCASE AND o.kind = e.kind AND o.video_id != e.video_id
+LEFT JOIN videos v ON v.video_id = o.video_id
+WHERE e.video_id = ?
+GROUP BY o.video_id
+ORDER BY shared DESC, v.title
+LIMIT ?
+"""
+
+YEAR_MENTIONS = """
+SELECT year, video_id, start, "end" FROM year_mentions
+WHERE year BETWEEN ? AND ?
+ORDER BY year, video_id, start
+"""
+
+
+def connect(path: Path = DB_PATH, mmap_bytes: int = 0) -> sqlite3.Connection:
+    """Open the corpus database read-only with rows addressable by column name.
+
+    A non-zero ``mmap_bytes`` lets SQLite read that much of the file through
+    a memory map instead of ``read()`` calls.
+    """
+    conn = sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    if mmap_bytes:
+        conn.execute(f"PRAGMA mmap_size = {int(mmap_bytes)}")
+    return conn
+
+
+def search_segments(conn: sqlite3.Connection, query: str, after_year: int | None = None,
+                    max_sentiment: float | None = None, limit: int = 50,
+                    year_near: float = YEAR_NEAR_S) -> List[sqlite3.Row]:
+    """Full-text search over segments, ranked by BM25.
+
+    ``query`` uses FTS5 syntax. The filters apply to each segment, not to its
+    whole video:
+    - ``after_year`` keeps segments with a year at least that late said
+      within ``year_near`` seconds of them.
+    - ``max_sentiment`` caps the sentiment of the ``02_metrics --window``
+      window the segment starts in (e.g. ``0`` for negative passages). Videos
+      without a window series fall back to their mean sentiment.
+    """
+    params = {"query": query, "after_year": after_year, "max_sentiment": max_sentiment, "limit": limit,
+              "near": year_near}
+    return conn.execute(SEARCH_SEGMENTS, params).fetchall()
+
+
+def segments_between(conn: sqlite3.Connection, video_id: str, start: float, end: float) -> List[sqlite3.Row]:
+    return conn.execute(SEGMENTS_BETWEEN, (video_id, start, end)).fetchall()
+
+
+def videos_for_entity(conn: sqlite3.Connection, name: str) -> List[sqlite3.Row]:
+    return conn.execute(VIDEOS_FOR_ENTITY, (name,)).fetchall()
+
+
+def related_videos(conn: sqlite3.Connection, video_id: str, limit: int = 10) -> List[sqlite3.Row]:
+    """Other videos ranked by how many entities they share with ``video_id``."""
+    return conn.execute(RELATED_VIDEOS, (video_id, limit)).fetchall()
+
+
+def year_mentions(conn: sqlite3.Connection, lo: int, hi: int) -> List[sqlite3.Row]:
+    return conn.execute(YEAR_MENTIONS, (lo, hi)).fetchall()
@@ -0,0 +1,122 @@
+"""Entity co-occurrence graph ranked by PageRank.
+
+Two entities co-occur when both are mentioned in the same time window of a
+video. The edge weight is the number of windows they share. The graph is
+held as a ``scipy.sparse`` CSR matrix and ranked by weighted PageRank with
+power iteration. Memory therefore scales with the number of edges, never
+with the square of the number of entities.
+
+The saved form is compact JSON:
+- ``nodes``: ``[kind, name, score, mentions, videos]`` rows, sorted by score.
+- ``edges``: ``[i, j, weight]`` triples with ``i < j``, indexing ``nodes``.
+"""
+from __future__ import annotations
+
+import json
+from collections import Counter, defaultdict
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+from scipy import sparse
+
+Key = Tuple[str, str]  # (kind, name)
+
+
+def cooccurrence(windows: Iterable[Iterable[Key]], nodes: List[Key]) -> sparse.csr_matrix:
+    """Symmetric count matrix of how many ``windows`` each pair of ``nodes`` shares."""
+    index = {key: i for i, key in enumerate(nodes)}
+    rows: List[int] = []
+    cols: List[int] = []
+    for window in windows:
+        ids = sorted({index[key] for key in window if key in index})
+        for i, j in combinations(ids, 2):
+            rows.append(i)
+            cols.append(j)
+    n = len(nodes)
+    ones = np.ones(len(rows), dtype=np.float64)
+    # COO -> CSR sums the duplicate (i, j) entries into counts.
+    upper = sparse.coo_matrix((ones, (rows, cols)), shape=(n, n)).tocsr()
+    return (upper + upper.T).tocsr()
+
+
+def pagerank(weights: sparse.csr_matrix, damping: float = 0.85, tol: float = 1e-10,
+             max_iter: int = 200) -> np.ndarray:
+    """Weighted PageRank of an undirected graph, by sparse power iteration.
+
+    Nodes without edges spread their rank uniformly, like the teleport step.
+    """
+    n = weights.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out = np.asarray(weights.sum(axis=1)).ravel()
+    dangling = out == 0
+    inv = np.divide(1.0, out, out=np.zeros_like(out), where=~dangling)
+    # Column-stochastic transition matrix, still sparse.
+    transition = (sparse.diags(inv) @ weights).T.tocsr()
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = damping * rank[dangling].sum() / n + (1.0 - damping) / n
+        new = damping * (transition @ rank) + spread
+        if np.abs(new - rank).sum() < tol:
+            return new
+        rank = new
+    return rank
+
+
+def build(windows: Iterable[Iterable[Key]], mentions: Counter, videos: Dict[Key, int],
+          damping: float = 0.85) -> dict:
+    """Build the ranked graph from per-window entity sets and per-entity counts."""
+    nodes = sorted(set(mentions) | set(videos))
+    weights = cooccurrence(windows, nodes)
+    scores = pagerank(weights, damping)
+    order = sorted(range(len(nodes)), key=lambda i: (-scores[i], nodes[i]))
+    position = {old: new for new, old in enumerate(order)}
+    upper = sparse.triu(weights, k=1).tocoo()
+    edges = sorted(
+        ([min(position[i], position[j]), max(position[i], position[j]), int(w)]
+         for i, j, w in zip(upper.row.tolist(), upper.col.tolist(), upper.data.tolist())),
+        key=lambda e: (-e[2], e[0], e[1]),
+    )
+    return {
+        "damping": damping,
+        "nodes": [[*nodes[i], round(float(scores[i]), 8), mentions.get(nodes[i], 0), videos.get(nodes[i], 0)]
+                  for i in order],
+        "edges": edges,
+    }
+
+
+class Node(NamedTuple):
+    kind: str
+    name: str
+    score: float
+    mentions: int
+    videos: int
+
+
+class EntityGraph:
+    """Read side of the saved graph: ranked nodes and weighted neighbours."""
+
+    def __init__(self, data: dict) -> None:
+        self.nodes = [Node(*row) for row in data["nodes"]]
+        self._index = {(n.kind, n.name): i for i, n in enumerate(self.nodes)}
+        self._adjacent: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for i, j, w in data["edges"]:
+            self._adjacent[i].append((j, w))
+            self._adjacent[j].append((i, w))
+
+    @classmethod
+    def load(cls, path: Path) -> "EntityGraph":
+        return cls(json.loads(Path(path).read_text()))
+
+    def ranked(self, limit: int | None = None) -> List[Node]:
+        return self.nodes[:limit]
+
+    def neighbors(self, kind: str, name: str, limit: int | None = None) -> List[Tuple[Node, int]]:
+        """Co-occurring entities, heaviest edge first, ties by rank."""
+        i = self._index.get((kind, name))
+        if i is None:
+            return []
+        pairs = sorted(self._adjacent.get(i, []), key=lambda p: (-p[1], p[0]))
+        return [(self.nodes[j], w) for j, w in pairs[:limit]]
@@ -0,0 +1,322 @@
+"""Canonicalize entity mentions across the corpus.
+
+spaCy returns surface strings, so "Lazar", "Bob Lazar" and "Robert Lazar"
+would each get their own entity page. ``resolve`` groups the surface forms of
+one kind into clusters and maps every form to one canonical name.
+
+Forms are only compared with forms that share a blocking key:
+- People: the surname, its Soundex code, the first initial plus surname, and
+  the token-sorted name.
+- Orgs and places: the normalized name and its acronym.
+
+Blocks stay small, so the work grows with the number of forms rather than
+with its square.
+
+The merges are kept in ``data/entity_aliases.json`` (kind -> alias -> canonical).
+Later runs seed the clusters from it, so canonical names stay stable and page
+URLs keep working. Only real merges are kept: a form that matched nothing is
+compared again on every run, so it can still join a person or org that shows
+up later. New forms may join an existing cluster but never bridge two of them.
+The file can therefore be edited by hand to force a merge.
+
+To undo a merge, delete the alias and list the form in
+``data/entity_distinct.json`` (kind -> [form, ...]). Listed forms are never
+merged automatically.
+"""
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import combinations
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Set
+
+ALIASES = Path("data/entity_aliases.json")
+DISTINCT = Path("data/entity_distinct.json")
+
+TITLES = {
+    "mr", "mrs", "ms", "dr", "prof", "professor", "sir", "col", "colonel", "lt", "lieutenant", "gen", "general",
+    "maj", "major", "capt", "captain", "cmdr", "commander", "sgt", "sergeant", "adm", "admiral", "sen",
+    "senator", "rep", "president", "jr", "sr", "ii", "iii",
+}
+# Common English nicknames, mapped to one given name so they compare equal.
+NICKNAMES = {
+    "bob": "robert", "bobby": "robert", "rob": "robert", "bill": "william", "billy": "william", "will": "william",
+    "jim": "james", "jimmy": "james", "dave": "david", "mike": "michael", "tom": "thomas", "tommy": "thomas",
+    "steve": "stephen", "steven": "stephen", "dick": "richard", "rick": "richard", "rich": "richard",
+    "chris": "christopher", "joe": "joseph", "dan": "daniel", "danny": "daniel", "ed": "edward", "eddie": "edward",
+    "ted": "edward", "hal": "harold", "harry": "harold", "jack": "john", "johnny": "john", "jon": "john",
+    "ron": "ronald", "tim": "timothy", "matt": "matthew", "andy": "andrew", "drew": "andrew", "nick": "nicholas",
+    "tony": "anthony", "ken": "kenneth", "larry": "lawrence", "jerry": "gerald", "greg": "gregory",
+    "sam": "samuel", "pete": "peter", "phil": "philip", "charlie": "charles", "chuck": "charles",
+    "don": "donald", "doug": "douglas", "fred": "frederick", "gene": "eugene", "jeff": "jeffrey",
+    "lue": "luis", "lou": "louis", "liz": "elizabeth", "beth": "elizabeth", "kate": "katherine",
+    "kathy": "katherine", "sue": "susan", "jen": "jennifer", "jenny": "jennifer",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SOUNDEX = {c: d for d, letters in {"1": "bfpv", "2": "cgjkqsxz", "3": "dt", "4": "l", "5": "mn", "6": "r"}.items()
+            for c in letters}
+
+
+def normalize(name: str) -> str:
+    """Lower-case ASCII form without accents, possessives or punctuation."""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    text = re.sub(r"['’]s\b", "", text)
+    return " ".join(_TOKEN_RE.findall(text))
+
+
+def person_tokens(name: str) -> List[str]:
+    tokens = [t for t in normalize(name).split() if t not in TITLES]
+    return tokens or normalize(name).split()
+
+
+def soundex(word: str) -> str:
+    word = "".join(c for c in word if c.isalpha())
+    if not word:
+        return ""
+    code = word[0].upper()
+    last = _SOUNDEX.get(word[0], "")
+    for c in word[1:]:
+        digit = _SOUNDEX.get(c, "")
+        if digit and digit != last:
+            code += digit
+        if c not in "hw":
+            last = digit
+    return (code + "000")[:4]
+
+
+def acronym(name: str) -> str:
+    words = [w for w in normalize(name).split() if w not in {"of", "the", "and", "for"}]
+    return "".join(w[0] for w in words) if len(words) > 1 else ""
+
+
+def blocking_keys(kind: str, name: str) -> Set[str]:
+    if kind == "people":
+        tokens = person_tokens(name)
+        if not tokens:
+            return set()
+        surname = tokens[-1]
+        keys = {f"sur:{surname}", f"snd:{soundex(surname)}", f"sort:{' '.join(sorted(tokens))}"}
+        if len(tokens) > 1:
+            keys.add(f"ini:{tokens[0][0]}:{surname}")
+        return keys
+    norm = normalize(name)
+    bare = re.sub(r"^the ", "", norm)
+    if not bare:
+        return set()
+    keys = {f"norm:{bare}"}
+    squashed = bare.replace(" ", "")
+    if len(squashed) <= 5 and all(len(t) == 1 for t in bare.split()[1:]):
+        keys.add(f"acr:{squashed}")
+    if acronym(bare):
+        keys.add(f"acr:{acronym(bare)}")
+    return keys
+
+
+def _edit_distance_at_most_one(a: str, b: str) -> bool:
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = j = edits = 0
+    while i < len(a) and j < len(b):
+        if a[i] != b[j]:
+            edits += 1
+            if edits > 1:
+                return False
+            if len(a) == len(b):
+                i += 1
+            j += 1
+        else:
+            i += 1
+            j += 1
+    return edits + (len(b) - j) <= 1
+
+
+def _given(token: str) -> str:
+    return NICKNAMES.get(token, token)
+
+
+def same_person(a: str, b: str) -> bool:
+    """Whether two multi-token person names refer to the same person."""
+    ta, tb = person_tokens(a), person_tokens(b)
+    if sorted(ta) == sorted(tb):
+        return True
+    if len(ta) < 2 or len(tb) < 2:
+        return False
+    sa, sb = ta[-1], tb[-1]
+    if sa != sb and not (min(len(sa), len(sb)) >= 5 and soundex(sa) == soundex(sb)
+                         and _edit_distance_at_most_one(sa, sb)):
+        return False
+    # The shorter name's first given name (or initial) must appear among the
+    # other's given names, so "Allen Hynek" matches "J. Allen Hynek".
+    ga, gb = sorted((ta[:-1], tb[:-1]), key=len)
+    first = ga[0]
+    for other in gb:
+        if len(first) == 1 or len(other) == 1:
+            if first[0] == other[0]:
+                return True
+        elif _given(first) == _given(other):
+            return True
+    return False
+
+
+def same_name(kind: str, a: str, b: str) -> bool:
+    if kind == "people":
+        return same_person(a, b)
+    na, nb = (re.sub(r"^the ", "", normalize(x)) for x in (a, b))
+    if na == nb:
+        return True
+    # An all-caps short form matches the long form it abbreviates (CIA, UK).
+    for short, long_form in ((a, nb), (b, na)):
+        if short.replace(".", "").isupper() and normalize(short).replace(" ", "") == acronym(long_form):
+            return True
+    return False
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[str, str] = {}
+
+    def find(self, x: str) -> str:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: str, b: str) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def load_aliases(path: Path = ALIASES) -> Dict[str, Dict[str, str]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def load_distinct(path: Path = DISTINCT) -> Dict[str, Set[str]]:
+    if not path.exists():
+        return {}
+    return {kind: set(forms) for kind, forms in json.loads(path.read_text(encoding="utf-8")).items()}
+
+
+def save_aliases(aliases: Dict[str, Dict[str, str]], path: Path = ALIASES) -> None:
+    """Write the merges in ``aliases``; forms mapped to themselves are left out."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ordered = {kind: {alias: canonical for alias, canonical in sorted(table.items()) if alias != canonical}
+               for kind, table in sorted(aliases.items())}
+    path.write_text(json.dumps(ordered, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def resolve_kind(kind: str, counts: Counter, known: Dict[str, str],
+                 distinct: Set[str] = frozenset()) -> Dict[str, str]:
+    """Map every form in ``counts`` and ``known`` to its canonical name.
+
+    ``known`` holds earlier merges (alias -> canonical). Forms in ``distinct``
+    are never merged with anything, except by ``known``.
+    """
+    settled = set(known) | set(known.values())
+    forms = set(counts) | settled
+    uf = _UnionFind()
+    for alias, canonical in known.items():
+        uf.union(canonical, alias)
+    # Canonical name of each cluster from earlier runs, keyed by its root.
+    labels = {uf.find(alias): canonical for alias, canonical in known.items()}
+
+    def join(a: str, b: str) -> bool:
+        ra, rb = uf.find(a), uf.find(b)
+        la, lb = labels.pop(ra, None), labels.pop(rb, None)
+        if ra == rb or (la and lb and la != lb):
+            labels.update({r: l for r, l in ((ra, la), (rb, lb)) if l})
+            return False
+        uf.union(a, b)
+        if la or lb:
+            labels[uf.find(a)] = la or lb
+        return True
+
+    blocks: Dict[str, List[str]] = defaultdict(list)
+    for form in sorted(forms):
+        for key in blocking_keys(kind, form):
+            blocks[key].append(form)
+
+    for members in blocks.values():
+        for a, b in combinations(members, 2):
+            # Pairs within earlier merges were settled by an earlier run or by hand.
+            if (a in settled and b in settled) or a in distinct or b in distinct:
+                continue
+            if uf.find(a) != uf.find(b) and same_name(kind, a, b):
+                join(a, b)
+
+    if kind == "people":
+        # A bare surname joins a cluster only when exactly one person has it.
+        by_surname: Dict[str, Set[str]] = defaultdict(set)
+        bare: List[str] = []
+        for form in forms - distinct:
+            tokens = person_tokens(form)
+            if len(tokens) > 1:
+                by_surname[tokens[-1]].add(uf.find(form))
+            elif tokens and form not in settled:
+                bare.append(form)
+        for form in sorted(bare):
+            owners = by_surname.get(person_tokens(form)[0], set())
+            if len(owners) == 1:
+                join(next(iter(owners)), form)
+
+    clusters: Dict[str, List[str]] = defaultdict(list)
+    for form in forms:
+        clusters[uf.find(form)].append(form)
+
+    mapping: Dict[str, str] = {}
+    for members in clusters.values():
+        canonical = _pick_canonical(kind, members, counts, known)
+        for form in members:
+            mapping[form] = canonical
+    return mapping
+
+
+def _pick_canonical(kind: str, members: List[str], counts: Counter, known: Dict[str, str]) -> str:
+    # Keep an existing canonical name so URLs stay stable across runs.
+    existing = sorted({known[m] for m in members if m in known}, key=lambda n: (-counts[n], n))
+    if existing:
+        return existing[0]
+    if kind == "people":
+        return min(members, key=lambda n: (-len(person_tokens(n)), -counts[n], len(n), n))
+    return min(members, key=lambda n: (-counts[n], normalize(n).startswith("the "), -len(n), n))
+
+
+def resolve(mentions: Dict[str, Iterable[str]], path: Path = ALIASES,
+            distinct_path: Path = DISTINCT) -> Dict[str, Dict[str, str]]:
+    """Resolve ``{kind: mentions}`` against the alias table at ``path`` and save it.
+
+    Returns ``{kind: {form: canonical}}`` covering every form seen now and every
+    alias merged before.
+    """
+    aliases = load_aliases(path)
+    distinct = load_distinct(distinct_path)
+    resolved = {}
+    for kind, names in mentions.items():
+        counts = Counter(names)
+        known = {alias: canonical for alias, canonical in aliases.get(kind, {}).items() if alias != canonical}
+        # Forms of earlier merges are resolved; only the others need blocking and comparison.
+        if set(counts) <= set(known) | set(known.values()):
+            resolved[kind] = {**{form: form for form in counts}, **known}
+        else:
+            resolved[kind] = resolve_kind(kind, counts, known, distinct.get(kind, set()))
+    save_aliases({**aliases, **resolved}, path)
+    return resolved
+
+
+def canonicalize(names: Iterable[str], mapping: Dict[str, str]) -> List[str]:
+    """Distinct canonical names for ``names``, sorted."""
+    return sorted({mapping.get(name, name) for name in names})
+
+
+def slug_map(kind: str, slugify: Callable[[str], str], path: Path = ALIASES) -> Dict[str, str]:
+    """Alias slug -> canonical slug for ``kind``, for pages keyed by slug."""
+    table = load_aliases(path).get(kind, {})
+    return {slugify(alias): slugify(canonical) for alias, canonical in table.items() if alias != canonical}
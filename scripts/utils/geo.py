@@ -0,0 +1,117 @@
+"""Offline geocoding against the bundled gazetteer plus a grid spatial index."""
+from __future__ import annotations
+
+import json
+import math
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+GAZETTEER = Path(__file__).resolve().parents[2] / "data" / "gazetteer.json"
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+_NORM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(name: str) -> str:
+    """Lowercase, drop punctuation and a leading article for alias lookup."""
+    key = _NORM_RE.sub(" ", name.lower()).strip()
+    if key.startswith("the "):
+        key = key[4:]
+    return key
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class Gazetteer:
+    """Resolve free-form place strings through a precompiled alias map."""
+
+    def __init__(self, places: List[Dict[str, Any]]) -> None:
+        self.places = places
+        self._aliases: Dict[str, Dict[str, Any]] = {}
+        for place in places:
+            for alias in (place["name"], *place.get("aliases", [])):
+                self._aliases.setdefault(normalize(alias), place)
+
+    @classmethod
+    def load(cls, path: Path = GAZETTEER) -> "Gazetteer":
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+    def lookup(self, name: str) -> Dict[str, Any] | None:
+        """Return the gazetteer record for ``name``.
+
+        ``"Kecksburg, Pennsylvania"`` falls back to ``"Kecksburg"`` when the
+        full string is not a known alias.
+        """
+        place = self._aliases.get(normalize(name))
+        if place is None and "," in name:
+            place = self._aliases.get(normalize(name.split(",", 1)[0]))
+        return place
+
+
+class GridIndex:
+    """Bucket points into ``cell_deg`` lat/lon cells for radius queries."""
+
+    def __init__(self, cell_deg: float = 1.0) -> None:
+        self.cell_deg = cell_deg
+        self.cells: Dict[Tuple[int, int], List[Tuple[float, float, Any]]] = defaultdict(list)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def add(self, lat: float, lon: float, item: Any) -> None:
+        self.cells[self._cell(lat, lon)].append((lat, lon, item))
+
+    def within(self, lat: float, lon: float, km: float) -> List[Tuple[float, Any]]:
+        """Return ``(distance_km, item)`` for points within ``km``, nearest first.
+
+        Only the cells overlapping the query's bounding box are scanned.
+        """
+        dlat = km / KM_PER_DEG_LAT
+        lat_lo, lat_hi = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        widest = math.cos(math.radians(max(abs(lat_lo), abs(lat_hi))))
+        dlon = 180.0 if widest < 1e-9 else min(180.0, dlat / widest)
+        row_lo, row_hi = self._cell(lat_lo, 0)[0], self._cell(lat_hi, 0)[0]
+        col_lo, col_hi = self._cell(0, lon - dlon)[1], self._cell(0, lon + dlon)[1]
+        ncols = round(360 / self.cell_deg)
+        cols = range(col_lo, col_hi + 1)
+        if len(cols) >= ncols:
+            cols = range(ncols)
+        wrap = -math.floor(180 / self.cell_deg)
+        hits: List[Tuple[float, Any]] = []
+        for row in range(row_lo, row_hi + 1):
+            for col in cols:
+                # Longitude cells wrap at the antimeridian.
+                col = (col - wrap) % ncols + wrap
+                for plat, plon, item in self.cells.get((row, col), ()):
+                    dist = haversine_km(lat, lon, plat, plon)
+                    if dist <= km:
+                        hits.append((dist, item))
+        hits.sort(key=lambda h: h[0])
+        return hits
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "cell_deg": self.cell_deg,
+            "cells": {f"{r},{c}": pts for (r, c), pts in sorted(self.cells.items())},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "GridIndex":
+        index = cls(data["cell_deg"])
+        for key, pts in data["cells"].items():
+            row, col = (int(k) for k in key.split(","))
+            index.cells[(row, col)] = [tuple(p) for p in pts]
+        return index
+
+    @classmethod
+    def load(cls, path: Path) -> "GridIndex":
+        return cls.from_json(json.loads(path.read_text(encoding="utf-8")))
@@ -0,0 +1,126 @@
+"""Write generated files only when their content changes.
+
+``OutputSink`` remembers a content hash and size for every file it emits in
+a manifest next to the outputs (``<root>/.<name>.manifest.json``). On the
+next run an output whose hash and on-disk size still match is skipped
+without reading the old file back. Outputs with no manifest entry yet are
+compared by content once. Changed files are written to a temporary
+file and renamed into place. Files from the previous run that were not
+emitted again are deleted. The run's delta is written to
+``<root>/.<name>.changes`` as ``A``/``M``/``D`` + tab + path lines (the
+same shape as ``git diff --name-status``), so publish steps can copy only
+what changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+# mkstemp creates files as 0600; renamed outputs get the mode a plain open() would give.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class OutputSink:
+    """Collect outputs under ``root`` and record what changed since the last run.
+
+    ``prune=False`` leaves outputs from earlier runs in place. Use it for
+    partial builds such as ``--only <video_id>``.
+    """
+
+    def __init__(self, root: Path, name: str = "outputs", prune: bool = True) -> None:
+        self.root = Path(root)
+        self.prune = prune
+        self.manifest_path = self.root / f".{name}.manifest.json"
+        self.changes_path = self.root / f".{name}.changes"
+        self._previous: Dict[str, Tuple[str, int]] = {}
+        if self.manifest_path.exists():
+            files = json.loads(self.manifest_path.read_text(encoding="utf-8"))["files"]
+            self._previous = {path: (entry["hash"], entry["size"]) for path, entry in files.items()}
+        self._current: Dict[str, Tuple[str, int]] = {}
+        self.added: List[str] = []
+        self.modified: List[str] = []
+        self.deleted: List[str] = []
+
+    def write_text(self, path: str | Path, text: str) -> bool:
+        """Write ``text`` to ``root/path`` unless it is unchanged; return whether it was written."""
+        return self.write_bytes(path, text.encode("utf-8"))
+
+    def write_bytes(self, path: str | Path, data: bytes) -> bool:
+        rel = Path(path).as_posix()
+        entry = (_digest(data), len(data))
+        self._current[rel] = entry
+        target = self.root / rel
+        try:
+            size = target.stat().st_size
+        except FileNotFoundError:
+            size = None
+        if size == entry[1]:
+            if self._previous.get(rel) == entry:
+                return False
+            # No manifest entry yet (first run or a fresh checkout):
+            # fall back to comparing content once.
+            if rel not in self._previous and target.read_bytes() == data:
+                return False
+        existed = size is not None
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(tmp, FILE_MODE)
+            os.replace(tmp, target)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        (self.modified if existed else self.added).append(rel)
+        return True
+
+    def close(self) -> None:
+        """Delete stale outputs, then save the manifest and the change list."""
+        if self.prune:
+            for rel in sorted(set(self._previous) - set(self._current)):
+                target = self.root / rel
+                if target.exists():
+                    target.unlink()
+                    self.deleted.append(rel)
+                    self._remove_empty_dirs(target.parent)
+        else:
+            self._current = {**self._previous, **self._current}
+        self.root.mkdir(parents=True, exist_ok=True)
+        files = {rel: {"hash": h, "size": size} for rel, (h, size) in sorted(self._current.items())}
+        manifest = json.dumps({"files": files}, indent=1) + "\n"
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp.write_text(manifest, encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+        lines = [f"A\t{p}" for p in self.added] + [f"M\t{p}" for p in self.modified] + [f"D\t{p}" for p in self.deleted]
+        self.changes_path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+    def _remove_empty_dirs(self, directory: Path) -> None:
+        root = self.root.resolve()
+        directory = directory.resolve()
+        while directory != root and root in directory.parents and not any(directory.iterdir()):
+            directory.rmdir()
+            directory = directory.parent
+
+    def summary(self) -> str:
+        return (f"{len(self.added)} added, {len(self.modified)} modified, {len(self.deleted)} deleted, "
+                f"{len(self._current) - len(self.added) - len(self.modified)} unchanged")
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # A failed build keeps the previous manifest so nothing is pruned by mistake.
+        if exc_type is None:
+            self.close()
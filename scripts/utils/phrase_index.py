@@ -0,0 +1,323 @@
+"""Suffix array over the normalized corpus for exact phrase lookup.
+
+Every clean transcript is normalized (lowercased, apostrophes dropped, other
+punctuation collapsed to single spaces) and the documents are joined with
+``SEP``. The suffix array is built by prefix doubling: each round sorts the
+suffixes that still tie on their first ``k`` bytes by the rank of the next
+``k``, packed with their own rank into a single integer key. The LCP array comes from comparing neighbouring suffixes a byte
+at a time. Only pairs still equal at a given depth stay in play, so the total
+work is the sum of the LCPs.
+
+A second, word-start suffix array keeps only the suffixes that begin a word,
+with its own LCP array. Whole-word lookups run on it: the suffixes starting
+with the phrase followed by a space or ``SEP`` form two contiguous ranges, so
+a whole-word count costs the same binary searches as a substring count.
+
+The index directory holds raw arrays written with ``numpy.save`` and a small
+``meta.json``. :class:`PhraseIndex` opens them memory-mapped, so loading costs
+nothing however large the corpus is. A lookup is a binary search comparing at
+most ``m`` bytes per step, which is ``O(m log n)`` for an ``m``-byte phrase.
+Hits map back to their video, and to the caption times from each
+``timemap.json``.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+INDEX_DIR = Path("data/phrase_index")
+INDEX_VERSION = 2
+SEP = b"\n"
+WORD = re.compile(r"\w+(?:['’]\w+)*")
+APOSTROPHES = re.compile(r"['’]")
+
+
+def normalize(text: str) -> str:
+    """The form both the corpus and queries are matched in."""
+    return " ".join(APOSTROPHES.sub("", w) for w in WORD.findall(text.lower()))
+
+
+def normalize_document(text: str, offsets: Sequence[int]) -> Tuple[bytes, np.ndarray]:
+    """Normalized UTF-8 bytes of ``text`` and the byte position of each of ``offsets`` in them.
+
+    An offset inside or between words maps to the start of the next word.
+    """
+    words = []
+    origin = []
+    for match in WORD.finditer(text.lower()):
+        words.append(APOSTROPHES.sub("", match.group()).encode("utf-8"))
+        origin.append(match.start())
+    if not words:
+        return b"", np.zeros(len(offsets), dtype=np.int64)
+    lengths = np.fromiter((len(w) + 1 for w in words), dtype=np.int64, count=len(words))
+    positions = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    index = np.searchsorted(np.asarray(origin), np.asarray(offsets, dtype=np.int64))
+    body = b" ".join(words)
+    mapped = np.where(index < len(words), positions[np.minimum(index, len(words) - 1)], len(body))
+    return body, mapped
+
+
+def suffix_array(text: np.ndarray) -> np.ndarray:
+    """Start positions of the suffixes of ``text`` (``uint8``) in sorted order."""
+    n = len(text)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    positions = np.arange(n)
+    order = np.argsort(text, kind="stable")
+    first = text[order]
+    head = np.concatenate(([True], first[1:] != first[:-1]))
+    # A suffix's rank is where its group of equal prefixes starts in ``order``.
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.maximum.accumulate(np.where(head, positions, 0))
+    k = 1
+    while True:
+        # Only groups of two or more still need sorting; singletons are final.
+        tied = ~(head & np.concatenate((head[1:], [True])))
+        slots = np.flatnonzero(tied)
+        if not len(slots):
+            return order
+        members = order[slots]
+        after = members + k
+        second = np.where(after < n, rank[np.minimum(after, n - 1)] + 1, 0)  # 0: the suffix ended first
+        key = rank[members] * (n + 1) + second
+        perm = np.argsort(key)
+        order[slots] = members[perm]
+        key = key[perm]
+        head[slots[1:]] |= key[1:] != key[:-1]
+        rank[order[slots]] = np.maximum.accumulate(np.where(head, positions, 0))[slots]
+        k *= 2
+
+
+def lcp_array(text: np.ndarray, sa: np.ndarray, stop: int = SEP[0]) -> np.ndarray:
+    """``lcp[i]``: common prefix length of suffixes ``sa[i - 1]`` and ``sa[i]``, never crossing ``stop``.
+
+    ``sa`` may be any sorted subset of the suffixes, such as the word starts.
+    """
+    n = len(sa)
+    lcp = np.zeros(n, dtype=np.int32)
+    if n < 2:
+        return lcp
+    end = len(text)
+    padded = np.concatenate((text, [stop])).astype(np.uint8)  # every suffix ends in a mismatch
+    left = sa[:-1].astype(np.int64)
+    right = sa[1:].astype(np.int64)
+    active = np.arange(n - 1)
+    depth = 0
+    while len(active):
+        a = padded[np.minimum(left[active] + depth, end)]
+        b = padded[np.minimum(right[active] + depth, end)]
+        same = (a == b) & (a != stop)
+        done = active[~same]
+        lcp[done + 1] = depth
+        active = active[same]
+        depth += 1
+    return lcp
+
+
+def word_starts(text: np.ndarray, sa: np.ndarray) -> np.ndarray:
+    """The entries of ``sa`` that start a word, still in sorted order."""
+    if not len(text):
+        return sa
+    breaks = (text == ord(" ")) | (text == SEP[0])
+    start = ~breaks & np.concatenate(([True], breaks[:-1]))
+    return sa[start[sa]]
+
+
+def build(docs: Dict[str, Tuple[str, Dict[str, list] | None]], out_dir: Path = INDEX_DIR) -> dict:
+    """Index ``{video_id: (clean text, timemap or None)}`` into ``out_dir``; return its metadata."""
+    videos = sorted(docs)
+    parts: List[bytes] = []
+    doc_start: List[int] = []
+    seg_first: List[int] = [0]
+    seg_pos, seg_start, seg_end = [], [], []
+    pos = 0
+    for vid in videos:
+        text, timemap = docs[vid]
+        offsets = timemap["offset"] if timemap else []
+        body, mapped = normalize_document(text, offsets)
+        doc_start.append(pos)
+        seg_first.append(seg_first[-1] + len(offsets))
+        seg_pos.append(mapped + pos)
+        seg_start.append(np.asarray(timemap["start"] if timemap else [], dtype=np.float64))
+        seg_end.append(np.asarray(timemap["end"] if timemap else [], dtype=np.float64))
+        parts.append(body)
+        pos += len(body) + len(SEP)
+    corpus = SEP.join(parts)
+    text = np.frombuffer(corpus, dtype=np.uint8)
+    sa = suffix_array(text)
+    lcp = lcp_array(text, sa)
+    wsa = word_starts(text, sa)
+    wlcp = lcp_array(text, wsa)
+    index_dtype = np.int32 if len(text) < 2 ** 31 else np.int64
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "text.bin").write_bytes(corpus)
+    np.save(out_dir / "sa.npy", sa.astype(index_dtype))
+    np.save(out_dir / "lcp.npy", lcp)
+    np.save(out_dir / "wsa.npy", wsa.astype(index_dtype))
+    np.save(out_dir / "wlcp.npy", wlcp)
+    np.save(out_dir / "seg_pos.npy", np.concatenate(seg_pos).astype(np.int64) if seg_pos else np.zeros(0, np.int64))
+    np.save(out_dir / "seg_start.npy", np.concatenate(seg_start) if seg_start else np.zeros(0))
+    np.save(out_dir / "seg_end.npy", np.concatenate(seg_end) if seg_end else np.zeros(0))
+    meta = {"version": INDEX_VERSION, "videos": videos, "doc_start": doc_start, "seg_first": seg_first, "bytes": len(corpus)}
+    (out_dir / "meta.json").write_text(json.dumps(meta))
+    return meta
+
+
+class Hit(NamedTuple):
+    video_id: str
+    offset: int
+    start: float | None
+    end: float | None
+    context: str
+
+
+class Repeat(NamedTuple):
+    phrase: str
+    count: int
+    videos: int
+
+
+class PhraseIndex:
+    """Exact phrase queries over an index written by :func:`build`.
+
+    Lookups match whole words by default; ``whole_words=False`` also matches
+    inside longer words ("ufo" in "ufology").
+    """
+
+    def __init__(self, path: Path = INDEX_DIR) -> None:
+        meta = json.loads((path / "meta.json").read_text())
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path} was built by an older version; rebuild it with 09_build_phrase_index.py")
+        self.videos: List[str] = meta["videos"]
+        self.doc_start = np.asarray(meta["doc_start"], dtype=np.int64)
+        self.seg_first: List[int] = meta["seg_first"]
+        self._file = open(path / "text.bin", "rb")
+        self.text = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if meta["bytes"] else b""
+        self.sa = np.load(path / "sa.npy", mmap_mode="r")
+        self.lcp = np.load(path / "lcp.npy", mmap_mode="r")
+        self.wsa = np.load(path / "wsa.npy", mmap_mode="r")
+        self.wlcp = np.load(path / "wlcp.npy", mmap_mode="r")
+        self.seg_pos = np.load(path / "seg_pos.npy", mmap_mode="r")
+        self.seg_start = np.load(path / "seg_start.npy", mmap_mode="r")
+        self.seg_end = np.load(path / "seg_end.npy", mmap_mode="r")
+
+    def close(self) -> None:
+        if isinstance(self.text, mmap.mmap):
+            self.text.close()
+        self._file.close()
+
+    def __enter__(self) -> "PhraseIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.sa)
+
+    def range(self, phrase: str) -> Tuple[int, int]:
+        """The half-open slice of the suffix array whose suffixes start with ``phrase``."""
+        return self._bounds(self.sa, normalize(phrase).encode("utf-8"))
+
+    def _bounds(self, sa: np.ndarray, key: bytes) -> Tuple[int, int]:
+        m = len(key)
+        if not m:
+            return 0, 0
+        text = self.text
+        lo, hi = 0, len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            p = int(sa[mid])
+            if text[p:p + m] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        first, hi = lo, len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            p = int(sa[mid])
+            if text[p:p + m] <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return first, lo
+
+    def _slices(self, key: bytes, whole_words: bool) -> List[np.ndarray]:
+        """Start positions of ``key`` as slices of the (word-start) suffix array."""
+        if not whole_words:
+            lo, hi = self._bounds(self.sa, key)
+            return [self.sa[lo:hi]]
+        wsa = self.wsa
+        out = [wsa[slice(*self._bounds(wsa, key + follow))] for follow in (SEP, b" ")]
+        # The corpus ends without a separator; its last word is followed by nothing.
+        lo, hi = self._bounds(wsa, key)
+        if lo < hi and int(wsa[lo]) + len(key) == len(self.text):
+            out.append(wsa[lo:lo + 1])
+        return out
+
+    def count(self, phrase: str, whole_words: bool = True) -> int:
+        """Occurrences of ``phrase``, from binary searches alone."""
+        key = normalize(phrase).encode("utf-8")
+        return sum(len(part) for part in self._slices(key, whole_words)) if key else 0
+
+    def locate(self, pos: int) -> Hit:
+        """Video, offset within it and caption span of corpus byte ``pos``."""
+        doc = int(np.searchsorted(self.doc_start, pos, side="right")) - 1
+        first, last = self.seg_first[doc], self.seg_first[doc + 1]
+        seg = int(np.searchsorted(self.seg_pos[first:last], pos, side="right")) - 1
+        start = float(self.seg_start[first + seg]) if seg >= 0 else None
+        end = float(self.seg_end[first + seg]) if seg >= 0 else None
+        return Hit(self.videos[doc], pos - int(self.doc_start[doc]), start, end, "")
+
+    def _context(self, pos: int, length: int, width: int) -> str:
+        """Up to ``width`` bytes either side of a match, without leaving its document."""
+        lo = max(0, pos - width)
+        before = bytes(self.text[lo:pos]).rsplit(SEP, 1)[-1]
+        after = bytes(self.text[pos:pos + length + width]).split(SEP, 1)[0]
+        return (before + after).decode("utf-8", errors="ignore").strip()
+
+    def search(self, phrase: str, whole_words: bool = True, limit: int | None = None,
+               width: int = 60) -> Iterator[Hit]:
+        """Occurrences of ``phrase`` in corpus order, with their video and caption times."""
+        key = normalize(phrase).encode("utf-8")
+        if not key:
+            return
+        positions = np.sort(np.concatenate([np.asarray(part, dtype=np.int64)
+                                            for part in self._slices(key, whole_words)]))
+        for pos in positions[:limit].tolist():
+            yield self.locate(pos)._replace(context=self._context(pos, len(key), width))
+
+    def repeats(self, top: int = 20, min_words: int = 5, min_videos: int = 1) -> List[Repeat]:
+        """The longest whole-word phrases said more than once, skipping ones inside a longer reported phrase."""
+        wsa, wlcp = self.wsa, np.asarray(self.wlcp)
+        candidates = np.flatnonzero(wlcp >= min_words * 2)
+        candidates = candidates[np.argsort(-wlcp[candidates], kind="stable")]
+        found: List[Repeat] = []
+        seen: List[str] = []
+        for i in candidates.tolist():
+            phrase = self._trim(int(wsa[i - 1]), int(wsa[i]), int(wlcp[i]))
+            if len(phrase.split()) < min_words or any(phrase in longer for longer in seen):
+                continue
+            seen.append(phrase)
+            positions = np.concatenate([np.asarray(part, dtype=np.int64)
+                                        for part in self._slices(phrase.encode("utf-8"), True)])
+            docs = np.unique(np.searchsorted(self.doc_start, positions, side="right"))
+            if len(docs) < min_videos:
+                continue
+            found.append(Repeat(phrase, len(positions), len(docs)))
+            if len(found) >= top:
+                break
+        return found
+
+    def _trim(self, a: int, b: int, length: int) -> str:
+        """The common prefix of the word-start suffixes ``a`` and ``b``, cut back to whole words in both."""
+        body = bytes(self.text[b:b + length])
+        if any(self.text[p + length:p + length + 1] not in (b"", b" ", SEP) for p in (a, b)):
+            body = body.rsplit(b" ", 1)[0] if b" " in body else b""
+        return body.decode("utf-8", errors="ignore").strip()
@@ -0,0 +1,137 @@
+"""Drop low-confidence and hallucinated Whisper segments before merging.
+
+Whisper marks each segment with ``avg_logprob``, ``no_speech_prob`` and
+``compression_ratio``. The gates below follow Whisper's own decoding
+heuristics. A segment is silence when ``no_speech_prob`` is high *and*
+``avg_logprob`` is low. It is degenerate when gzip compresses its text
+unusually well. Hallucination loops, where one sentence or a short cycle of
+sentences repeats during silence or music, often pass both tests segment by
+segment. They are found by comparing rolling hashes of consecutive windows of
+segment fingerprints. Segments from sources without these fields (vtt/srt/tsv)
+only go through the loop check.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Sequence, Set, Tuple
+
+REASONS = ("no_speech", "low_logprob", "compression", "repetition")
+
+_MOD = (1 << 61) - 1
+_BASE = 1_000_003
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class QualityGates:
+    no_speech_threshold: float = 0.6
+    logprob_threshold: float = -1.0
+    compression_threshold: float = 2.4
+    # Segments below this average log-probability are dropped whatever their
+    # no-speech probability; off unless set.
+    min_logprob: float | None = None
+    max_period: int = 4
+    min_repeats: int = 3
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def reject_reason(seg: Dict, gates: QualityGates) -> str | None:
+    """The first gate ``seg`` fails on its own metadata, or ``None``."""
+    logprob = seg.get("avg_logprob")
+    no_speech = seg.get("no_speech_prob")
+    compression = seg.get("compression_ratio")
+    if no_speech is not None and logprob is not None:
+        if no_speech > gates.no_speech_threshold and logprob < gates.logprob_threshold:
+            return "no_speech"
+    if logprob is not None and gates.min_logprob is not None and logprob < gates.min_logprob:
+        return "low_logprob"
+    if compression is not None and compression > gates.compression_threshold:
+        return "compression"
+    return None
+
+
+def _fingerprint(text: str) -> int | None:
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    return int.from_bytes(hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=8).digest(), "big") % _MOD
+
+
+def repetition_loops(texts: Sequence[str], max_period: int = 4, min_repeats: int = 3) -> Set[int]:
+    """Indices of segments that repeat an earlier cycle of ``1..max_period`` segments.
+
+    A cycle must occur at least ``min_repeats`` times in a row to count as a
+    loop. Its first occurrence is kept and the repeats are returned. Window
+    hashes come from prefix sums of a polynomial rolling hash, so comparing
+    two windows costs O(1) whatever the period.
+    """
+    n = len(texts)
+    fps = []
+    for i, text in enumerate(texts):
+        fp = _fingerprint(text)
+        # Empty segments get distinct values so they never form a loop.
+        fps.append(fp if fp is not None else _MOD + i)
+    prefix = [0] * (n + 1)
+    powers = [1] * (n + 1)
+    for i, fp in enumerate(fps):
+        prefix[i + 1] = (prefix[i] * _BASE + fp) % _MOD
+        powers[i + 1] = powers[i] * _BASE % _MOD
+
+    def window(a: int, b: int) -> int:
+        return (prefix[b] - prefix[a] * powers[b - a]) % _MOD
+
+    dropped: Set[int] = set()
+    i = 0
+    while i < n:
+        best: Tuple[int, int] | None = None
+        for period in range(1, max_period + 1):
+            if i + period > n:
+                break
+            first = window(i, i + period)
+            end = i + period
+            while end + period <= n and window(end, end + period) == first:
+                end += period
+            if (end - i) // period >= min_repeats and (best is None or end > best[1]):
+                best = (period, end)
+        if best is None:
+            i += 1
+            continue
+        period, end = best
+        dropped.update(range(i + period, end))
+        i = end
+    return dropped
+
+
+def filter_segments(segments: List[Dict], gates: QualityGates) -> Tuple[List[Dict], Dict]:
+    """Apply ``gates`` to time-ordered ``segments``.
+
+    Returns the kept segments and a report with the total segment count and the
+    dropped segments and seconds, overall and per reason.
+    """
+    reasons: List[str | None] = [reject_reason(seg, gates) for seg in segments]
+    # Loops are detected on what survives the per-segment gates, so a
+    # degenerate segment between two repeats does not break the cycle.
+    survivors = [i for i, reason in enumerate(reasons) if reason is None]
+    loops = repetition_loops([str(segments[i]["text"]) for i in survivors], gates.max_period, gates.min_repeats)
+    for k in loops:
+        reasons[survivors[k]] = "repetition"
+    report: Dict = {"segments": len(segments), "dropped_segments": 0, "dropped_seconds": 0.0,
+                    "by_reason": {r: {"segments": 0, "seconds": 0.0} for r in REASONS}}
+    kept: List[Dict] = []
+    for seg, reason in zip(segments, reasons):
+        if reason is None:
+            kept.append(seg)
+            continue
+        seconds = max(0.0, float(seg["end"]) - float(seg["start"]))
+        report["dropped_segments"] += 1
+        report["dropped_seconds"] += seconds
+        report["by_reason"][reason]["segments"] += 1
+        report["by_reason"][reason]["seconds"] += seconds
+    report["dropped_seconds"] = round(report["dropped_seconds"], 3)
+    for entry in report["by_reason"].values():
+        entry["seconds"] = round(entry["seconds"], 3)
+    return kept, report
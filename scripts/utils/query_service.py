@@ -0,0 +1,194 @@
+"""Cached, coalescing query layer over ``data/corpus.sqlite``.
+
+Used in-process by the load tester and behind HTTP by ``serve_corpus.py``.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, Hashable, List, Mapping, Tuple
+
+from utils import corpus_db
+
+
+class LRUCache:
+    """Least-recently-used cache of response bodies bounded by total bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> bytes | None:
+        body = self._data.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._data[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class LatencyRecorder:
+    """Keep the most recent latency samples and report tail percentiles."""
+
+    def __init__(self, window: int = 10_000) -> None:
+        self.count = 0
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self._samples.append(seconds)
+
+    def percentiles(self) -> Dict[str, float]:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+
+        def pct(p: float) -> float:
+            # Nearest-rank percentile.
+            idx = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+            return round(ordered[idx] * 1000, 3)
+
+        return {"p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99)}
+
+
+def _int(params: Mapping[str, str], key: str, default: int | None = None) -> int | None:
+    value = params.get(key)
+    return int(value) if value not in (None, "") else default
+
+
+def _float(params: Mapping[str, str], key: str, default: float | None = None) -> float | None:
+    value = params.get(key)
+    return float(value) if value not in (None, "") else default
+
+
+def _required(params: Mapping[str, str], key: str) -> str:
+    value = params.get(key)
+    if not value:
+        raise ValueError(f"missing parameter: {key}")
+    return value
+
+
+Handler = Callable[[sqlite3.Connection, Mapping[str, str]], List[sqlite3.Row]]
+
+ROUTES: Dict[str, Handler] = {
+    "/search": lambda conn, p: corpus_db.search_segments(
+        conn, _required(p, "q"), _int(p, "after_year"), _float(p, "max_sentiment"),
+        _int(p, "limit", 50), _float(p, "year_near", corpus_db.YEAR_NEAR_S)),
+    "/entity": lambda conn, p: corpus_db.videos_for_entity(conn, _required(p, "name")),
+    "/related": lambda conn, p: corpus_db.related_videos(
+        conn, _required(p, "video_id"), _int(p, "limit", 10)),
+    "/timeline": lambda conn, p: corpus_db.year_mentions(
+        conn, _int(p, "from", 0), _int(p, "to", _int(p, "from", 9999))),
+}
+
+
+class QueryService:
+    """Answer route queries as JSON bytes with caching and request coalescing.
+
+    Identical queries that arrive while one is already running share its
+    result instead of hitting SQLite again; finished results go into a
+    byte-bounded LRU cache. Every request counts as either a cache hit
+    (including coalesced ones) or a miss.
+    """
+
+    def __init__(self, db_path: Path = corpus_db.DB_PATH, cache_bytes: int = 64 << 20,
+                 mmap_bytes: int = 256 << 20, workers: int = 4) -> None:
+        self.db_path = db_path
+        self.mmap_bytes = mmap_bytes
+        self.cache = LRUCache(cache_bytes)
+        self.latency = LatencyRecorder()
+        self.coalesced = 0
+        self.errors = 0
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="corpus-query")
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread; each worker opens its own.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = corpus_db.connect(self.db_path, self.mmap_bytes)
+            self._local.conn = conn
+        return conn
+
+    def run(self, route: str, params: Mapping[str, str]) -> bytes:
+        """Execute ``route`` synchronously, bypassing cache and coalescing."""
+        handler = ROUTES.get(route)
+        if handler is None:
+            raise KeyError(route)
+        rows = handler(self._conn(), params)
+        return json.dumps([dict(r) for r in rows], ensure_ascii=False).encode("utf-8")
+
+    async def query(self, route: str, params: Mapping[str, str]) -> bytes:
+        started = time.perf_counter()
+        key = (route, tuple(sorted(params.items())))
+        try:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                # Answered without a query of its own: counts as a cache hit.
+                self.coalesced += 1
+                self.cache.hits += 1
+            else:
+                body = self.cache.get(key)
+                if body is not None:
+                    return body
+                # The executor future belongs to no request, so cancelling the
+                # request that started it (client gone, server shutting down)
+                # leaves it running for the others waiting on it.
+                pending = asyncio.get_running_loop().run_in_executor(
+                    self._executor, self.run, route, dict(params))
+                self._inflight[key] = pending
+                pending.add_done_callback(functools.partial(self._finished, key))
+            return await asyncio.shield(pending)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.latency.add(time.perf_counter() - started)
+
+    def _finished(self, key: Tuple, future: asyncio.Future) -> None:
+        del self._inflight[key]
+        # ``exception()`` also marks a failure retrieved when nobody is left waiting.
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.latency.count,
+            **self.latency.percentiles(),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "cache_entries": len(self.cache),
+            "cache_bytes": self.cache.size,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
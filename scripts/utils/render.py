@@ -0,0 +1,76 @@
+"""Parallel page renderer.
+
+``render_pages`` renders a sequence of pages in order. It runs serially,
+or across a process pool fed with chunks of pages. Page inputs (transcripts
+and other per-page files) are read ahead by a thread pool while earlier
+chunks render. Results come back in input order, so the caller writes them
+in the main thread while the workers keep rendering. Parallel and serial
+runs produce identical output.
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterator, List, Sequence, Tuple
+
+Render = Callable[[Any, Any, Any], str]
+Load = Callable[[Any], Any]
+
+
+# Set in each worker by ``_install`` so the shared context is transferred
+# once per process rather than once per page.
+_WORKER: Tuple[Render, Any] | None = None
+
+
+def _install(render: Render, context: Any) -> None:
+    global _WORKER
+    _WORKER = (render, context)
+
+
+def _render_chunk(items: Sequence[Any], inputs: Sequence[Any]) -> List[str]:
+    render, context = _WORKER
+    return [render(context, item, data) for item, data in zip(items, inputs)]
+
+
+def _no_inputs(item: Any) -> None:
+    return None
+
+
+def _load_chunk(load: Load, items: Sequence[Any]) -> List[Any]:
+    return [load(item) for item in items]
+
+
+def render_pages(render: Render, items: Sequence[Any], context: Any = None, load: Load | None = None,
+                 jobs: int = 0, chunk_size: int = 0) -> Iterator[str]:
+    """Yield ``render(context, item, load(item))`` for each item, in order.
+
+    ``render`` must be a module-level function so worker processes can find
+    it. ``jobs`` defaults to the CPU count; ``jobs=1`` renders serially in
+    this process.
+    """
+    load = load or _no_inputs
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(items) < 2:
+        for item in items:
+            yield render(context, item, load(item))
+        return
+    # Enough chunks per worker to balance uneven pages, few enough to keep
+    # per-task overhead low.
+    chunk_size = chunk_size or max(1, min(64, len(items) // (jobs * 4)))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    with ThreadPoolExecutor(max(4, jobs)) as io, \
+            ProcessPoolExecutor(jobs, initializer=_install, initargs=(render, context)) as pool:
+        reads = deque(io.submit(_load_chunk, load, c) for c in chunks[:jobs * 2])
+        next_read = len(reads)
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_render_chunk, chunk, reads.popleft().result()))
+            if next_read < len(chunks):
+                reads.append(io.submit(_load_chunk, load, chunks[next_read]))
+                next_read += 1
+            # Hand back finished chunks in order while later ones are still rendering.
+            while pending and (pending[0].done() or len(pending) > jobs * 2):
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
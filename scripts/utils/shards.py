@@ -0,0 +1,110 @@
+"""Sharded runs of the per-video analysis stages, merged by a reduce step.
+
+A stage run with ``--shard i/N`` (``0 <= i < N``) handles only the videos
+whose id hashes to ``i``. The hash is stable, so every node agrees without
+coordination. The run writes its partial output to
+``data/shards/<stage>/<i>-of-<N>.json.gz``. Partial outputs are plain data
+keyed by video id, such as metrics rows, raw entity lists, term counts or
+claim counts, so parts can be merged in any order.
+
+``--reduce`` reads all ``N`` parts and writes the same ``data/`` files a
+single-node run does. A run with neither flag is a map over every video
+followed by the same reduce, in memory, so the two modes share one code path.
+Parts made on several build nodes only need to be copied into
+``data/shards/`` on the node that reduces.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+SHARD_DIR = Path("data/shards")
+PART_RE = re.compile(r"(\d+)-of-(\d+)\.json\.gz$")
+
+Keep = Callable[[str], bool]
+
+
+def shard_of(video_id: str, count: int) -> int:
+    """Stable shard number of ``video_id`` among ``count`` shards."""
+    digest = hashlib.blake2b(video_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+class Shard(NamedTuple):
+    index: int
+    count: int
+
+    def owns(self, video_id: str) -> bool:
+        return shard_of(video_id, self.count) == self.index
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def parse_shard(value: str) -> Shard:
+    """``argparse`` type for ``i/N``."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}") from None
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}, got {index}")
+    return Shard(index, count)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--shard", type=parse_shard, metavar="i/N",
+                       help="only process videos of shard i of N and write a partial output")
+    group.add_argument("--reduce", action="store_true", help="merge the partial outputs of all shards")
+
+
+def part_path(stage: str, shard: Shard) -> Path:
+    return SHARD_DIR / stage / f"{shard.index}-of-{shard.count}.json.gz"
+
+
+def write_part(stage: str, shard: Shard, data: Dict) -> Path:
+    path = part_path(stage, shard)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps({"stage": stage, "shard": shard.index, "count": shard.count, "data": data})
+    with gzip.GzipFile(path, "wb", mtime=0) as out:
+        out.write(payload.encode("utf-8"))
+    return path
+
+
+def read_parts(stage: str) -> List[Dict]:
+    """The data of every part of ``stage`` in shard order; exits if any part is missing."""
+    found: Dict[int, Dict[int, Path]] = {}
+    for path in sorted((SHARD_DIR / stage).glob("*-of-*.json.gz")):
+        match = PART_RE.match(path.name)
+        if match:
+            found.setdefault(int(match.group(2)), {})[int(match.group(1))] = path
+    if len(found) != 1:
+        counts = ", ".join(str(n) for n in sorted(found)) or "none"
+        raise SystemExit(f"{stage}: expected parts of exactly one shard count in {SHARD_DIR / stage}, found {counts}")
+    (count, parts), = found.items()
+    missing = [str(i) for i in range(count) if i not in parts]
+    if missing:
+        raise SystemExit(f"{stage}: missing parts {', '.join(missing)} of {count}")
+    out = []
+    for i in range(count):
+        with gzip.open(parts[i], "rb") as f:
+            out.append(json.loads(f.read())["data"])
+    return out
+
+
+def run(stage: str, args: argparse.Namespace, map_videos: Callable[[Keep | None], Dict],
+        reduce_parts: Callable[[List[Dict]], None]) -> None:
+    """Map, reduce, or both, depending on ``--shard`` / ``--reduce``."""
+    if args.reduce:
+        reduce_parts(read_parts(stage))
+    elif args.shard:
+        path = write_part(stage, args.shard, map_videos(args.shard.owns))
+        print(f"{stage}: shard {args.shard} written to {path}")
+    else:
+        reduce_parts([map_videos(None)])
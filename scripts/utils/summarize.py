@@ -0,0 +1,71 @@
+"""Extractive summaries by LexRank over a thresholded sparse similarity graph.
+
+Sentences are TF-IDF vectors with L2 norm, so a row-block sparse product
+``X[block] @ X.T`` gives cosine similarities. Entries below ``threshold`` are
+dropped before the block is kept. Memory is therefore bounded by the block
+size and the surviving edges, never by ``n²``. Centrality is weighted
+PageRank by sparse power iteration, the same routine that ranks the entity
+graph. The top sentences are taken greedily, skipping near-duplicates of
+ones already chosen, and returned in transcript order.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import List, Sequence
+
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils.entity_graph import pagerank
+from utils.topic_model import STOP_WORDS
+
+BLOCK = 512
+
+
+def similarity_graph(matrix: sparse.csr_matrix, threshold: float, block: int = BLOCK) -> sparse.csr_matrix:
+    """Cosine similarities of L2-normalized rows at or above ``threshold``, without self-loops."""
+    n = matrix.shape[0]
+    parts = []
+    for lo in range(0, n, block):
+        sims = (matrix[lo:lo + block] @ matrix.T).tocsr()
+        sims.data[sims.data < threshold] = 0.0
+        sims.eliminate_zeros()
+        parts.append(sims)
+    graph = sparse.vstack(parts).tocsr() if parts else sparse.csr_matrix((0, 0))
+    graph = (graph - sparse.diags(graph.diagonal())).tocsr()
+    graph.eliminate_zeros()
+    return graph
+
+
+def lexrank(sentences: Sequence[str], k: int = 5, threshold: float = 0.1, redundancy: float = 0.5,
+            min_words: int = 12, max_words: int = 60) -> List[int]:
+    """Indices of the ``k`` most central sentences, in their original order.
+
+    Sentences outside ``min_words..max_words`` can still pass on centrality
+    but are never chosen, which keeps fragments and run-ons out of summaries.
+    """
+    lengths = [len(s.split()) for s in sentences]
+    candidates = [i for i, n in enumerate(lengths) if min_words <= n <= max_words]
+    if len(candidates) <= k:
+        return candidates
+    try:
+        matrix = TfidfVectorizer(stop_words=STOP_WORDS, sublinear_tf=True).fit_transform(sentences).tocsr()
+    except ValueError:  # nothing but stop words
+        return candidates[:k]
+    scores = pagerank(similarity_graph(matrix, threshold))
+    chosen: List[int] = []
+    for i in sorted(candidates, key=lambda i: (-scores[i], i)):
+        row = matrix[i]
+        if chosen and (matrix[chosen] @ row.T).max() > redundancy:
+            continue
+        chosen.append(i)
+        if len(chosen) == k:
+            break
+    return sorted(chosen)
+
+
+def text_hash(text: str, **params) -> str:
+    """Cache key for a summary of ``text`` made with ``params``."""
+    key = json.dumps(params, sort_keys=True) + "\0" + text
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
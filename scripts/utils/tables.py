@@ -0,0 +1,112 @@
+"""Columnar Parquet outputs shared by the analysis stages."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import pandas as pd
+
+DATA_DIR = Path("data")
+SEGMENTS = DATA_DIR / "segments.parquet"
+METRICS = DATA_DIR / "metrics.parquet"
+ENTITY_MENTIONS = DATA_DIR / "entity_mentions.parquet"
+CLAIMS = DATA_DIR / "claims.parquet"
+SEGMENT_QUALITY = DATA_DIR / "segment_quality.parquet"
+TOPIC_WINDOWS = DATA_DIR / "topic_windows.parquet"
+
+SEGMENT_DTYPES = {
+    "video_id": "string",
+    "start": "float64",
+    "end": "float64",
+    "text": "string",
+    "avg_logprob": "Float64",
+    "no_speech_prob": "Float64",
+    "compression_ratio": "Float64",
+}
+QUALITY_DTYPES = {
+    "video_id": "string",
+    "segments": "int64",
+    "dropped_segments": "int64",
+    "dropped_seconds": "float64",
+    "no_speech_segments": "int64",
+    "low_logprob_segments": "int64",
+    "compression_segments": "int64",
+    "repetition_segments": "int64",
+    "repetition_seconds": "float64",
+}
+METRICS_DTYPES = {
+    "video_id": "string",
+    "words": "int64",
+    "sentences": "int64",
+    "unique_words": "int64",
+    "ttr": "float64",
+    "duration_covered": "float64",
+    "wpm": "float64",
+    "mean_sentence_length": "float64",
+    "fk_grade": "float64",
+    "sentiment_mean": "float64",
+    "sentiment_std": "float64",
+    "questions_count": "int64",
+    "hedge_terms_count": "int64",
+    "uncertainty_markers_count": "int64",
+}
+ENTITY_DTYPES = {"video_id": "string", "kind": "string", "name": "string"}
+TOPIC_WINDOW_DTYPES = {"video_id": "string", "start": "float64", "end": "float64", "topic": "int64", "weight": "float64"}
+CLAIM_DTYPES = {
+    "video_id": "string",
+    "earliest": "Int64",
+    "latest": "Int64",
+    "assertion": "int64",
+    "question": "int64",
+    "speculation": "int64",
+}
+
+
+def frame(rows: Iterable[Dict], dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Build a DataFrame with exactly the columns and dtypes of ``dtypes``."""
+    df = pd.DataFrame(list(rows), columns=list(dtypes))
+    return df.astype(dtypes)
+
+
+def write_table(df: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, index=False)
+
+
+def read_table(path: Path, columns: Sequence[str] | None = None) -> pd.DataFrame:
+    """Read a Parquet table, decoding only ``columns`` when given."""
+    return pd.read_parquet(path, columns=list(columns) if columns else None)
+
+
+def segments_frame(base: Path) -> pd.DataFrame:
+    """Concatenate every ``<id>.segments.csv`` under ``base`` into one table."""
+    parts: List[pd.DataFrame] = []
+    for seg_csv in sorted(base.glob("*/*.segments.csv")):
+        df = pd.read_csv(seg_csv, keep_default_na=False, na_values={k: [""] for k in SEGMENT_DTYPES if k != "text"})
+        df.insert(0, "video_id", seg_csv.parent.name)
+        # Older CSVs and non-Whisper sources have no confidence columns.
+        parts.append(df.reindex(columns=list(SEGMENT_DTYPES)))
+    if not parts:
+        return frame([], SEGMENT_DTYPES)
+    return pd.concat(parts, ignore_index=True).astype(SEGMENT_DTYPES)
+
+
+def quality_frame(base: Path) -> pd.DataFrame:
+    """One row per ``<id>.quality.json`` under ``base``: what the quality gates dropped."""
+    rows = []
+    for path in sorted(base.glob("*/*.quality.json")):
+        report = json.loads(path.read_text())
+        by_reason = report["by_reason"]
+        rows.append({
+            "video_id": path.parent.name,
+            "segments": report["segments"],
+            "dropped_segments": report["dropped_segments"],
+            "dropped_seconds": report["dropped_seconds"],
+            "no_speech_segments": by_reason["no_speech"]["segments"],
+            "low_logprob_segments": by_reason["low_logprob"]["segments"],
+            "compression_segments": by_reason["compression"]["segments"],
+            "repetition_segments": by_reason["repetition"]["segments"],
+            "repetition_seconds": by_reason["repetition"]["seconds"],
+        })
+    return frame(rows, QUALITY_DTYPES)
@@ -2,15 +2,21 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Sequence, Tuple
 
 BRACKET_RE = re.compile(r"\[(?:music|applause|laughter|silence|\s*)\]", re.I)
+TOKEN_RE = re.compile(r"\w+(?:['’]\w+)*")
 HEDGE_TERMS = {
-    "maybe", "perhaps", "seems", "appears", "approx", "likely",
+    "maybe", "perhaps", "seems", "appears", "approx", "approximately", "likely",
 }
 UNCERTAINTY_TERMS = {
     "i think", "i believe", "i guess", "possibly", "could", "might",
 }
+SPECULATION_TERMS = {
+    "maybe", "might", "perhaps", "possibly", "i think", "i guess",
+}
 
 
 def clean_caption(text: str) -> str:
@@ -19,7 +25,92 @@ def clean_caption(text: str) -> str:
     return text.strip()
 
 
+class Hit(NamedTuple):
+    start: int
+    end: int
+    term: str
+    lexicons: Tuple[str, ...]
+
+
+class TermMatcher:
+    """Match whole-word terms from several lexicons in a single pass.
+
+    Terms are compiled into a trie keyed by lowercase tokens, so each token
+    of the text costs one dict lookup no matter how many terms are loaded,
+    and ``"could"`` never matches inside ``"couldn't"``.
+    """
+
+    def __init__(self, lexicons: Mapping[str, Iterable[str]]) -> None:
+        self.lexicons = tuple(lexicons)
+        owners: Dict[Tuple[str, ...], List[str]] = {}
+        for name, terms in lexicons.items():
+            for term in terms:
+                key = tuple(t.lower() for t in TOKEN_RE.findall(term))
+                if key:
+                    owners.setdefault(key, []).append(name)
+        self._trie: dict = {}
+        for key, names in owners.items():
+            node = self._trie
+            for tok in key:
+                node = node.setdefault(tok, {})
+            node[None] = (" ".join(key), tuple(names))
+
+    def finditer(self, text: str) -> Iterator[Hit]:
+        """Yield every term occurrence in ``text`` in order of position."""
+        tokens = [(m.start(), m.end(), m.group().lower()) for m in TOKEN_RE.finditer(text)]
+        for i, (start, _, tok) in enumerate(tokens):
+            node = self._trie.get(tok)
+            j = i
+            while node is not None:
+                leaf = node.get(None)
+                if leaf is not None:
+                    yield Hit(start, tokens[j][1], *leaf)
+                j += 1
+                # Phrases only continue across plain whitespace.
+                if j == len(tokens) or not text[tokens[j - 1][1]:tokens[j][0]].isspace():
+                    break
+                node = node.get(tokens[j][2])
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Return the number of hits per lexicon."""
+        counts = Counter({name: 0 for name in self.lexicons})
+        for hit in self.finditer(text):
+            counts.update(hit.lexicons)
+        return dict(counts)
+
+    def by_span(self, text: str, starts: Sequence[int]) -> List[List[Hit]]:
+        """Group hits by the span (sentence, segment...) each one starts in.
+
+        ``starts`` holds the ascending character offset of every span.
+        """
+        grouped: List[List[Hit]] = [[] for _ in starts]
+        for hit in self.finditer(text):
+            idx = bisect_right(starts, hit.start) - 1
+            if idx >= 0:
+                grouped[idx].append(hit)
+        return grouped
+
+
+LEXICON_MATCHER = TermMatcher({
+    "hedge": HEDGE_TERMS,
+    "uncertainty": UNCERTAINTY_TERMS,
+    "speculation": SPECULATION_TERMS,
+})
+
+
+def span_starts(text: str, parts: Iterable[str]) -> List[int]:
+    """Return the offset of each of ``parts`` found in order within ``text``."""
+    starts: List[int] = []
+    pos = 0
+    for part in parts:
+        idx = text.find(part, pos)
+        if idx < 0:
+            idx = pos
+        starts.append(idx)
+        pos = idx + len(part)
+    return starts
+
+
 def count_terms(text: str, terms: Iterable[str]) -> int:
-    """Count occurrences of any of ``terms`` in ``text`` (case-insensitive)."""
-    lower = text.lower()
-    return sum(lower.count(t) for t in terms)
+    """Count whole-word occurrences of any of ``terms`` in ``text`` (case-insensitive)."""
+    return TermMatcher({"terms": terms}).count(text)["terms"]
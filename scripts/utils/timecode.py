@@ -1,7 +1,11 @@
 """Utilities for working with timecodes."""
 from __future__ import annotations
 
+import json
 import re
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Tuple
 
 TIME_RE = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{2})(?:\.(\d+))?")
 
@@ -28,3 +32,39 @@ def to_hms(seconds: float) -> str:
     h, rem = divmod(seconds, 3600)
     m, s = divmod(rem, 60)
     return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+# ``HH:MM:SS.mmm --> HH:MM:SS.mmm`` cue timing line shared by VTT and SRT
+# (SRT uses a comma before the milliseconds, VTT may omit the hours).
+CUE_TIMING_RE = re.compile(
+    r"(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})\s*-->\s*(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})"
+)
+
+
+class TimeMap:
+    """Map character offsets in a ``clean.md`` transcript back to caption times.
+
+    Built from the ``<id>.timemap.json`` written next to it by
+    ``01_clean_normalize``; each lookup is a single bisect.
+    """
+
+    def __init__(self, offsets: List[int], starts: List[float], ends: List[float]) -> None:
+        self.offsets = offsets
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def load(cls, path: Path) -> "TimeMap":
+        data = json.loads(path.read_text())
+        return cls(data["offset"], data["start"], data["end"])
+
+    def __bool__(self) -> bool:
+        return bool(self.offsets)
+
+    def span_at(self, offset: int) -> Tuple[float, float]:
+        """Return ``(start, end)`` of the caption containing ``offset``."""
+        i = max(bisect_right(self.offsets, offset) - 1, 0)
+        return self.starts[i], self.ends[i]
+
+    def time_at(self, offset: int) -> float:
+        return self.span_at(offset)[0]
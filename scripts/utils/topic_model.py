@@ -0,0 +1,123 @@
+"""Online LDA topic model over transcript windows.
+
+Documents are fixed-length time windows of a video transcript. Terms are
+counted with a ``HashingVectorizer``, so the feature space is fixed up front
+and new documents never force a vocabulary refit. The model is
+``LatentDirichletAllocation`` trained with ``partial_fit`` (online variational
+Bayes), so adding videos updates the topics in place. Topic labels map each
+heavy hash bucket back to the most frequent term seen in it.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, HashingVectorizer
+
+MODEL = Path("data/topic_model.joblib")
+
+# Filler that survives the English stop list in spoken transcripts.
+SPOKEN_STOP_WORDS = {
+    "yeah", "like", "know", "just", "going", "think", "really", "right", "okay", "gonna", "actually", "mean",
+    "said", "say", "says", "got", "things", "thing", "lot", "want", "did", "does", "don", "didn", "doesn",
+    "way", "time", "kind", "sort", "people", "look", "looking", "come", "came", "let", "guys", "stuff",
+    "talk", "talking", "sure", "well", "um", "uh", "basically", "absolutely", "obviously", "course",
+    "quote", "unquote", "interesting", "bit", "little", "yes", "thank", "thanks", "good", "great", "maybe",
+    "video", "videos", "remember", "point", "wasn", "isn", "aren", "couldn", "wouldn", "probably", "pretty",
+    "big", "different", "today", "guy", "channel", "definitely", "exactly", "certainly", "believe",
+}
+STOP_WORDS = sorted(ENGLISH_STOP_WORDS | SPOKEN_STOP_WORDS)
+TOKEN_PATTERN = r"(?u)\b[a-zA-Z][a-zA-Z]{2,}\b"
+
+
+class TopicModel:
+    """Online LDA plus the bookkeeping needed to grow it video by video."""
+
+    def __init__(self, n_topics: int = 20, n_features: int = 2 ** 16, window: float = 300.0,
+                 seed: int = 0) -> None:
+        self.params = {"n_topics": n_topics, "n_features": n_features, "window": window, "seed": seed}
+        self.lda = LatentDirichletAllocation(
+            n_components=n_topics, learning_method="online", learning_offset=10.0,
+            total_samples=50_000, random_state=seed,
+        )
+        self.fitted: set = set()
+        self.term_counts: Counter = Counter()
+        self._vectorizer = self._make_vectorizer()
+        self._analyzer = self._vectorizer.build_analyzer()
+
+    def _make_vectorizer(self) -> HashingVectorizer:
+        return HashingVectorizer(
+            n_features=self.params["n_features"], alternate_sign=False, norm=None,
+            stop_words=STOP_WORDS, token_pattern=TOKEN_PATTERN, lowercase=True,
+        )
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        del state["_vectorizer"], state["_analyzer"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._vectorizer = self._make_vectorizer()
+        self._analyzer = self._vectorizer.build_analyzer()
+
+    @classmethod
+    def load_or_create(cls, path: Path = MODEL, **params) -> "TopicModel":
+        """The saved model if its parameters match ``params``, else a fresh one."""
+        if path.exists():
+            model = joblib.load(path)
+            if all(model.params.get(k) == v for k, v in params.items()):
+                return model
+        return cls(**params)
+
+    def save(self, path: Path = MODEL) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self, path, compress=3)
+
+    def counts(self, docs: Sequence[str]) -> sparse.csr_matrix:
+        return self._vectorizer.transform(docs)
+
+    def partial_fit(self, docs: Sequence[str], passes: int = 5, batch_size: int = 64) -> None:
+        """Update the topics with ``docs`` without revisiting earlier documents."""
+        if not docs:
+            return
+        for doc in docs:
+            self.term_counts.update(self._analyzer(doc))
+        matrix = self.counts(docs)
+        rng = np.random.default_rng(self.params["seed"] + len(self.fitted))
+        for _ in range(passes):
+            order = rng.permutation(matrix.shape[0])
+            for lo in range(0, len(order), batch_size):
+                self.lda.partial_fit(matrix[order[lo:lo + batch_size]])
+
+    def is_trained(self) -> bool:
+        return hasattr(self.lda, "components_")
+
+    def transform(self, matrix: sparse.csr_matrix) -> np.ndarray:
+        """Topic distribution (rows sum to 1) for each row of term counts."""
+        return self.lda.transform(matrix)
+
+    def topic_terms(self, top_n: int = 10) -> List[List[str]]:
+        """The ``top_n`` terms of every topic, resolved from hash buckets."""
+        terms = list(self.term_counts)
+        buckets = self.counts(terms).indices if terms else np.array([], dtype=int)
+        best: Dict[int, str] = {}
+        for term, bucket in zip(terms, buckets.tolist()):
+            if bucket not in best or self.term_counts[term] > self.term_counts[best[bucket]]:
+                best[bucket] = term
+        out = []
+        for weights in self.lda.components_:
+            ranked = [best[b] for b in np.argsort(weights)[::-1][: top_n * 3] if b in best]
+            out.append(ranked[:top_n])
+        return out
+
+
+def top_topics(dist: Iterable[float], threshold: float, limit: int) -> List[List]:
+    """``[topic, weight]`` pairs at or above ``threshold``, heaviest first."""
+    pairs = sorted(((i, float(w)) for i, w in enumerate(dist) if w >= threshold), key=lambda p: -p[1])
+    return [[i, round(w, 4)] for i, w in pairs[:limit]]
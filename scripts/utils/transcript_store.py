@@ -0,0 +1,95 @@
+"""Canonical compressed transcript store with on-demand format export.
+
+Each video's Whisper result (``{"text", "segments", "language"}`` with
+per-segment timings, tokens and confidence fields) is kept once, as
+gzip-compressed JSON next to where Whisper wrote it:
+``<title>/<title> [<id>].whisper.json.gz``. The txt/vtt/srt/tsv/json
+files are rebuilt from it on demand. The exporters follow Whisper's own
+writers with default options, so each export is byte-for-byte identical to
+the file Whisper produced. ``scripts/pack_transcripts.py verify`` and
+``tests/test_transcript_store.py`` check this.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+STORE_SUFFIX = ".whisper.json.gz"
+FORMATS = ("json", "txt", "vtt", "srt", "tsv")
+
+
+def pack(raw_json: bytes) -> bytes:
+    # mtime=0 keeps the archive bytes stable across re-packs.
+    return gzip.compress(raw_json, compresslevel=9, mtime=0)
+
+
+def read_raw(path: Path) -> bytes:
+    """The original Whisper JSON bytes."""
+    return gzip.decompress(Path(path).read_bytes())
+
+
+def load(path: Path) -> Dict:
+    return json.loads(read_raw(path))
+
+
+def store_path(folder: Path, stem: str) -> Path:
+    return folder / f"{stem}{STORE_SUFFIX}"
+
+
+def format_timestamp(seconds: float, always_include_hours: bool = False, decimal_marker: str = ".") -> str:
+    ms = round(seconds * 1000.0)
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    secs, ms = divmod(ms, 1_000)
+    hours_marker = f"{hours:02d}:" if always_include_hours or hours > 0 else ""
+    return f"{hours_marker}{minutes:02d}:{secs:02d}{decimal_marker}{ms:03d}"
+
+
+def _cues(result: Dict, always_include_hours: bool, decimal_marker: str) -> Iterator[tuple]:
+    for seg in result["segments"]:
+        yield (
+            format_timestamp(seg["start"], always_include_hours, decimal_marker),
+            format_timestamp(seg["end"], always_include_hours, decimal_marker),
+            seg["text"].strip().replace("-->", "->"),
+        )
+
+
+def to_json(result: Dict) -> str:
+    return json.dumps(result)
+
+
+def to_txt(result: Dict) -> str:
+    return "".join(seg["text"].strip() + "\n" for seg in result["segments"])
+
+
+def to_vtt(result: Dict) -> str:
+    return "WEBVTT\n\n" + "".join(f"{start} --> {end}\n{text}\n\n" for start, end, text in _cues(result, False, "."))
+
+
+def to_srt(result: Dict) -> str:
+    return "".join(
+        f"{i}\n{start} --> {end}\n{text}\n\n" for i, (start, end, text) in enumerate(_cues(result, True, ","), start=1)
+    )
+
+
+def to_tsv(result: Dict) -> str:
+    return "start\tend\ttext\n" + "".join(
+        f"{round(1000 * seg['start'])}\t{round(1000 * seg['end'])}\t{seg['text'].strip().replace(chr(9), ' ')}\n"
+        for seg in result["segments"]
+    )
+
+
+EXPORTERS: Dict[str, Callable[[Dict], str]] = {
+    "json": to_json,
+    "txt": to_txt,
+    "vtt": to_vtt,
+    "srt": to_srt,
+    "tsv": to_tsv,
+}
+
+
+def export(result: Dict, fmt: str) -> bytes:
+    """Render ``result`` in one of ``FORMATS`` as the UTF-8 bytes Whisper would write."""
+    return EXPORTERS[fmt](result).encode("utf-8")
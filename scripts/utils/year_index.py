@@ -0,0 +1,123 @@
+"""Corpus-wide index of year mentions with their segment timecodes."""
+from __future__ import annotations
+
+import json
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+
+class Mention(NamedTuple):
+    year: int
+    video_id: str
+    start: float
+    end: float
+
+
+def build(per_video: Dict[str, Iterable[Tuple[int, float, float]]]) -> dict:
+    """Pack per-video ``(year, start, end)`` mentions into sorted columns.
+
+    Rows are ordered by year, then video, then start time so that any year
+    range maps onto one contiguous slice of every column.
+    """
+    videos = sorted(per_video)
+    rows = sorted(
+        (year, vidx, start, end)
+        for vidx, vid in enumerate(videos)
+        for year, start, end in per_video[vid]
+    )
+    return {
+        "videos": videos,
+        "year": [r[0] for r in rows],
+        "video": [r[1] for r in rows],
+        "start": [r[2] for r in rows],
+        "end": [r[3] for r in rows],
+    }
+
+
+class _IntervalTree:
+    """Static centered interval tree over ``(lo, hi, payload)`` triples."""
+
+    __slots__ = ("center", "by_lo", "by_hi", "left", "right")
+
+    def __init__(self, intervals: List[Tuple[int, int, str]]) -> None:
+        points = sorted(p for lo, hi, _ in intervals for p in (lo, hi))
+        self.center = points[len(points) // 2]
+        here = [iv for iv in intervals if iv[0] <= self.center <= iv[1]]
+        lower = [iv for iv in intervals if iv[1] < self.center]
+        upper = [iv for iv in intervals if iv[0] > self.center]
+        self.by_lo = sorted(here, key=lambda iv: iv[0])
+        self.by_hi = sorted(here, key=lambda iv: iv[1], reverse=True)
+        self.left = _IntervalTree(lower) if lower else None
+        self.right = _IntervalTree(upper) if upper else None
+
+    def stab(self, x: int) -> Iterator[str]:
+        node: _IntervalTree | None = self
+        while node is not None:
+            if x < node.center:
+                for lo, _, payload in node.by_lo:
+                    if lo > x:
+                        break
+                    yield payload
+                node = node.left
+            elif x > node.center:
+                for _, hi, payload in node.by_hi:
+                    if hi < x:
+                        break
+                    yield payload
+                node = node.right
+            else:
+                for _, _, payload in node.by_lo:
+                    yield payload
+                return
+
+
+class YearIndex:
+    """Range and stabbing queries over the columns produced by :func:`build`.
+
+    Queries cost ``O(log n + k)`` for ``k`` hits, independent of corpus size.
+    """
+
+    def __init__(self, data: dict) -> None:
+        self.videos: List[str] = data["videos"]
+        self._year: List[int] = data["year"]
+        self._video: List[int] = data["video"]
+        self._start: List[float] = data["start"]
+        self._end: List[float] = data["end"]
+        spans: Dict[int, Tuple[int, int]] = {}
+        for year, vidx in zip(self._year, self._video):
+            lo, _ = spans.get(vidx, (year, year))
+            spans[vidx] = (lo, year)
+        intervals = [(lo, hi, self.videos[v]) for v, (lo, hi) in spans.items()]
+        self._spans = _IntervalTree(intervals) if intervals else None
+
+    @classmethod
+    def load(cls, path: Path) -> "YearIndex":
+        return cls(json.loads(path.read_text()))
+
+    def __len__(self) -> int:
+        return len(self._year)
+
+    def _row(self, i: int) -> Mention:
+        return Mention(self._year[i], self.videos[self._video[i]], self._start[i], self._end[i])
+
+    def range(self, lo: int, hi: int) -> Iterator[Mention]:
+        """Yield every mention of a year in ``[lo, hi]`` ordered by year, video and time."""
+        first = bisect_left(self._year, lo)
+        last = bisect_right(self._year, hi)
+        for i in range(first, last):
+            yield self._row(i)
+
+    def years(self) -> Iterator[int]:
+        """Yield each distinct year once, skipping over repeated mentions."""
+        i, n = 0, len(self._year)
+        while i < n:
+            year = self._year[i]
+            yield year
+            i = bisect_right(self._year, year, i)
+
+    def stab(self, year: int) -> List[str]:
+        """Return ids of videos whose earliest..latest span contains ``year``."""
+        if self._spans is None:
+            return []
+        return sorted(self._spans.stab(year))
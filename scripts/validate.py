@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 """Validate repo health for GitHub Pages."""
 from __future__ import annotations
-import re, sys
+import hashlib, posixpath, re, sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
-from scripts.common import DATA_DIR, DOCS_DIR, read_json, rel, safe_filename
+from scripts.common import DATA_DIR, DOCS_DIR, REPO_ROOT, read_json, rel, safe_filename, write_json
 
 INDEX_JSON = DATA_DIR / "transcripts_index.json"
 INDEX_MD = DOCS_DIR / "index.md"
 LINK_RE = re.compile(r"\[[^\]]+\]\((?!https?://|mailto:|#)([^)]+)\)")
+# Links extracted per docs file, keyed by content hash so unchanged files are not re-scanned.
+LINK_CACHE_JSON = REPO_ROOT / ".cache" / "validate_links.json"
+# Below this many files a process pool costs more than it saves.
+PARALLEL_MIN_FILES = 256
 
 def fail(msg: str) -> None:
     print(f"VALIDATION ERROR: {msg}")
@@ -27,7 +32,44 @@ def load_index() -> List[Dict[str, Any]]:
         fail(f"Bad schema in {rel(INDEX_JSON)}; expected {{'videos': [...]}}.")
     return idx["videos"]
 
-def expect_video_pages(videos: List[Dict[str, Any]]) -> Set[Path]:
+def known_targets() -> Set[str]:
+    """Every docs-relative path that exists on disk.
+
+    Generator manifests are not consulted: a stale or local manifest may list
+    pages that no longer exist.
+    """
+    targets: Set[str] = {"."}
+    for p in DOCS_DIR.rglob("*"):
+        targets.add(p.relative_to(DOCS_DIR).as_posix())
+    return targets
+
+def _scan(task: Tuple[str, Optional[str]]) -> Tuple[str, str, Optional[List[str]]]:
+    path, known_hash = task
+    data = Path(path).read_bytes()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if digest == known_hash:
+        return path, digest, None
+    return path, digest, LINK_RE.findall(data.decode("utf-8"))
+
+def collect_links(files: List[Path]) -> Dict[str, List[str]]:
+    """Map each docs-relative file to its relative links, one regex pass per changed file."""
+    cache = read_json(LINK_CACHE_JSON, default={})
+    keys = {str(p): p.relative_to(DOCS_DIR).as_posix() for p in files}
+    tasks = [(path, cache.get(key, {}).get("hash")) for path, key in keys.items()]
+    if len(tasks) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor() as pool:
+            results = list(pool.map(_scan, tasks, chunksize=64))
+    else:
+        results = [_scan(t) for t in tasks]
+    fresh: Dict[str, Dict[str, Any]] = {}
+    for path, digest, links in results:
+        key = keys[path]
+        fresh[key] = {"hash": digest, "links": cache[key]["links"] if links is None else links}
+    if fresh != cache:
+        write_json(LINK_CACHE_JSON, fresh)
+    return {key: entry["links"] for key, entry in fresh.items()}
+
+def expect_video_pages(videos: List[Dict[str, Any]], targets: Set[str]) -> Set[Path]:
     missing = []
     expected: Set[Path] = set()
     for v in videos:
@@ -35,39 +77,39 @@ def expect_video_pages(videos: List[Dict[str, Any]]) -> Set[Path]:
         title = v.get("title") or vid
         pf = DOCS_DIR / "videos" / safe_filename(vid, title)
         expected.add(pf)
-        if not pf.exists():
+        if pf.relative_to(DOCS_DIR).as_posix() not in targets:
             missing.append(rel(pf))
     if missing:
         fail("Missing video pages:\n" + "\n".join(f"- {m}" for m in missing))
     return expected
 
-def validate_index_links(videos: List[Dict[str, Any]]) -> None:
-    if not INDEX_MD.exists():
+def validate_index_links(videos: List[Dict[str, Any]], links: Dict[str, List[str]]) -> None:
+    index_key = INDEX_MD.relative_to(DOCS_DIR).as_posix()
+    if index_key not in links:
         fail(f"Missing {rel(INDEX_MD)}")
-    text = INDEX_MD.read_text(encoding="utf-8")
+    linked = set(links[index_key])
     missing = []
     for v in videos:
         vid = v.get("id")
         title = v.get("title") or vid
         pf = safe_filename(vid, title)
-        if f"](./videos/{pf})" not in text:
+        if f"./videos/{pf}" not in linked:
             missing.append(pf)
     if missing:
         fail("Index missing links for:\n" + "\n".join(f"- {m}" for m in missing))
 
-def check_links() -> None:
+def check_links(links: Dict[str, List[str]], targets: Set[str]) -> None:
     errors = []
-    for md in DOCS_DIR.rglob("*.md"):
-        text = md.read_text(encoding="utf-8")
-        for m in LINK_RE.finditer(text):
-            target = (md.parent / m.group(1)).resolve()
-            try:
-                target.relative_to(DOCS_DIR.resolve())
-            except Exception:
-                errors.append(f"{rel(md)} → {m.group(1)} (escapes docs/)")
-                continue
-            if not target.exists():
-                errors.append(f"{rel(md)} → {rel(target)}")
+    docs = rel(DOCS_DIR)
+    for source, hrefs in links.items():
+        base = posixpath.dirname(source)
+        for href in hrefs:
+            path = href.split("#", 1)[0]
+            target = posixpath.normpath(posixpath.join(base, path))
+            if path.startswith("/") or target == ".." or target.startswith("../"):
+                errors.append(f"{docs}/{source} → {href} (escapes docs/)")
+            elif target not in targets:
+                errors.append(f"{docs}/{source} → {docs}/{target}")
     if errors:
         fail("Broken links found:\n" + "\n".join(f"- {e}" for e in errors))
 
@@ -79,9 +121,11 @@ def warn_orphans(expected: Set[Path]) -> None:
 
 def main() -> None:
     videos = load_index()
-    expected = expect_video_pages(videos)
-    validate_index_links(videos)
-    check_links()
+    targets = known_targets()
+    expected = expect_video_pages(videos, targets)
+    links = collect_links(sorted(DOCS_DIR.rglob("*.md")))
+    validate_index_links(videos, links)
+    check_links(links, targets)
     warn_orphans(expected)
     print("Validation passed.")
 
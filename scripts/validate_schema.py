@@ -1,39 +1,127 @@
 #!/usr/bin/env python3
-import json, sys, pathlib, re
-from jsonschema import validate, Draft202012Validator
+"""Validate data/transcripts_index.json against data/schema/transcripts.schema.json.
+
+Each video is checked on its own against the compiled ``videos.items``
+subschema plus the per-item rules below. Items that passed before are
+skipped: a cache in ``.cache/validate_schema.json`` records the hash of every
+item from the last successful run. That cache is keyed by the schema and
+this script, so changing either rechecks everything. Duplicate ids/slugs
+and transcript existence are always checked. Transcript existence is checked
+against one walk of the directories involved rather than a stat per video.
+"""
+import argparse, hashlib, json, os, sys, pathlib, re
+from jsonschema import Draft202012Validator
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 INDEX = ROOT / "data" / "transcripts_index.json"
 SCHEMA = ROOT / "data" / "schema" / "transcripts.schema.json"
+CACHE = ROOT / ".cache" / "validate_schema.json"
+
+TAG_NS_RE = re.compile(r"^(person|place|topic):[a-z0-9-]+$")
+ENTITY_SLUG_RE = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
 
 def die(msg):
     print(f"ERROR: {msg}", file=sys.stderr)
     sys.exit(1)
 
+def digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def item_hash(item) -> str:
+    return digest(json.dumps(item, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+
+def load_cache(fingerprint: str) -> set:
+    if not CACHE.exists():
+        return set()
+    cache = json.loads(CACHE.read_text(encoding="utf-8"))
+    return set(cache["items"]) if cache.get("fingerprint") == fingerprint else set()
+
+def save_cache(fingerprint: str, hashes) -> None:
+    CACHE.parent.mkdir(parents=True, exist_ok=True)
+    CACHE.write_text(json.dumps({"fingerprint": fingerprint, "items": sorted(hashes)}), encoding="utf-8")
+
+def item_errors(item_validator, i, item):
+    """Schema and per-item rule violations for ``videos[i]``."""
+    errs = sorted(item_validator.iter_errors(item), key=lambda e: e.path)
+    if errs:
+        return [f"Schema error at {['videos', i, *e.path]}: {e.message}" for e in errs]
+    vid = item["id"]
+    out = []
+    # Namespaced tags (optional but enforced if present)
+    for t in item.get("tags", []):
+        if not TAG_NS_RE.match(t):
+            out.append(f"[{vid}] tag not namespaced or invalid: {t}")
+    # Entities slugs are hyphen-kebab
+    ents = item.get("entities", {})
+    for group in ("people", "places", "topics"):
+        for eslug in ents.get(group, []):
+            if not ENTITY_SLUG_RE.match(eslug):
+                out.append(f"[{vid}] invalid {group} slug: {eslug}")
+    return out
+
+def existing_files(paths) -> set:
+    """Paths (as given) that exist, from one walk per top-level directory."""
+    plain = {p for p in paths if not pathlib.PurePosixPath(p).is_absolute() and ".." not in pathlib.PurePosixPath(p).parts}
+    # Anything that doesn't live plainly under the repo gets an ordinary stat.
+    found = {p for p in set(paths) - plain if (ROOT / p).exists()}
+    tops = {pathlib.PurePosixPath(p).parts[0] for p in plain if pathlib.PurePosixPath(p).parts}
+    for top in tops:
+        base = ROOT / top
+        if base.is_file():
+            found.add(top)
+            continue
+        for dirpath, _, filenames in os.walk(base):
+            rel_dir = pathlib.Path(dirpath).relative_to(ROOT).as_posix()
+            found.update(f"{rel_dir}/{name}" for name in filenames)
+    return {p for p in paths if p in found or pathlib.PurePosixPath(p).as_posix() in found}
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--no-cache", action="store_true", help="recheck every item")
+    args = parser.parse_args()
+
     if not INDEX.exists():
         die(f"missing {INDEX}")
     if not SCHEMA.exists():
         die(f"missing {SCHEMA}")
 
     data = json.loads(INDEX.read_text(encoding="utf-8"))
-    schema = json.loads(SCHEMA.read_text(encoding="utf-8"))
+    schema_bytes = SCHEMA.read_bytes()
+    schema = json.loads(schema_bytes)
 
-    validator = Draft202012Validator(schema)
-    errs = sorted(validator.iter_errors(data), key=lambda e: e.path)
+    # The envelope is checked with the items subschema stripped out; each item
+    # is then checked against the compiled subschema on its own.
+    envelope = json.loads(schema_bytes)
+    items_schema = envelope.get("properties", {}).get("videos", {}).pop("items", True)
+    errs = sorted(Draft202012Validator(envelope).iter_errors(data), key=lambda e: e.path)
     if errs:
         for e in errs:
             print(f"Schema error at {list(e.path)}: {e.message}", file=sys.stderr)
         sys.exit(1)
+    item_validator = Draft202012Validator(schema).evolve(schema=items_schema)
 
     items = data.get("videos", [])
+    fingerprint = digest(schema_bytes + pathlib.Path(__file__).read_bytes())
+    passed = set() if args.no_cache else load_cache(fingerprint)
+    hashes = []
+    errors = []
+    checked = 0
+    for i, item in enumerate(items):
+        h = item_hash(item)
+        hashes.append(h)
+        if h in passed:
+            continue
+        checked += 1
+        errors.extend(item_errors(item_validator, i, item))
+    if errors:
+        for msg in errors:
+            print(msg, file=sys.stderr)
+        sys.exit(1)
 
-    # Custom validations
+    # Custom validations across items
     ids = set()
     slugs = set()
-    tag_ns_re = re.compile(r"^(person|place|topic):[a-z0-9-]+$")
-
-    for i, item in enumerate(items):
+    for item in items:
         vid = item["id"]
         slug = item["slug"]
         if vid in ids:
@@ -43,24 +131,15 @@ def main():
         ids.add(vid)
         slugs.add(slug)
 
-        # Ensure transcript file exists
-        txt_path = ROOT / item["sources"]["transcript_txt"]
-        if not txt_path.exists():
-            die(f"[{vid}] transcript_txt not found: {txt_path}")
-
-        # Namespaced tags (optional but enforced if present)
-        for t in item.get("tags", []):
-            if not tag_ns_re.match(t):
-                die(f"[{vid}] tag not namespaced or invalid: {t}")
-
-        # Entities slugs are hyphen-kebab
-        ents = item.get("entities", {})
-        for group in ("people", "places", "topics"):
-            for eslug in ents.get(group, []):
-                if not re.match(r"^[a-z0-9]+(?:-[a-z0-9]+)*$", eslug):
-                    die(f"[{vid}] invalid {group} slug: {eslug}")
+    # Ensure transcript files exist
+    wanted = [item["sources"]["transcript_txt"] for item in items]
+    present = existing_files(wanted)
+    for item, path in zip(items, wanted):
+        if path not in present:
+            die(f"[{item['id']}] transcript_txt not found: {ROOT / path}")
 
-    print("OK: transcripts_index.json is valid")
+    save_cache(fingerprint, hashes)
+    print(f"OK: transcripts_index.json is valid ({checked} of {len(items)} items checked)")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,166 @@
+"""``utils.captions.parse_cues`` must read captions exactly as webvtt-py and pysrt do."""
+import random
+from pathlib import Path
+
+import pytest
+
+webvtt = pytest.importorskip("webvtt")
+pysrt = pytest.importorskip("pysrt")
+
+from utils import transcript_store
+from utils.captions import read_cues
+
+REPO = Path(__file__).resolve().parents[1]
+
+ODD_VTT = """\ufeffWEBVTT - with a title
+Kind: captions
+Language: en
+
+STYLE
+::cue { color: yellow }
+
+NOTE a note
+spanning two lines
+
+intro
+00:00:01.000 --> 00:00:02.500 align:start position:0%
+Hello <c>world</c><00:00:01.500><c> again</c>
+  second line  
+
+00:03.000 --> 01:00:04.250
+<v Roger>Third &amp; fourth</v>
+
+2
+00:01:05.007 --> 00:01:06.999 line:90% size:50%
+- one
+- two
+- three
+"""
+
+ODD_SRT = """\ufeff1
+00:00:01,000 --> 00:00:02,500
+Hello <i>world</i>
+ two 
+
+2
+00:00:03,000 --> 00:00:04,250 X1:10 X2:20 Y1:30 Y2:40
+<b>Third</b>
+
+3
+01:02:03,004 --> 01:02:05,600
+a
+b
+c
+"""
+
+
+def _ms(timestamp: str) -> int:
+    hms, ms = timestamp.replace(",", ".").split(".")
+    seconds = 0
+    for part in hms.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds * 1000 + int(ms)
+
+
+def ours(path: Path):
+    return [(round(start * 1000), round(end * 1000), text) for start, end, text in read_cues(path)]
+
+
+def with_webvtt(path: Path):
+    return [(_ms(c.start), _ms(c.end), c.text.strip()) for c in webvtt.read(str(path), encoding="utf-8-sig")]
+
+
+def with_pysrt(path: Path):
+    return [(c.start.ordinal, c.end.ordinal, c.text_without_tags.strip())
+            for c in pysrt.open(str(path), encoding="utf-8-sig")]
+
+
+def _write(tmp_path: Path, name: str, text: str, newline: str = "\n") -> Path:
+    path = tmp_path / name
+    path.write_bytes(text.replace("\n", newline).encode("utf-8"))
+    return path
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_odd_vtt_matches_webvtt(tmp_path, newline):
+    path = _write(tmp_path, "odd.vtt", ODD_VTT, newline)
+    assert ours(path) == with_webvtt(path)
+    assert len(ours(path)) == 3
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_odd_srt_matches_pysrt(tmp_path, newline):
+    path = _write(tmp_path, "odd.srt", ODD_SRT, newline)
+    assert ours(path) == with_pysrt(path)
+    assert len(ours(path)) == 3
+
+
+WORDS = ["ufo", "crash", "retrieval", "Lazar", "é", "naïve", "&amp;", "1947", "-", "—", "?"]
+TAGS = ["<i>{}</i>", "<b>{}</b>", "<c>{}</c>", "<v Bob>{}</v>"]
+
+
+def _random_cues(rng: random.Random, count: int):
+    t = rng.randrange(0, 10_000)
+    cues = []
+    for _ in range(count):
+        start = t + rng.randrange(0, 5_000)
+        end = start + rng.randrange(1, 8_000)
+        t = end
+        lines = []
+        for _ in range(rng.randint(1, 3)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(1, 6))]
+            if rng.random() < 0.3:
+                i = rng.randrange(len(words))
+                words[i] = rng.choice(TAGS).format(words[i])
+            lines.append(" ".join(words))
+        cues.append((start, end, lines))
+    return cues
+
+
+def _stamp(ms: int, marker: str, hours: bool) -> str:
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1_000)
+    return (f"{h:02d}:" if hours or h else "") + f"{m:02d}:{s:02d}{marker}{ms:03d}"
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_random_vtt_matches_webvtt(tmp_path, seed):
+    rng = random.Random(seed)
+    out = ["\ufeffWEBVTT" if rng.random() < 0.5 else "WEBVTT", ""]
+    for i, (start, end, lines) in enumerate(_random_cues(rng, rng.randint(1, 40)), start=1):
+        if rng.random() < 0.2:
+            out += ["NOTE generated", ""]
+        if rng.random() < 0.5:
+            out.append(str(i))
+        settings = " align:middle line:84%" if rng.random() < 0.3 else ""
+        hours = rng.random() < 0.5
+        out.append(f"{_stamp(start, '.', hours)} --> {_stamp(end, '.', hours)}{settings}")
+        out += lines + [""]
+    path = _write(tmp_path, "random.vtt", "\n".join(out), rng.choice(["\n", "\r\n"]))
+    assert ours(path) == with_webvtt(path)
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_random_srt_matches_pysrt(tmp_path, seed):
+    rng = random.Random(seed)
+    out = ["\ufeff"] if rng.random() < 0.5 else [""]
+    for i, (start, end, lines) in enumerate(_random_cues(rng, rng.randint(1, 40)), start=1):
+        coords = " X1:1 X2:2 Y1:3 Y2:4" if rng.random() < 0.2 else ""
+        out[-1] += str(i)
+        out.append(f"{_stamp(start, ',', True)} --> {_stamp(end, ',', True)}{coords}")
+        out += lines + ["", ""]
+    path = _write(tmp_path, "random.srt", "\n".join(out), rng.choice(["\n", "\r\n"]))
+    assert ours(path) == with_pysrt(path)
+
+
+STORES = sorted(REPO.glob(f"*/*{transcript_store.STORE_SUFFIX}"))
+
+
+@pytest.mark.skipif(not STORES, reason="no transcript stores in this checkout")
+@pytest.mark.parametrize("fmt, reference", [("vtt", with_webvtt), ("srt", with_pysrt)])
+def test_corpus_captions_match_reference(tmp_path, fmt, reference):
+    for store in STORES:
+        path = tmp_path / f"{store.parent.name[:40]}.{fmt}"
+        path.write_bytes(transcript_store.export(transcript_store.load(store), fmt))
+        assert ours(path) == reference(path), store.name
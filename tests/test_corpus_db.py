@@ -0,0 +1,45 @@
+"""Search filters apply to each segment, not to its whole video."""
+import sqlite3
+
+from utils.corpus_db import SCHEMA, connect, search_segments
+
+
+def build(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO metrics (video_id, sentiment_mean) VALUES (?, ?)", [("up", 0.5), ("flat", -0.2)])
+    conn.executemany('INSERT INTO segments (video_id, start, "end", text) VALUES (?, ?, ?, ?)', [
+        ("up", 10, 14, "Lockheed built it"),
+        ("up", 400, 404, "Lockheed covered it up"),
+        ("up", 700, 704, "Lockheed again"),
+        ("flat", 30, 34, "Lockheed in the desert"),
+    ])
+    conn.execute("INSERT INTO segments_fts(segments_fts) VALUES ('rebuild')")
+    conn.executemany("INSERT INTO year_mentions VALUES (?, ?, ?, ?)", [
+        (1995, "up", 420, 422),
+        (1995, "up", 2000, 2002),
+        (1980, "up", 690, 692),
+        (1997, "flat", 50, 52),
+    ])
+    # "up" is positive overall but negative from 300 s to 600 s; "flat" has no series.
+    conn.executemany("INSERT INTO sentiment_windows VALUES (?, ?, ?, ?)", [
+        ("up", 0, 300, 0.6), ("up", 300, 600, -0.4), ("up", 600, 900, 0.7),
+    ])
+    conn.commit()
+    conn.close()
+
+
+def starts(rows):
+    return sorted((r["video_id"], r["start"]) for r in rows)
+
+
+def test_segment_filters(tmp_path):
+    path = tmp_path / "corpus.sqlite"
+    build(path)
+    conn = connect(path)
+    assert len(search_segments(conn, "lockheed")) == 4
+    assert starts(search_segments(conn, "lockheed", max_sentiment=0)) == [("flat", 30), ("up", 400)]
+    assert starts(search_segments(conn, "lockheed", after_year=1990)) == [("flat", 30), ("up", 400)]
+    assert starts(search_segments(conn, "lockheed", after_year=1990, year_near=10)) == []
+    assert starts(search_segments(conn, "lockheed", after_year=1990, max_sentiment=0)) == [("flat", 30), ("up", 400)]
+    assert starts(search_segments(conn, "lockheed", after_year=1970)) == [("flat", 30), ("up", 400), ("up", 700)]
@@ -0,0 +1,37 @@
+"""Alias resolution must not depend on the order videos were processed in."""
+import json
+
+from utils.entity_resolution import resolve
+
+LATER = {"people": ["Lazar", "Grusch", "Bob Lazar", "Robert Lazar", "David Grusch"]}
+
+
+def test_unmatched_forms_join_later_clusters(tmp_path):
+    aliases = tmp_path / "aliases.json"
+    distinct = tmp_path / "distinct.json"
+    first = resolve({"people": ["Lazar", "Grusch"]}, aliases, distinct)
+    assert first["people"] == {"Lazar": "Lazar", "Grusch": "Grusch"}
+    assert json.loads(aliases.read_text()) == {"people": {}}
+
+    second = resolve(LATER, aliases, distinct)["people"]
+    assert resolve(LATER, tmp_path / "fresh.json", distinct)["people"] == second
+    assert second["Lazar"] == second["Bob Lazar"] == second["Robert Lazar"]
+    assert second["Grusch"] == second["David Grusch"] == "David Grusch"
+
+
+def test_merges_are_kept(tmp_path):
+    aliases = tmp_path / "aliases.json"
+    distinct = tmp_path / "distinct.json"
+    canonical = resolve(LATER, aliases, distinct)["people"]["Lazar"]
+    # A later run without the long forms still maps the bare surname to the same page.
+    assert resolve({"people": ["Lazar"]}, aliases, distinct)["people"]["Lazar"] == canonical
+    saved = json.loads(aliases.read_text())["people"]
+    assert all(alias != name for alias, name in saved.items())
+
+
+def test_distinct_forms_are_not_merged(tmp_path):
+    distinct = tmp_path / "distinct.json"
+    distinct.write_text(json.dumps({"people": ["Lazar"]}))
+    mapping = resolve(LATER, tmp_path / "aliases.json", distinct)["people"]
+    assert mapping["Lazar"] == "Lazar"
+    assert mapping["Bob Lazar"] == mapping["Robert Lazar"] != "Lazar"
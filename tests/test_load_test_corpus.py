@@ -0,0 +1,20 @@
+"""Bucketed percentiles must stay within one bucket of the exact ones."""
+import math
+import random
+
+from load_test_corpus import BUCKETS_PER_DOUBLING, Histogram
+
+
+def test_percentiles_within_one_bucket():
+    rng = random.Random(0)
+    samples = [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+    hist = Histogram()
+    for ms in samples:
+        hist.add(ms)
+    samples.sort()
+    width = 2 ** (1 / BUCKETS_PER_DOUBLING)
+    for p in (50, 90, 95, 99, 99.9):
+        exact = samples[math.ceil(p / 100 * len(samples)) - 1]
+        assert exact <= hist.percentile(p) <= exact * width
+    assert hist.percentile(100) == samples[-1]
+    assert hist.summary()["count"] == len(samples)
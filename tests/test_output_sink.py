@@ -0,0 +1,19 @@
+"""Outputs written through the sink must be readable like any other file."""
+import os
+import stat
+
+from utils.output_sink import OutputSink
+
+
+def test_written_files_follow_umask(tmp_path):
+    umask = os.umask(0)
+    os.umask(umask)
+    sink = OutputSink(tmp_path, "pages")
+    sink.write_text("videos/a.md", "one\n")
+    sink.write_text("videos/b.md", "two\n")
+    sink.close()
+    sink = OutputSink(tmp_path, "pages", prune=False)
+    sink.write_text("videos/a.md", "changed\n")
+    sink.close()
+    for name in ("a.md", "b.md"):
+        assert stat.S_IMODE((tmp_path / "videos" / name).stat().st_mode) == 0o666 & ~umask
@@ -0,0 +1,34 @@
+"""Phrase index lookups must agree with a regular-expression scan of the corpus."""
+import random
+import re
+
+import pytest
+
+from utils.phrase_index import PhraseIndex, build
+
+WORDS = ["ufo", "ufology", "ufos", "the", "th", "crash", "a", "sky"]
+QUERIES = ["ufo", "the ufo", "th", "ufo crash", "a", "sky sky", "u", "o c"]
+
+
+def scan(corpus: str, phrase: str, whole_words: bool) -> int:
+    pattern = re.escape(phrase)
+    if whole_words:
+        pattern = r"(?<![^ \n])" + pattern + r"(?![^ \n])"
+    return len(re.findall(f"(?={pattern})", corpus))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_lookups_match_scan(tmp_path, seed):
+    rng = random.Random(seed)
+    docs = {f"v{d}": (" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 60))), None)
+            for d in range(rng.randint(1, 6))}
+    build(docs, tmp_path)
+    corpus = (tmp_path / "text.bin").read_bytes().decode("utf-8")
+    with PhraseIndex(tmp_path) as index:
+        for phrase in QUERIES:
+            for whole_words in (True, False):
+                expected = scan(corpus, phrase, whole_words)
+                assert index.count(phrase, whole_words=whole_words) == expected
+                assert len(list(index.search(phrase, whole_words=whole_words))) == expected
+        for rep in index.repeats(top=50, min_words=1):
+            assert rep.count == scan(corpus, rep.phrase, True) >= 2
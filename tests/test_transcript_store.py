@@ -0,0 +1,52 @@
+"""Exports from the transcript store must equal the files Whisper wrote, byte for byte."""
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+import pack_transcripts
+from utils import transcript_store
+from utils.transcript_store import FORMATS, STORE_SUFFIX
+
+REPO = Path(__file__).resolve().parents[1]
+# The original Whisper outputs of a few videos, kept from before they were packed:
+# a short one, one longer than an hour (VTT timestamps gain hours) and an empty one.
+FIXTURES = Path(__file__).parent / "fixtures" / "whisper"
+STORES = {vid: folder / f"{stem}{STORE_SUFFIX}" for vid, folder, stem in pack_transcripts.video_folders(REPO)}
+GOLDEN = sorted(FIXTURES.glob("*.gz"))
+
+
+@pytest.mark.parametrize("golden", GOLDEN, ids=lambda p: p.name[:-3])
+def test_export_matches_whisper_output(golden):
+    vid, fmt = golden.name[:-3].rsplit(".", 1)
+    result = transcript_store.load(STORES[vid])
+    assert transcript_store.export(result, fmt) == gzip.decompress(golden.read_bytes())
+
+
+@pytest.mark.parametrize("vid", sorted(STORES))
+def test_store_round_trips(vid):
+    raw = transcript_store.read_raw(STORES[vid])
+    result = json.loads(raw)
+    assert transcript_store.export(result, "json") == raw
+    assert transcript_store.pack(raw) == STORES[vid].read_bytes()
+    for fmt in FORMATS:
+        transcript_store.export(result, fmt).decode("utf-8")
+
+
+def test_pack_export_verify(tmp_path):
+    vid, store = next((vid, path) for vid, path in STORES.items() if transcript_store.load(path)["segments"])
+    folder = tmp_path / store.parent.name
+    folder.mkdir()
+    stem = store.name[: -len(STORE_SUFFIX)]
+    # Restore the Whisper files from the store, then pack them again from scratch.
+    (folder / f"{stem}.json").write_bytes(transcript_store.read_raw(store))
+    assert pack_transcripts.cmd_export(tmp_path, [f for f in FORMATS if f != "json"], None, None) == 0
+    assert pack_transcripts.cmd_pack(tmp_path, delete=True) == 0
+    assert [p.name for p in folder.iterdir()] == [store.name]
+    assert (folder / store.name).read_bytes() == store.read_bytes()
+    assert pack_transcripts.cmd_verify(tmp_path) == 0
+
+
+def test_verify_repository():
+    assert pack_transcripts.cmd_verify(REPO) == 0